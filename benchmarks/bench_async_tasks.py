@@ -0,0 +1,65 @@
+"""bench_async_tasks.py
+Peak memory and throughput of :func:`python.async_tasks.gather_limited`
+against :func:`python.async_tasks.stream_limited` for many tiny coroutines.
+
+``gather_limited`` starts tasks lazily but still holds the full result list,
+so its peak memory grows with the input size (it created every task up front
+before the failure-policy rewrite). ``stream_limited`` keeps only ``limit``
+awaitables and results alive.
+Memory is measured with :mod:`tracemalloc`, which slows both paths equally.
+Run from the repository root::
+
+    python benchmarks/bench_async_tasks.py
+"""
+from __future__ import annotations
+
+import asyncio
+import pathlib
+import sys
+import time
+import tracemalloc
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from python import async_tasks as mod  # noqa: E402
+
+ITEMS = 100_000
+LIMIT = 64
+
+
+async def work(value: int) -> int:
+    await asyncio.sleep(0)
+    return value
+
+
+async def run_gather() -> int:
+    return len(await mod.gather_limited((work(i) for i in range(ITEMS)), limit=LIMIT))
+
+
+async def run_stream(ordered: bool) -> int:
+    count = 0
+    async for _ in mod.stream_limited((work(i) for i in range(ITEMS)), limit=LIMIT, ordered=ordered):
+        count += 1
+    return count
+
+
+def measure(name: str, factory) -> None:
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = asyncio.run(factory())
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<24} {count / elapsed:>12,.0f} items/s  peak {peak / 1e6:>8.1f} MB")
+
+
+def main() -> None:
+    measure("gather_limited", run_gather)
+    measure("stream_limited", lambda: run_stream(False))
+    measure("stream_limited ordered", lambda: run_stream(True))
+
+
+if __name__ == "__main__":
+    main()
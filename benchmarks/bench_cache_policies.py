@@ -0,0 +1,87 @@
+"""bench_cache_policies.py
+Replay synthetic access traces against each eviction policy in
+:mod:`general.cache_policies` and report hit ratio and lookups per second.
+
+Traces
+------
+``zipf``       Skewed popularity (s=1.0) over 50k keys.
+``zipf+scan``  The same workload interrupted by long one-off sequential scans.
+``loop``       A cyclic scan slightly larger than the cache (LRU worst case).
+
+Run from the repository root::
+
+    python benchmarks/bench_cache_policies.py
+"""
+from __future__ import annotations
+
+import bisect
+import itertools
+import pathlib
+import random
+import sys
+import time
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from general.memoize_cache import MemoizeCache  # noqa: E402
+
+CACHE_SIZE = 1000
+TRACE_LENGTH = 200_000
+POLICIES = (None, "tinylfu", "arc")
+
+
+def zipf_trace(rng: random.Random, keys: int = 50_000, s: float = 1.0) -> list[int]:
+    weights = [1.0 / (rank**s) for rank in range(1, keys + 1)]
+    cumulative = list(itertools.accumulate(weights))
+    total = cumulative[-1]
+    return [bisect.bisect_left(cumulative, rng.random() * total) for _ in range(TRACE_LENGTH)]
+
+
+def zipf_scan_trace(rng: random.Random) -> list[int]:
+    trace = zipf_trace(rng)
+    scan_key = 10_000_000
+    out: list[int] = []
+    for index, key in enumerate(trace):
+        out.append(key)
+        if index % 20_000 == 19_999:
+            out.extend(range(scan_key, scan_key + 5 * CACHE_SIZE))
+            scan_key += 5 * CACHE_SIZE
+    return out
+
+
+def loop_trace(_: random.Random) -> list[int]:
+    span = int(CACHE_SIZE * 1.2)
+    return [i % span for i in range(TRACE_LENGTH)]
+
+
+def replay(trace: list[int], policy: str | None) -> tuple[float, float]:
+    cache: MemoizeCache[int, int] = MemoizeCache(maxsize=CACHE_SIZE, policy=policy)
+    misses = 0
+
+    def factory() -> int:
+        nonlocal misses
+        misses += 1
+        return 0
+
+    get = cache.get
+    start = time.perf_counter()
+    for key in trace:
+        get(key, factory)
+    elapsed = time.perf_counter() - start
+    return 1 - misses / len(trace), len(trace) / elapsed
+
+
+def main() -> None:
+    rng = random.Random(42)
+    traces = {"zipf": zipf_trace(rng), "zipf+scan": zipf_scan_trace(rng), "loop": loop_trace(rng)}
+    print(f"{'trace':<10} {'policy':<8} {'hit ratio':>9} {'ops/s':>12}")
+    for name, trace in traces.items():
+        for policy in POLICIES:
+            ratio, ops = replay(trace, policy)
+            print(f"{name:<10} {policy or 'lru':<8} {ratio:>9.3f} {ops:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
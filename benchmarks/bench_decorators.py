@@ -0,0 +1,80 @@
+"""bench_decorators.py
+Per-call overhead of :func:`python.decorators.log_calls` compared with the
+original eager f-string implementation.
+
+Cases: no logger attached, a logger that is disabled, an enabled logger with
+small arguments (text and structured), and an enabled logger with a 1 MB
+``bytes`` argument. Run from the repository root::
+
+    python benchmarks/bench_decorators.py
+"""
+from __future__ import annotations
+
+import pathlib
+import sys
+import time
+from functools import wraps
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from python import decorators as mod  # noqa: E402
+
+CALLS = 100_000
+HUGE = b"\x00" * 1_000_000
+
+
+def legacy_log_calls(logger=None):
+    """The original implementation, kept for comparison."""
+
+    def decorator(func):
+        log = logger or (lambda message: None)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            log(f"call {func.__name__} args={args} kwargs={kwargs}")
+            result = func(*args, **kwargs)
+            log(f"return {func.__name__} -> {result!r}")
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def _discard(message, **fields) -> None:
+    pass
+
+
+def _target(payload, flag=False):
+    return flag
+
+
+def _rate(decorated, payload, calls: int = CALLS) -> float:
+    func = decorated(_target)
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(payload, flag=True)
+    return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    small = {"id": 7, "tags": ["a", "b"]}
+    rows = [
+        ("no logger (legacy)", _rate(legacy_log_calls(), small)),
+        ("no logger", _rate(mod.log_calls(), small)),
+        ("disabled logger", _rate(mod.log_calls(_discard, enabled=lambda: False), small)),
+        ("enabled, small (legacy)", _rate(legacy_log_calls(_discard), small)),
+        ("enabled, small", _rate(mod.log_calls(_discard), small)),
+        ("enabled, small, max_repr=None", _rate(mod.log_calls(_discard, max_repr=None), small)),
+        ("enabled, small, structured", _rate(mod.log_calls(_discard, structured=True), small)),
+        ("enabled, 1 MB (legacy)", _rate(legacy_log_calls(_discard), HUGE, calls=50)),
+        ("enabled, 1 MB", _rate(mod.log_calls(_discard), HUGE, calls=50)),
+    ]
+    for name, rate in rows:
+        print(f"{name:<30} {rate:>14,.0f} calls/s")
+
+
+if __name__ == "__main__":
+    main()
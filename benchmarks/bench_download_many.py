@@ -0,0 +1,71 @@
+"""bench_download_many.py
+Throughput of :func:`python.download_url.download_many` against a loop of
+:func:`python.download_url.download_file` for many small files.
+
+A local keep-alive HTTP/1.1 server serves ``FILES`` files of ``SIZE`` bytes.
+The loop opens a new connection per file through :mod:`urllib`; the batch
+API reuses pooled connections. Over loopback there is no TLS and almost no
+latency, and the server shares the interpreter (and the GIL) with the client,
+so extra concurrency barely helps here; real hosts gain more. Run from the
+repository root::
+
+    python benchmarks/bench_download_many.py
+"""
+from __future__ import annotations
+
+import pathlib
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from python import download_url as mod  # noqa: E402
+
+FILES = 500
+SIZE = 4 * 1024
+BODY = b"x" * SIZE
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", str(SIZE))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+
+def measure(name: str, run) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        run(pathlib.Path(directory))
+        elapsed = time.perf_counter() - start
+    print(f"{name:<28} {FILES / elapsed:>10,.0f} files/s")
+
+
+def main() -> None:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    urls = [f"http://127.0.0.1:{server.server_address[1]}/f{index}.bin" for index in range(FILES)]
+    try:
+        measure("download_file loop", lambda d: [mod.download_file(url, d) for url in urls])
+        measure("download_many concurrency=1", lambda d: mod.download_many(urls, d, concurrency=1, per_host=1))
+        measure("download_many concurrency=8", lambda d: mod.download_many(urls, d, concurrency=8, per_host=8))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
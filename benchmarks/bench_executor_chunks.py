@@ -0,0 +1,56 @@
+"""bench_executor_chunks.py
+Throughput of :func:`python.async_tasks.map_in_processes` and
+:func:`python.async_tasks.map_in_threads` for different ``chunksize`` values.
+
+Each item is a short byte string hashed with SHA-256. That work is far
+cheaper than shipping one task to a worker process, so small chunks are
+dominated by IPC overhead. Run from the repository root::
+
+    python benchmarks/bench_executor_chunks.py
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import pathlib
+import sys
+import time
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from python import async_tasks as mod  # noqa: E402
+
+ITEMS = 50_000
+CHUNK_SIZES = (1, 16, 256, 2048)
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+async def consume(iterator) -> int:
+    count = 0
+    async for _ in iterator:
+        count += 1
+    return count
+
+
+def measure(name: str, mapper, chunksize: int) -> None:
+    payload = (i.to_bytes(8, "little") * 8 for i in range(ITEMS))
+    start = time.perf_counter()
+    count = asyncio.run(consume(mapper(digest, payload, max_workers=4, chunksize=chunksize)))
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} chunksize={chunksize:<5} {count / elapsed:>12,.0f} items/s")
+
+
+def main() -> None:
+    for chunksize in CHUNK_SIZES:
+        measure("processes", mod.map_in_processes, chunksize)
+    for chunksize in CHUNK_SIZES:
+        measure("threads", mod.map_in_threads, chunksize)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""bench_logger.py
+Entries per second for :mod:`general.logger` on the common case: a short
+message with a few fields and a couple of ``default_fields``.
+
+The output stream discards data so the numbers reflect formatting and call
+overhead rather than disk speed. Run from the repository root::
+
+    python benchmarks/bench_logger.py
+"""
+from __future__ import annotations
+
+import json
+import pathlib
+import sys
+import time
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from general import logger as mod  # noqa: E402
+
+ENTRIES = 100_000
+DEFAULTS = {"service": "api", "host": "worker-1"}
+
+
+class NullStream:
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+def legacy_log(stream, message: str, **fields) -> None:
+    """The original per-call implementation, kept for comparison."""
+
+    payload = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), "message": message}
+    payload.update(DEFAULTS)
+    payload.update(fields)
+    stream.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    stream.flush()
+
+
+def _rate(call) -> float:
+    start = time.perf_counter()
+    for i in range(ENTRIES):
+        call("request handled", status=200, path="/items", elapsed_ms=i)
+    return ENTRIES / (time.perf_counter() - start)
+
+
+def main() -> None:
+    stream = NullStream()
+    rows = [("legacy dict + json.dumps", _rate(lambda m, **f: legacy_log(stream, m, **f)))]
+    rows.append(("StructuredLogger json", _rate(mod.StructuredLogger(stream=stream, default_fields=DEFAULTS).log)))
+    if mod.orjson is not None:
+        fast = mod.StructuredLogger(stream=stream, default_fields=DEFAULTS, encoder="orjson")
+        rows.append(("StructuredLogger orjson", _rate(fast.log)))
+    quiet = mod.StructuredLogger(stream=stream, default_fields=DEFAULTS, level=mod.WARNING)
+    rows.append(("debug below level", _rate(quiet.debug)))
+    with mod.BufferedStructuredLogger(stream=stream, default_fields=DEFAULTS) as buffered:
+        rows.append(("Buffered (encode + enqueue)", _rate(buffered.log)))
+    for name, rate in rows:
+        print(f"{name:<26} {rate:>12,.0f} entries/s")
+
+
+if __name__ == "__main__":
+    main()
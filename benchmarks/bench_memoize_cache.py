@@ -0,0 +1,70 @@
+"""bench_memoize_cache.py
+Measure cache-hit throughput of :mod:`general.memoize_cache` from 1 to 32 threads.
+
+Compares a plain :class:`MemoizeCache` guarded by one global lock with the
+sharded :class:`ConcurrentMemoizeCache`. Run from the repository root::
+
+    python benchmarks/bench_memoize_cache.py
+"""
+from __future__ import annotations
+
+import pathlib
+import sys
+import threading
+import time
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from general.memoize_cache import ConcurrentMemoizeCache, MemoizeCache  # noqa: E402
+
+KEYS = 1024
+OPS_PER_THREAD = 50_000
+THREAD_COUNTS = (1, 2, 4, 8, 16, 32)
+
+
+class LockedCache:
+    """Baseline: a single lock around every ``MemoizeCache.get`` call."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cache: MemoizeCache[int, int] = MemoizeCache(maxsize=KEYS)
+
+    def get(self, key, factory):
+        with self._lock:
+            return self._cache.get(key, factory)
+
+
+def _run(cache, threads: int) -> float:
+    for key in range(KEYS):
+        cache.get(key, lambda key=key: key)
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(offset: int) -> None:
+        get = cache.get
+        barrier.wait()
+        for i in range(OPS_PER_THREAD):
+            get((i + offset) % KEYS, int)
+
+    pool = [threading.Thread(target=worker, args=(n * 7,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return threads * OPS_PER_THREAD / elapsed
+
+
+def main() -> None:
+    print(f"{'threads':>7} {'locked ops/s':>14} {'sharded ops/s':>14}")
+    for threads in THREAD_COUNTS:
+        locked = _run(LockedCache(), threads)
+        sharded = _run(ConcurrentMemoizeCache(maxsize=KEYS * 2, shards=16), threads)
+        print(f"{threads:>7} {locked:>14,.0f} {sharded:>14,.0f}")
+
+
+if __name__ == "__main__":
+    main()
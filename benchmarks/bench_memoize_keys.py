@@ -0,0 +1,77 @@
+"""bench_memoize_keys.py
+Per-call overhead of :func:`general.memoize_cache.memoize` cache hits compared
+with :func:`functools.lru_cache` for common argument shapes.
+
+Run from the repository root::
+
+    python benchmarks/bench_memoize_keys.py
+"""
+from __future__ import annotations
+
+import functools
+import pathlib
+import sys
+import timeit
+
+REPO_ROOT = pathlib.Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from general.memoize_cache import memoize  # noqa: E402
+
+NUMBER = 200_000
+
+
+def _target(*args, **kwargs):
+    return 0
+
+
+def _legacy_memoize(func):
+    """The original ``(args, frozenset(kwargs.items()))`` key for comparison."""
+
+    cache = {}
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (args, frozenset(kwargs.items()))
+        try:
+            return cache[key]
+        except KeyError:
+            value = cache[key] = func(*args, **kwargs)
+            return value
+
+    return wrapper
+
+
+CASES = {
+    "one int": ((7,), {}),
+    "three args": ((1, "a", 2.5), {}),
+    "kwargs": ((1,), {"mode": "fast", "limit": 10}),
+}
+
+DECORATORS = {
+    "lru_cache": functools.lru_cache(maxsize=128),
+    "lru_cache typed": functools.lru_cache(maxsize=128, typed=True),
+    "legacy key dict": _legacy_memoize,
+    "memoize": memoize(maxsize=128),
+    "memoize typed": memoize(maxsize=128, typed=True),
+}
+
+
+def main() -> None:
+    print(f"{'case':<14} {'decorator':<16} {'ns/call':>8}")
+    for case, (args, kwargs) in CASES.items():
+        for name, decorator in DECORATORS.items():
+            fn = decorator(_target)
+            fn(*args, **kwargs)
+            seconds = timeit.timeit(lambda: fn(*args, **kwargs), number=NUMBER)
+            print(f"{case:<14} {name:<16} {seconds / NUMBER * 1e9:>8.0f}")
+    unhashable = memoize(maxsize=128)(_target)
+    payload = ([1, 2, 3], {"k": "v"})
+    unhashable(*payload)
+    seconds = timeit.timeit(lambda: unhashable(*payload), number=NUMBER)
+    print(f"{'list+dict':<14} {'memoize':<16} {seconds / NUMBER * 1e9:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,11 @@ from __future__ import annotations
 from python import download_url as _impl
 
 __doc__ = _impl.__doc__
+ChecksumMismatchError = _impl.ChecksumMismatchError
+DownloadCache = _impl.DownloadCache
 FileDownloadError = _impl.FileDownloadError
+download_and_hash = _impl.download_and_hash
 download_file = _impl.download_file
+download_many = _impl.download_many
 
 __all__ = _impl.__all__
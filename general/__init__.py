@@ -1,14 +1,20 @@
 """Convenience imports for general-purpose snippets."""
 
-from . import cli_args, datetime_utils, env_vars, load_config, memoize_cache, parse_json_xml, retry_backoff, timer, uuid_gen
+from . import cache_keys, cache_policies, cache_stats, circuit_breaker, cli_args, datetime_utils, disk_cache, env_vars, load_config, memoize_cache, metrics, parse_json_xml, retry_backoff, timer, uuid_gen
 from .read_write_file import *  # noqa: F401,F403
 
 __all__ = [
+    "cache_keys",
+    "cache_policies",
+    "cache_stats",
+    "circuit_breaker",
     "cli_args",
     "datetime_utils",
+    "disk_cache",
     "env_vars",
     "load_config",
     "memoize_cache",
+    "metrics",
     "parse_json_xml",
     "retry_backoff",
     "timer",
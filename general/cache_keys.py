@@ -0,0 +1,151 @@
+"""Cache key construction for :mod:`general.memoize_cache`.
+
+:class:`KeyBuilder` turns ``(args, kwargs)`` into a hashable key with as little
+work as possible on the common path:
+
+* a single ``int``/``str`` positional argument is used as the key directly;
+* positional-only calls reuse the ``args`` tuple without copying it;
+* keyword calls append a marker and the ``(name, value)`` items in one step;
+* arguments that turn out to be unhashable (lists, dicts, sets, NumPy arrays,
+  ``bytearray``) are frozen structurally instead of raising ``TypeError``, and
+  large binary payloads are replaced by a content digest.
+
+Usage example
+-------------
+>>> from general.cache_keys import KeyBuilder
+>>> build = KeyBuilder()
+>>> build((1,), {})
+1
+>>> build(([1, 2], {"a": 1}), {}) == build(([1, 2], {"a": 1}), {})
+True
+>>> KeyBuilder(typed=True)((1,), {}) == KeyBuilder(typed=True)((1.0,), {})
+False
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Callable, Hashable, Mapping
+from typing import Any
+
+__all__ = ["KeyBuilder", "content_digest"]
+
+
+class _KeyMarker:
+    """Named singleton separating or tagging parts of a key."""
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __repr__(self) -> str:
+        return f"<{self.name}>"
+
+
+_KWD_MARK = _KeyMarker("kwargs")
+_LIST = _KeyMarker("list")
+_DICT = _KeyMarker("dict")
+_SET = _KeyMarker("set")
+_DIGEST = _KeyMarker("digest")
+
+_FAST_TYPES = frozenset({int, str})
+
+
+def content_digest(data: bytes | bytearray | memoryview) -> str:
+    """Return a short BLAKE2b hex digest of ``data``."""
+
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class KeyBuilder:
+    """Build cache keys from call arguments.
+
+    Parameters
+    ----------
+    typed:
+        Treat arguments of different types as distinct (``f(1)`` vs ``f(1.0)``),
+        mirroring :func:`functools.lru_cache`.
+    hashers:
+        Mapping of type to a function returning a hashable stand-in, consulted
+        when freezing unhashable arguments, e.g. ``{MyFrame: lambda f: f.version}``.
+    digest_threshold:
+        ``bytes`` arguments, positional or keyword, at least this long are
+        replaced by a digest so the key does not keep large payloads alive.
+        ``None`` (default) skips the scan on the fast path; unhashable binary
+        data is always digested.
+
+    Keyword arguments are keyed by name, so ``f(a=1, b=2)`` and
+    ``f(b=2, a=1)`` share an entry.
+    """
+
+    __slots__ = ("typed", "hashers", "digest_threshold")
+
+    def __init__(
+        self,
+        *,
+        typed: bool = False,
+        hashers: Mapping[type, Callable[[Any], Hashable]] | None = None,
+        digest_threshold: int | None = None,
+    ) -> None:
+        self.typed = typed
+        self.hashers = dict(hashers or {})
+        self.digest_threshold = digest_threshold
+
+    def __call__(self, args: tuple[Any, ...], kwargs: Mapping[str, Any]) -> Hashable:
+        if kwargs:
+            items = sorted(kwargs.items()) if len(kwargs) > 1 else tuple(kwargs.items())
+            key = (*args, _KWD_MARK, *items)
+        else:
+            key = args
+        if self.typed:
+            key += tuple(map(type, args))
+            if kwargs:
+                key += tuple(type(value) for _, value in items)
+        elif len(key) == 1 and type(key[0]) in _FAST_TYPES:
+            return key[0]
+        if self.digest_threshold is not None:
+            # Keyword values sit inside (name, value) items right after the marker.
+            digest, first, last = self._maybe_digest, len(args), len(args) + len(kwargs)
+            key = tuple(
+                (part[0], digest(part[1])) if first < index <= last else digest(part) for index, part in enumerate(key)
+            )
+        try:
+            hash(key)
+        except TypeError:
+            return tuple(self.freeze(part) for part in key)
+        return key
+
+    def _maybe_digest(self, value: Any) -> Any:
+        if type(value) is bytes and len(value) >= self.digest_threshold:  # type: ignore[operator]
+            return (_DIGEST, content_digest(value))
+        return value
+
+    def freeze(self, value: Any) -> Hashable:
+        """Return a hashable, equality-preserving stand-in for ``value``."""
+
+        hasher = self.hashers.get(type(value))
+        if hasher is not None:
+            return hasher(value)
+        if isinstance(value, (list, tuple)):
+            frozen = tuple(self.freeze(item) for item in value)
+            return (_LIST, *frozen) if isinstance(value, list) else frozen
+        if isinstance(value, dict):
+            return (_DICT, frozenset((self.freeze(k), self.freeze(v)) for k, v in value.items()))
+        if isinstance(value, (set, frozenset)):
+            frozen_set = frozenset(self.freeze(item) for item in value)
+            return (_SET, frozen_set) if isinstance(value, set) else frozen_set
+        if isinstance(value, (bytearray, memoryview)):
+            return (_DIGEST, content_digest(value))
+        if type(value) is bytes and self.digest_threshold is not None and len(value) >= self.digest_threshold:
+            return (_DIGEST, content_digest(value))
+        if _is_ndarray(value):
+            return (_DIGEST, value.dtype.str, value.shape, content_digest(value.tobytes()))
+        hash(value)
+        return value
+
+
+def _is_ndarray(value: Any) -> bool:
+    # Duck-typed so NumPy stays an optional dependency.
+    cls = type(value)
+    return cls.__module__ == "numpy" and cls.__name__ == "ndarray"
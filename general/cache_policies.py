@@ -0,0 +1,295 @@
+"""Pluggable eviction policies for :class:`general.memoize_cache.MemoizeCache`.
+
+A policy only tracks keys; the cache owns the values. The cache reports every
+insert, hit and external removal (expiry, ``clear``) to the policy and, while it
+is over its entry or byte budget, repeatedly asks :meth:`EvictionPolicy.victim`
+which key to drop. A policy may return the key that was just inserted, which
+acts as an admission rejection.
+
+Available policies
+------------------
+``"lru"``      :class:`LRUPolicy` – least recently used, the cache default.
+``"tinylfu"``  :class:`TinyLFUPolicy` – W-TinyLFU: a small LRU window in front
+               of a segmented LRU whose admissions are filtered by a
+               count-min frequency sketch. Resists scans and one-hit wonders.
+``"arc"``      :class:`ARCPolicy` – adaptive replacement cache balancing a
+               recency list against a frequency list using ghost entries.
+
+Usage example
+-------------
+>>> from general.cache_policies import make_policy
+>>> policy = make_policy("arc")
+>>> policy.bind(2)
+>>> for key in "ab":
+...     policy.on_insert(key)
+>>> policy.on_access("a")
+>>> policy.on_insert("c")
+>>> policy.victim()
+'b'
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+__all__ = ["ARCPolicy", "CountMinSketch", "EvictionPolicy", "LRUPolicy", "TinyLFUPolicy", "make_policy"]
+
+
+class EvictionPolicy(ABC):
+    """Base class for eviction policies.
+
+    Subclasses implement the ``on_*`` hooks, :meth:`victim` and :meth:`clear`;
+    a subclass missing any of them cannot be instantiated. ``bind`` is called
+    once by the cache with its entry capacity before first use.
+    """
+
+    capacity: int = 0
+
+    def bind(self, capacity: int) -> None:
+        self.capacity = capacity
+
+    @abstractmethod
+    def on_insert(self, key: Hashable) -> None: ...
+
+    @abstractmethod
+    def on_access(self, key: Hashable) -> None: ...
+
+    @abstractmethod
+    def on_remove(self, key: Hashable) -> None: ...
+
+    @abstractmethod
+    def victim(self) -> Hashable:
+        """Forget and return the key that should be evicted next."""
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+
+class LRUPolicy(EvictionPolicy):
+    """Evict the least recently used key."""
+
+    def __init__(self) -> None:
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def on_insert(self, key: Hashable) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def on_access(self, key: Hashable) -> None:
+        self._order.move_to_end(key)
+
+    def on_remove(self, key: Hashable) -> None:
+        self._order.pop(key, None)
+
+    def victim(self) -> Hashable:
+        return self._order.popitem(last=False)[0]
+
+    def clear(self) -> None:
+        self._order.clear()
+
+
+class CountMinSketch:
+    """Four-row count-min sketch with 4-bit saturating counters and periodic aging.
+
+    After ``sample_size`` increments (default ``10 * width``) every counter is
+    halved so that the sketch tracks recent rather than all-time popularity.
+    """
+
+    _SEEDS = (0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93)
+    _MAX = 15
+
+    def __init__(self, width: int, sample_size: int | None = None) -> None:
+        size = 16
+        while size < width:
+            size <<= 1
+        self._mask = size - 1
+        self._rows = [[0] * size for _ in self._SEEDS]
+        self._additions = 0
+        self._reset_at = sample_size or 10 * size
+
+    def _indexes(self, key: Hashable) -> list[int]:
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        mask = self._mask
+        return [(((h ^ seed) * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32 & mask for seed in self._SEEDS]
+
+    def increment(self, key: Hashable) -> None:
+        for row, index in zip(self._rows, self._indexes(key)):
+            if row[index] < self._MAX:
+                row[index] += 1
+        self._additions += 1
+        if self._additions >= self._reset_at:
+            self._age()
+
+    def estimate(self, key: Hashable) -> int:
+        return min(row[index] for row, index in zip(self._rows, self._indexes(key)))
+
+    def _age(self) -> None:
+        for row in self._rows:
+            for index, value in enumerate(row):
+                row[index] = value >> 1
+        self._additions //= 2
+
+
+class TinyLFUPolicy(EvictionPolicy):
+    """W-TinyLFU: LRU admission window + frequency-filtered segmented LRU.
+
+    Parameters
+    ----------
+    window_ratio:
+        Share of the capacity given to the admission window (default 1%).
+    protected_ratio:
+        Share of the main region reserved for the protected segment.
+    """
+
+    def __init__(self, *, window_ratio: float = 0.01, protected_ratio: float = 0.8) -> None:
+        self.window_ratio = window_ratio
+        self.protected_ratio = protected_ratio
+        self._window: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._probation: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._protected: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._sketch = CountMinSketch(16)
+        self._window_cap = 1
+        self._main_cap = 0
+        self._protected_cap = 0
+
+    def bind(self, capacity: int) -> None:
+        super().bind(capacity)
+        self._window_cap = max(1, int(capacity * self.window_ratio))
+        self._main_cap = max(0, capacity - self._window_cap)
+        self._protected_cap = int(self._main_cap * self.protected_ratio)
+        self._sketch = CountMinSketch(4 * capacity, 10 * capacity)
+
+    def on_insert(self, key: Hashable) -> None:
+        self._sketch.increment(key)
+        self._window[key] = None
+
+    def on_access(self, key: Hashable) -> None:
+        self._sketch.increment(key)
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+            if len(self._protected) > self._protected_cap:
+                demoted = self._protected.popitem(last=False)[0]
+                self._probation[demoted] = None
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+
+    def on_remove(self, key: Hashable) -> None:
+        for segment in (self._window, self._probation, self._protected):
+            if segment.pop(key, _ABSENT) is not _ABSENT:
+                return
+
+    def _main_victim_segment(self) -> "OrderedDict[Hashable, None]":
+        return self._probation if self._probation else self._protected
+
+    def victim(self) -> Hashable:
+        while self._window and (len(self._window) > self._window_cap or not (self._probation or self._protected)):
+            candidate = self._window.popitem(last=False)[0]
+            if len(self._probation) + len(self._protected) < self._main_cap:
+                self._probation[candidate] = None
+                continue
+            segment = self._main_victim_segment()
+            if not segment:
+                return candidate
+            incumbent = next(iter(segment))
+            if self._sketch.estimate(candidate) > self._sketch.estimate(incumbent):
+                del segment[incumbent]
+                self._probation[candidate] = None
+                return incumbent
+            return candidate
+        segment = self._main_victim_segment()
+        if segment:
+            return segment.popitem(last=False)[0]
+        return self._window.popitem(last=False)[0]
+
+    def clear(self) -> None:
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+        self._sketch = CountMinSketch(4 * self.capacity, 10 * self.capacity or None)
+
+
+class ARCPolicy(EvictionPolicy):
+    """Adaptive Replacement Cache (Megiddo & Modha).
+
+    ``T1`` holds keys seen once recently, ``T2`` keys seen at least twice.
+    Ghost lists ``B1``/``B2`` remember recently evicted keys and steer the
+    target size ``p`` of ``T1``.
+    """
+
+    def __init__(self) -> None:
+        self._t1: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._t2: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._b1: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._b2: "OrderedDict[Hashable, None]" = OrderedDict()
+        self._p = 0
+
+    def on_insert(self, key: Hashable) -> None:
+        if key in self._b1:
+            self._p = min(self.capacity, self._p + max(len(self._b2) // len(self._b1), 1))
+            del self._b1[key]
+            self._t2[key] = None
+        elif key in self._b2:
+            self._p = max(0, self._p - max(len(self._b1) // len(self._b2), 1))
+            del self._b2[key]
+            self._t2[key] = None
+        else:
+            self._t1[key] = None
+        self._trim_ghosts()
+
+    def on_access(self, key: Hashable) -> None:
+        if key in self._t1:
+            del self._t1[key]
+            self._t2[key] = None
+        else:
+            self._t2.move_to_end(key)
+
+    def on_remove(self, key: Hashable) -> None:
+        if self._t1.pop(key, _ABSENT) is _ABSENT:
+            self._t2.pop(key, None)
+
+    def victim(self) -> Hashable:
+        if self._t1 and (len(self._t1) > self._p or not self._t2):
+            key = self._t1.popitem(last=False)[0]
+            self._b1[key] = None
+        else:
+            key = self._t2.popitem(last=False)[0]
+            self._b2[key] = None
+        self._trim_ghosts()
+        return key
+
+    def _trim_ghosts(self) -> None:
+        capacity = self.capacity
+        while self._b1 and len(self._t1) + len(self._b1) > capacity:
+            self._b1.popitem(last=False)
+        while self._b2 and len(self._t1) + len(self._t2) + len(self._b1) + len(self._b2) > 2 * capacity:
+            self._b2.popitem(last=False)
+
+    def clear(self) -> None:
+        for segment in (self._t1, self._t2, self._b1, self._b2):
+            segment.clear()
+        self._p = 0
+
+
+_ABSENT = object()
+
+_POLICIES: dict[str, Callable[[], EvictionPolicy]] = {
+    "lru": LRUPolicy,
+    "tinylfu": TinyLFUPolicy,
+    "arc": ARCPolicy,
+}
+
+
+def make_policy(policy: str | Callable[[], EvictionPolicy]) -> EvictionPolicy:
+    """Instantiate ``policy`` from a registered name or a zero-argument factory."""
+
+    if isinstance(policy, str):
+        try:
+            return _POLICIES[policy]()
+        except KeyError as exc:
+            raise ValueError(f"Unknown eviction policy: {policy!r}") from exc
+    return policy()
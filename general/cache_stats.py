@@ -0,0 +1,200 @@
+"""Counters, latency histograms and hot-key tracking for in-memory caches.
+
+:class:`CacheStats` is the optional statistics surface used by
+:mod:`general.memoize_cache`. Caches only touch it when statistics are
+enabled, so a cache constructed without ``stats=True`` pays a single ``None``
+check per lookup.
+
+Usage example
+-------------
+>>> from general.cache_stats import CacheStats
+>>> stats = CacheStats(top_k=2, sample_every=1)
+>>> for key in "aab":
+...     stats.record_hit(key)
+>>> stats.record_miss("c")
+>>> stats.as_dict()["hits"], stats.hot_keys()[0]
+(3, ('a', 2))
+"""
+
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable
+from typing import Any, Protocol
+
+__all__ = ["CacheStats", "LatencyHistogram", "SpaceSaving"]
+
+
+class _SupportsLog(Protocol):
+    def log(self, message: str, **fields: Any) -> None: ...
+
+
+class LatencyHistogram:
+    """Power-of-two bucketed histogram of durations measured in seconds.
+
+    Bucket ``i`` counts samples whose duration in microseconds has bit length
+    ``i`` which keeps memory constant regardless of the number of samples.
+    """
+
+    __slots__ = ("counts", "count", "total")
+
+    BUCKETS = 40
+
+    def __init__(self) -> None:
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        micros = int(seconds * 1_000_000)
+        index = micros.bit_length() if micros > 0 else 0
+        self.counts[min(index, self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, value in enumerate(other.counts):
+            self.counts[index] += value
+        self.count += other.count
+        self.total += other.total
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return ``count``, ``mean_s`` and non-empty ``buckets`` keyed by upper bound in µs."""
+
+        buckets = {str(1 << index): value for index, value in enumerate(self.counts) if value}
+        mean = self.total / self.count if self.count else 0.0
+        return {"count": self.count, "mean_s": mean, "buckets_le_us": buckets}
+
+
+class SpaceSaving:
+    """Approximate top-K frequency tracker (Metwally et al. space-saving).
+
+    At most ``capacity`` counters are kept. When a new key arrives and the table
+    is full, the key with the smallest count is replaced and the newcomer
+    inherits that count plus one, so counts are over-estimates bounded by the
+    minimum counter.
+    """
+
+    __slots__ = ("capacity", "counts")
+
+    def __init__(self, capacity: int) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self.counts: dict[Hashable, int] = {}
+
+    def add(self, key: Hashable, weight: int = 1) -> None:
+        counts = self.counts
+        if key in counts:
+            counts[key] += weight
+        elif len(counts) < self.capacity:
+            counts[key] = weight
+        else:
+            victim = min(counts, key=counts.__getitem__)
+            counts[key] = counts.pop(victim) + weight
+
+    def top(self, n: int | None = None) -> list[tuple[Hashable, int]]:
+        ranked = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return ranked if n is None else ranked[:n]
+
+
+class CacheStats:
+    """Mutable statistics for a single cache.
+
+    Parameters
+    ----------
+    top_k:
+        Number of hot keys to track. ``0`` disables hot-key tracking.
+    sample_every:
+        Feed only every ``n``-th access to the hot-key tracker which keeps the
+        per-lookup overhead low on busy caches.
+    """
+
+    __slots__ = ("hits", "misses", "coalesced", "evictions", "expirations", "factory_latency", "_hot", "_sample_every", "_tick")
+
+    def __init__(self, *, top_k: int = 10, sample_every: int = 16) -> None:
+        if sample_every <= 0:
+            raise ValueError("sample_every must be positive")
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.factory_latency = LatencyHistogram()
+        self._hot = SpaceSaving(top_k) if top_k else None
+        self._sample_every = sample_every
+        self._tick = 0
+
+    def record_hit(self, key: Hashable) -> None:
+        self.hits += 1
+        self._sample(key)
+
+    def record_miss(self, key: Hashable) -> None:
+        self.misses += 1
+        self._sample(key)
+
+    def record_factory(self, seconds: float) -> None:
+        self.factory_latency.record(seconds)
+
+    def _sample(self, key: Hashable) -> None:
+        if self._hot is None:
+            return
+        self._tick += 1
+        if self._tick >= self._sample_every:
+            self._tick = 0
+            self._hot.add(key, self._sample_every)
+
+    def hot_keys(self, n: int | None = None) -> list[tuple[Hashable, int]]:
+        """Return ``(key, estimated_accesses)`` pairs, hottest first."""
+
+        return [] if self._hot is None else self._hot.top(n)
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / total if total else 0.0
+
+    def reset(self) -> None:
+        top_k = self._hot.capacity if self._hot is not None else 0
+        self.__init__(top_k=top_k, sample_every=self._sample_every)  # type: ignore[misc]
+
+    @classmethod
+    def merged(cls, parts: Iterable["CacheStats"]) -> "CacheStats":
+        """Combine per-shard statistics into a single :class:`CacheStats`."""
+
+        parts = list(parts)
+        top_k = max((p._hot.capacity for p in parts if p._hot is not None), default=0)
+        sample_every = parts[0]._sample_every if parts else 16
+        combined = cls(top_k=top_k, sample_every=sample_every)
+        for part in parts:
+            combined.hits += part.hits
+            combined.misses += part.misses
+            combined.coalesced += part.coalesced
+            combined.evictions += part.evictions
+            combined.expirations += part.expirations
+            combined.factory_latency.merge(part.factory_latency)
+            if combined._hot is not None:
+                for key, count in part.hot_keys():
+                    combined._hot.add(key, count)
+        return combined
+
+    def as_dict(self, *, size: int | None = None) -> dict[str, Any]:
+        """Return a JSON-serialisable snapshot; hot keys are rendered with ``repr``."""
+
+        data: dict[str, Any] = {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": self.hit_ratio,
+            "factory_latency": self.factory_latency.as_dict(),
+            "hot_keys": [[repr(key), count] for key, count in self.hot_keys()],
+        }
+        if size is not None:
+            data["size"] = size
+        return data
+
+    def log_to(self, logger: _SupportsLog, message: str = "cache_stats", *, size: int | None = None) -> None:
+        """Emit the snapshot as one entry, e.g. via :class:`general.logger.StructuredLogger`."""
+
+        logger.log(message, **self.as_dict(size=size))
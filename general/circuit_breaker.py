@@ -0,0 +1,285 @@
+"""Circuit breaker that fails fast while a dependency is down.
+
+:class:`CircuitBreaker` counts outcomes in a rolling time window. Once at
+least ``min_calls`` calls were seen and the share of failures reaches
+``failure_rate`` the circuit *opens* and every call raises
+:class:`CircuitOpenError` immediately. After ``reset_timeout`` seconds it goes
+*half-open* and lets ``half_open_calls`` trial calls through: if they all
+succeed the circuit *closes* again, a single failure re-opens it.
+
+:class:`general.retry_backoff.RetryConfig` accepts ``breaker=`` so each
+attempt goes through the breaker and an open circuit ends the retry loop, and
+the HTTP helpers in :mod:`python.download_url` and :mod:`python.bot_messaging`
+take the same argument.
+
+Usage example
+-------------
+>>> from general.circuit_breaker import CircuitBreaker, CircuitOpenError
+>>> transitions = []
+>>> breaker = CircuitBreaker(min_calls=2, failure_rate=0.5,
+...                          on_state_change=lambda name, old, new: transitions.append(new))
+>>> def down():
+...     raise ConnectionError("refused")
+>>> for _ in range(2):
+...     try:
+...         breaker.call(down)
+...     except ConnectionError:
+...         pass
+>>> breaker.state, transitions
+('open', ['open'])
+>>> try:
+...     breaker.call(down)
+... except CircuitOpenError as exc:
+...     print("fail fast")
+fail fast
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import Any, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+StateListener = Callable[[str, str, str], None]
+
+__all__ = ["CLOSED", "HALF_OPEN", "OPEN", "CircuitBreaker", "CircuitOpenError"]
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the dependency while the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit {name!r} is open; retry after {retry_after:.3f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker with a rolling failure window.
+
+    Parameters
+    ----------
+    name:
+        Label passed to ``on_state_change`` and included in errors.
+    failure_rate:
+        Failure share in ``[0, 1]`` at which the circuit opens.
+    min_calls:
+        Calls required within the window before the rate is evaluated.
+    window:
+        Length of the rolling window in seconds.
+    buckets:
+        Number of slices the window is split into; memory is constant.
+    reset_timeout:
+        Seconds the circuit stays open before allowing trial calls.
+    half_open_calls:
+        Concurrent trial calls allowed, all of which must succeed to close.
+    exceptions:
+        Exception types counted as failures. Other exceptions propagate
+        without affecting the circuit.
+    on_state_change:
+        ``callback(name, old_state, new_state)`` invoked after each
+        transition; errors raised by the callback are ignored.
+    clock:
+        Monotonic time source, injectable for tests.
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        *,
+        failure_rate: float = 0.5,
+        min_calls: int = 10,
+        window: float = 30.0,
+        buckets: int = 10,
+        reset_timeout: float = 30.0,
+        half_open_calls: int = 1,
+        exceptions: tuple[type[BaseException], ...] = (Exception,),
+        on_state_change: StateListener | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not 0.0 < failure_rate <= 1.0:
+            raise ValueError("failure_rate must be in (0, 1]")
+        if min_calls <= 0 or buckets <= 0 or window <= 0 or half_open_calls <= 0:
+            raise ValueError("min_calls, buckets, window and half_open_calls must be positive")
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self.exceptions = exceptions
+        self.on_state_change = on_state_change
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._width = window / buckets
+        # Each bucket is [slice_index, successes, failures].
+        self._buckets = [[-1, 0, 0] for _ in range(buckets)]
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout passed."""
+
+        with self._lock:
+            transition = self._maybe_half_open(self.clock())
+            state = self._state
+        self._notify(transition)
+        return state
+
+    def _maybe_half_open(self, now: float) -> tuple[str, str] | None:
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            return self._set_state(HALF_OPEN, now)
+        return None
+
+    def _set_state(self, new: str, now: float) -> tuple[str, str] | None:
+        old = self._state
+        if old == new:
+            return None
+        self._state = new
+        self._trials = 0
+        self._trial_successes = 0
+        if new == OPEN:
+            self._opened_at = now
+        elif new == CLOSED:
+            for bucket in self._buckets:
+                bucket[:] = [-1, 0, 0]
+        return old, new
+
+    def _notify(self, transition: tuple[str, str] | None) -> None:
+        if transition is None or self.on_state_change is None:
+            return
+        try:
+            self.on_state_change(self.name, *transition)
+        except Exception:
+            pass
+
+    def _bucket(self, now: float) -> list[int]:
+        index = int(now / self._width)
+        bucket = self._buckets[index % len(self._buckets)]
+        if bucket[0] != index:
+            bucket[:] = [index, 0, 0]
+        return bucket
+
+    def _totals(self, now: float) -> tuple[int, int]:
+        current = int(now / self._width)
+        size = len(self._buckets)
+        successes = failures = 0
+        for index, ok, failed in self._buckets:
+            if 0 <= current - index < size:
+                successes += ok
+                failures += failed
+        return successes, failures
+
+    def allow(self) -> bool:
+        """Reserve permission for one call; pair it with a ``record_*`` call."""
+
+        with self._lock:
+            now = self.clock()
+            transition = self._maybe_half_open(now)
+            if self._state == CLOSED:
+                allowed = True
+            elif self._state == HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                allowed = True
+            else:
+                self.rejected += 1
+                allowed = False
+        self._notify(transition)
+        return allowed
+
+    def record_success(self) -> None:
+        with self._lock:
+            now = self.clock()
+            transition = None
+            if self._state == HALF_OPEN:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_calls:
+                    transition = self._set_state(CLOSED, now)
+            else:
+                self._bucket(now)[1] += 1
+        self._notify(transition)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = self.clock()
+            transition = None
+            if self._state == HALF_OPEN:
+                transition = self._set_state(OPEN, now)
+            elif self._state == CLOSED:
+                self._bucket(now)[2] += 1
+                successes, failures = self._totals(now)
+                total = successes + failures
+                if total >= self.min_calls and failures >= self.failure_rate * total:
+                    transition = self._set_state(OPEN, now)
+        self._notify(transition)
+
+    def _release(self) -> None:
+        # An ignored exception neither succeeds nor fails a trial call.
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > self._trial_successes:
+                self._trials -= 1
+
+    def _reject(self) -> CircuitOpenError:
+        with self._lock:
+            retry_after = max(0.0, self._opened_at + self.reset_timeout - self.clock()) if self._state == OPEN else 0.0
+        return CircuitOpenError(self.name, retry_after)
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call ``func`` through the breaker or raise :class:`CircuitOpenError`."""
+
+        if not self.allow():
+            raise self._reject()
+        try:
+            result = func(*args, **kwargs)
+        except self.exceptions:
+            self.record_failure()
+            raise
+        except BaseException:
+            self._release()
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Any:
+        """Coroutine counterpart of :meth:`call`."""
+
+        if not self.allow():
+            raise self._reject()
+        try:
+            result = await func(*args, **kwargs)
+        except self.exceptions:
+            self.record_failure()
+            raise
+        except BaseException:
+            self._release()
+            raise
+        self.record_success()
+        return result
+
+    def __call__(self, func: F) -> F:
+        """Use the breaker as a decorator for sync or async functions."""
+
+        if asyncio.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                return await self.acall(func, *args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return self.call(func, *args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
@@ -35,7 +35,7 @@ class Argument:
     """
 
     flag: str
-    *aliases: str
+    aliases: tuple[str, ...] = ()
     help: str | None = None
     action: str | None = None
     default: object | None = None
@@ -0,0 +1,277 @@
+"""SQLite-backed persistent cache tier shared safely between processes.
+
+:class:`DiskCache` stores codec-serialised values in a single SQLite file
+keyed by a stable fingerprint of the cache key, so results survive restarts
+and can be shared by every process on a host. The database runs in WAL mode
+with a busy timeout, which lets concurrent readers proceed while one writer
+commits, and memory-maps the file (``PRAGMA mmap_size``) for cheap reads.
+
+Expiry uses wall-clock time (:func:`time.time`) because monotonic clocks are
+not comparable across processes. Expired rows are deleted when read and by
+:meth:`DiskCache.sweep`.
+
+:func:`general.memoize_cache.memoize` accepts ``disk=`` to put a
+:class:`DiskCache` behind its in-memory LRU.
+
+Usage example
+-------------
+>>> import tempfile, os
+>>> from general.disk_cache import DiskCache
+>>> path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+>>> with DiskCache(path, namespace="demo") as cache:
+...     cache.get_or_compute(("answer", 42), lambda: {"value": 42})
+{'value': 42}
+>>> with DiskCache(path, namespace="demo") as cache:
+...     cache.get(("answer", 42))
+{'value': 42}
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import pickle
+import sqlite3
+import struct
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, Protocol, Union
+
+from .cache_keys import _KeyMarker
+
+PathLike = Union[str, Path]
+
+__all__ = ["Codec", "DiskCache", "JSONCodec", "fingerprint"]
+
+_MISSING: Any = object()
+
+
+class Codec(Protocol):
+    """Serialiser used for values. The :mod:`pickle` module satisfies it."""
+
+    def dumps(self, obj: Any) -> bytes: ...
+
+    def loads(self, data: bytes) -> Any: ...
+
+
+class JSONCodec:
+    """UTF-8 JSON codec for values that must stay readable outside Python."""
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data.decode("utf-8"))
+
+
+def _canonical(obj: Any, out: bytearray) -> None:
+    # Each value is written as a one-byte type tag followed by a length-prefixed
+    # payload, so distinct structures can never produce the same byte string.
+    if obj is None or isinstance(obj, bool):
+        out += b"N" if obj is None else (b"T" if obj else b"F")
+    elif isinstance(obj, int):
+        data = str(obj).encode()
+        out += b"i" + struct.pack(">I", len(data)) + data
+    elif isinstance(obj, float):
+        out += b"f" + struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8", "surrogatepass")
+        out += b"s" + struct.pack(">I", len(data)) + data
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        data = bytes(obj)
+        out += b"b" + struct.pack(">I", len(data)) + data
+    elif isinstance(obj, (tuple, list)):
+        out += (b"t" if isinstance(obj, tuple) else b"l") + struct.pack(">I", len(obj))
+        for item in obj:
+            _canonical(item, out)
+    elif isinstance(obj, (frozenset, set, dict)):
+        items = obj.items() if isinstance(obj, dict) else obj
+        parts = []
+        for item in items:
+            buf = bytearray()
+            _canonical(item, buf)
+            parts.append(bytes(buf))
+        out += (b"d" if isinstance(obj, dict) else b"S") + struct.pack(">I", len(parts))
+        for part in sorted(parts):
+            out += part
+    elif isinstance(obj, _KeyMarker):
+        data = obj.name.encode()
+        out += b"M" + struct.pack(">I", len(data)) + data
+    elif isinstance(obj, type):
+        data = f"{obj.__module__}.{obj.__qualname__}".encode()
+        out += b"y" + struct.pack(">I", len(data)) + data
+    else:
+        raise TypeError(f"Cannot fingerprint key component of type {type(obj).__name__}")
+
+
+def fingerprint(key: Any) -> str:
+    """Return a hex digest of ``key`` that is identical across processes.
+
+    Unlike :func:`hash`, the result does not depend on ``PYTHONHASHSEED`` or
+    set iteration order. Supported components are ``None``, ``bool``, ``int``,
+    ``float``, ``str``, ``bytes``, classes, :class:`~general.cache_keys.KeyBuilder`
+    markers and tuples, lists, sets and dicts of them.
+    """
+
+    buf = bytearray()
+    _canonical(key, buf)
+    return hashlib.blake2b(bytes(buf), digest_size=20).hexdigest()
+
+
+class DiskCache:
+    """Persistent key/value cache stored in a SQLite database file.
+
+    Parameters
+    ----------
+    path:
+        Database file; parent directories are created on demand.
+    namespace:
+        Logical partition inside the file, e.g. one per memoised function.
+    ttl:
+        Seconds an entry stays valid. ``None`` keeps entries until cleared.
+    codec:
+        Object with ``dumps``/``loads``; defaults to :mod:`pickle`.
+    clock:
+        Wall-clock time source, injectable for tests.
+    timeout:
+        Seconds to wait for a lock held by another process.
+    mmap_size:
+        Bytes of the database file SQLite may memory-map.
+
+    Attributes
+    ----------
+    skipped:
+        Lenient :meth:`get_or_compute` calls whose key could not be
+        fingerprinted and so bypassed the disk.
+    """
+
+    def __init__(
+        self,
+        path: PathLike,
+        *,
+        namespace: str = "default",
+        ttl: float | None = None,
+        codec: Codec | Any = pickle,
+        clock: Callable[[], float] = time.time,
+        timeout: float = 30.0,
+        mmap_size: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.namespace = namespace
+        self.ttl = ttl
+        self.codec = codec
+        self.clock = clock
+        self.skipped = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL,"
+            " fingerprint TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL,"
+            " PRIMARY KEY (namespace, fingerprint))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_expiry ON cache_entries (expires_at)")
+
+    def get(self, key: Any, default: Any = _MISSING) -> Any:
+        """Return the stored value for ``key``; raise :class:`KeyError` unless ``default`` is given."""
+
+        value = self._lookup(fingerprint(key))
+        if value is _MISSING:
+            if default is _MISSING:
+                raise KeyError(key)
+            return default
+        return value
+
+    def _lookup(self, fp: str) -> Any:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND fingerprint = ?",
+                (self.namespace, fp),
+            ).fetchone()
+            if row is not None and row[1] is not None and row[1] <= self.clock():
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND fingerprint = ? AND expires_at = ?",
+                    (self.namespace, fp, row[1]),
+                )
+                row = None
+        return _MISSING if row is None else self.codec.loads(row[0])
+
+    def set(self, key: Any, value: Any) -> None:
+        self._store(fingerprint(key), value)
+
+    def _store(self, fp: str, value: Any) -> None:
+        data = self.codec.dumps(value)
+        expires = None if self.ttl is None else self.clock() + self.ttl
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, fingerprint, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, fp, sqlite3.Binary(data), expires),
+            )
+
+    def get_or_compute(self, key: Any, factory: Callable[[], Any], *, strict: bool = True) -> Any:
+        """Return the stored value or compute, persist and return ``factory()``.
+
+        With ``strict=False`` a key :func:`fingerprint` cannot encode is not
+        an error: ``factory()`` is returned without touching the disk and
+        :attr:`skipped` is incremented.
+        """
+
+        try:
+            fp = fingerprint(key)
+        except TypeError:
+            if strict:
+                raise
+            with self._lock:
+                self.skipped += 1
+            return factory()
+        value = self._lookup(fp)
+        if value is _MISSING:
+            value = factory()
+            self._store(fp, value)
+        return value
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND fingerprint = ?", (self.namespace, fingerprint(key))
+            )
+
+    def sweep(self) -> int:
+        """Delete expired rows in every namespace and return how many were removed."""
+
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (self.clock(),)
+            )
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        """Remove every entry in this namespace."""
+
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        return count
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "DiskCache":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -1,21 +1,196 @@
 """Minimal structured logging helpers.
 
+:class:`StructuredLogger` writes and flushes one JSON line per call.
+:class:`BufferedStructuredLogger` hands entries to a background thread that
+serialises them and writes them in batches, trading a little latency for far
+fewer ``write``/``flush`` calls on hot paths.
+
+Entries below the logger's ``level`` return before any formatting happens.
+Lines are assembled from cached pieces: the JSON timestamp is rebuilt at most
+once per second and ``default_fields`` are encoded once. ``encoder="orjson"``
+(or ``"auto"``) switches value encoding to :mod:`orjson` when it is installed,
+which produces compact separators.
+
+A :class:`LogSampler` attached via ``sampler=`` thins out repeated messages
+(1-in-N, probabilistic and token-bucket rate limits per message) and reports
+what it suppressed as periodic ``"N similar messages dropped"`` entries.
+
 Usage example
 -------------
 >>> from general.logger import StructuredLogger
 >>> logger = StructuredLogger()
 >>> logger.log("processed", records=1)
+>>> quiet = StructuredLogger(level=WARNING)
+>>> quiet.info("dropped before any formatting", payload=list(range(10_000)))
 """
 
 from __future__ import annotations
 
 import json
+import random
 import sys
+import threading
 import time
-from dataclasses import dataclass
-from typing import Any, Mapping, MutableMapping
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Mapping, MutableMapping
+
+try:  # optional fast encoder
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None  # type: ignore[assignment]
+
+__all__ = [
+    "BufferedStructuredLogger",
+    "DEBUG",
+    "ERROR",
+    "INFO",
+    "LogSampler",
+    "Logger",
+    "WARNING",
+    "print_logger",
+    "StructuredLogger",
+]
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+_RESERVED = frozenset({"timestamp", "message", "level"})
+
+
+# ``json.dumps`` with non-default options builds a new encoder per call.
+_json_dumps: Callable[[Any], str] = json.JSONEncoder(ensure_ascii=False).encode
+_encode_str: Callable[[str], str] = json.encoder.encode_basestring  # type: ignore[attr-defined]
+
+
+def _orjson_dumps(value: Any) -> str:
+    return orjson.dumps(value).decode("utf-8")
+
+
+def _resolve_encoder(name: str) -> tuple[Callable[[Any], str], str, str]:
+    """Return ``(dumps, item_separator, key_separator)`` for ``name``."""
+
+    if name == "auto":
+        name = "orjson" if orjson is not None else "json"
+    if name == "json":
+        return _json_dumps, ", ", ": "
+    if name == "orjson":
+        if orjson is None:
+            raise ImportError("encoder='orjson' requires the orjson package")
+        return _orjson_dumps, ",", ":"
+    raise ValueError(f"Unknown encoder: {name!r}")
+
+
+class _SampleState:
+    __slots__ = ("seen", "tokens", "refilled_at", "dropped")
+
+    def __init__(self, tokens: float, now: float) -> None:
+        self.seen = 0
+        self.tokens = tokens
+        self.refilled_at = now
+        self.dropped = 0
 
-__all__ = ["Logger", "print_logger", "StructuredLogger"]
+
+class LogSampler:
+    """Per-message sampling and rate limiting with dropped-message summaries.
+
+    Each distinct message string is tracked separately. A message is written
+    only if it passes every configured check, in order:
+
+    ``every``
+        Keep the 1st, ``every+1``-th, ... occurrence (1-in-N sampling).
+    ``probability``
+        Keep each occurrence with this probability.
+    ``rate`` / ``burst``
+        Token bucket allowing ``rate`` messages per second with bursts of up
+        to ``burst``.
+
+    Suppressed occurrences are counted per message and handed back by
+    :meth:`take_summaries` at most every ``summary_interval`` seconds (or on
+    demand), which the logger turns into ``"N similar messages dropped"``
+    entries. Each check is O(1). The sampler takes no locks: under threads,
+    counts may be slightly off but state is never corrupted. At most
+    ``max_keys`` messages are tracked; the oldest is forgotten beyond that.
+    """
+
+    def __init__(
+        self,
+        *,
+        every: int = 1,
+        probability: float = 1.0,
+        rate: float | None = None,
+        burst: int | None = None,
+        summary_interval: float = 10.0,
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+        rand: Callable[[], float] = random.random,
+    ) -> None:
+        if every <= 0:
+            raise ValueError("every must be positive")
+        if not 0.0 <= probability <= 1.0:
+            raise ValueError("probability must be between 0 and 1")
+        if rate is not None and rate <= 0:
+            raise ValueError("rate must be positive")
+        self.every = every
+        self.probability = probability
+        self.rate = rate
+        self.burst = float(burst if burst is not None else max(1, int(rate or 1)))
+        self.summary_interval = summary_interval
+        self.max_keys = max_keys
+        self.clock = clock
+        self.rand = rand
+        self._states: dict[str, _SampleState] = {}
+        self._orphans: dict[str, int] = {}
+        self._next_summary = clock() + summary_interval
+
+    def allow(self, key: str) -> bool:
+        """Return ``True`` when this occurrence of ``key`` should be written."""
+
+        state = self._states.get(key)
+        if state is None:
+            if len(self._states) >= self.max_keys:
+                self._forget_oldest()
+            state = self._states[key] = _SampleState(self.burst, self.clock() if self.rate else 0.0)
+        state.seen += 1
+        if self.every > 1 and (state.seen - 1) % self.every:
+            state.dropped += 1
+            return False
+        if self.probability < 1.0 and self.rand() >= self.probability:
+            state.dropped += 1
+            return False
+        if self.rate is not None:
+            now = self.clock()
+            tokens = min(self.burst, state.tokens + (now - state.refilled_at) * self.rate)
+            state.refilled_at = now
+            if tokens < 1.0:
+                state.tokens = tokens
+                state.dropped += 1
+                return False
+            state.tokens = tokens - 1.0
+        return True
+
+    def summary_due(self) -> bool:
+        return self.clock() >= self._next_summary
+
+    def take_summaries(self) -> list[tuple[str, int]]:
+        """Return and reset ``(message, dropped)`` pairs with a non-zero count."""
+
+        self._next_summary = self.clock() + self.summary_interval
+        summaries = list(self._orphans.items())
+        self._orphans.clear()
+        for key, state in self._states.items():
+            if state.dropped:
+                summaries.append((key, state.dropped))
+                state.dropped = 0
+        return summaries
+
+    def _forget_oldest(self) -> None:
+        key = next(iter(self._states))
+        state = self._states.pop(key)
+        if state.dropped:
+            self._orphans[key] = self._orphans.get(key, 0) + state.dropped
 
 
 @dataclass
@@ -27,24 +202,270 @@ class StructuredLogger:
     stream:
         File-like object accepting ``write``.
     default_fields:
-        Mapping merged into each log entry.
+        Mapping merged into each log entry. It is encoded once; assign a new
+        mapping (rather than mutating it in place) to change it.
+    level:
+        Minimum level written by :meth:`debug`/:meth:`info`/:meth:`warning`/
+        :meth:`error`. :meth:`log` writes at ``INFO``.
+    encoder:
+        ``"json"`` (default), ``"orjson"`` or ``"auto"``.
+    sampler:
+        Optional :class:`LogSampler` consulted after the level check.
     """
 
     stream: Any = sys.stdout
     default_fields: Mapping[str, Any] | None = None
+    level: int = DEBUG
+    encoder: str = "json"
+    sampler: LogSampler | None = None
+
+    def __post_init__(self) -> None:
+        self._dumps, self._item_sep, self._key_sep = _resolve_encoder(self.encoder)
+        self._ts_second = -1
+        self._ts_json = ""
+        self._defaults_src: Any = _UNSET
+        self._defaults_fragment = ""
+        self._default_keys: frozenset[str] = frozenset()
+        self._always_merge = False
 
     def log(self, message: str, **fields: Any) -> None:
-        payload: MutableMapping[str, Any] = {
-            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            "message": message,
-        }
+        if INFO >= self.level and (self.sampler is None or self._sample(message)):
+            self._emit(self._entry(message, fields, None))
+
+    def debug(self, message: str, **fields: Any) -> None:
+        if DEBUG >= self.level and (self.sampler is None or self._sample(message)):
+            self._emit(self._entry(message, fields, "debug"))
+
+    def info(self, message: str, **fields: Any) -> None:
+        if INFO >= self.level and (self.sampler is None or self._sample(message)):
+            self._emit(self._entry(message, fields, "info"))
+
+    def warning(self, message: str, **fields: Any) -> None:
+        if WARNING >= self.level and (self.sampler is None or self._sample(message)):
+            self._emit(self._entry(message, fields, "warning"))
+
+    def error(self, message: str, **fields: Any) -> None:
+        if ERROR >= self.level and (self.sampler is None or self._sample(message)):
+            self._emit(self._entry(message, fields, "error"))
+
+    def is_enabled_for(self, level: int) -> bool:
+        return level >= self.level
+
+    def flush(self) -> None:
+        self._emit_summaries()
+        self.stream.flush()
+
+    def _sample(self, message: str) -> bool:
+        sampler = self.sampler
+        allowed = sampler.allow(message)  # type: ignore[union-attr]
+        if sampler.summary_due():  # type: ignore[union-attr]
+            self._emit_summaries()
+        return allowed
+
+    def _emit_summaries(self) -> None:
+        if self.sampler is None:
+            return
+        for message, dropped in self.sampler.take_summaries():
+            fields = {"sampled_message": message, "dropped": dropped}
+            self._emit(self._entry(f"{dropped} similar messages dropped", fields, None))
+
+    def close(self) -> None:
+        self.flush()
+
+    def __enter__(self) -> "StructuredLogger":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _entry(self, message: str, fields: Mapping[str, Any], level: str | None) -> tuple[str, str, Mapping[str, Any], str | None]:
+        """Capture what must be taken at call time: the timestamp and the fields."""
+
+        now = int(time.time())
+        if now != self._ts_second:
+            self._ts_second = now
+            self._ts_json = '"' + time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)) + '"'
+        return self._ts_json, message, fields, level
+
+    def _encode(self, entry: tuple[str, str, Mapping[str, Any], str | None]) -> str:
+        ts_json, message, fields, level = entry
+        defaults = self.default_fields
+        if defaults is not self._defaults_src:
+            self._refresh_defaults()
+        if self._always_merge or (fields and not (self._default_keys.isdisjoint(fields) and _RESERVED.isdisjoint(fields))):
+            return self._encode_merged(entry)
+        dumps = self._dumps
+        sep = self._item_sep
+        kv = self._key_sep
+        encoded = _encode_str(message) if type(message) is str else dumps(message)
+        line = '{"timestamp"' + kv + ts_json + sep + '"message"' + kv + encoded
+        if level is not None:
+            line += sep + '"level"' + kv + '"' + level + '"'
+        if self._defaults_fragment:
+            line += sep + self._defaults_fragment
+        if fields:
+            line += sep + dumps(fields)[1:-1]
+        return line + "}\n"
+
+    def _encode_merged(self, entry: tuple[str, str, Mapping[str, Any], str | None]) -> str:
+        # Slow path for colliding keys: later sources win, as with dict.update.
+        ts_json, message, fields, level = entry
+        payload: MutableMapping[str, Any] = {"timestamp": json.loads(ts_json), "message": message}
+        if level is not None:
+            payload["level"] = level
         if self.default_fields:
             payload.update(self.default_fields)
         payload.update(fields)
-        self.stream.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        return self._dumps(payload) + "\n"
+
+    def _refresh_defaults(self) -> None:
+        defaults = self.default_fields
+        self._defaults_src = defaults
+        self._default_keys = frozenset(defaults or ())
+        self._always_merge = not _RESERVED.isdisjoint(self._default_keys)
+        self._defaults_fragment = self._dumps(dict(defaults))[1:-1] if defaults and not self._always_merge else ""
+
+    def _emit(self, entry: tuple[str, str, Mapping[str, Any], str | None]) -> None:
+        self.stream.write(self._encode(entry))
         self.stream.flush()
 
 
+_UNSET = object()
+
+
+@dataclass
+class BufferedStructuredLogger(StructuredLogger):
+    """Queue entries and write them from a background thread in batches.
+
+    Entries are serialised on the calling thread, exactly as
+    :class:`StructuredLogger` does, so later changes to logged objects do not
+    leak into the output and unserialisable fields raise ``TypeError`` at the
+    call site. The finished lines are joined and written by a writer thread
+    whenever ``batch_size`` entries are queued or ``flush_interval`` seconds
+    have passed, and the stream is flushed once per batch; the caller only
+    waits for I/O when the queue is full and ``overflow="block"``. Failed
+    stream writes are counted in :attr:`errors`.
+
+    Parameters
+    ----------
+    batch_size:
+        Number of queued entries that triggers an immediate write.
+    flush_interval:
+        Maximum seconds an entry waits in the queue.
+    max_queue:
+        Upper bound on queued entries, which bounds memory use.
+    overflow:
+        What :meth:`log` does when the queue is full: ``"block"`` waits for
+        the writer (backpressure), ``"drop_new"`` discards the new entry and
+        ``"drop_oldest"`` discards the oldest queued one. Discards are counted
+        in :attr:`dropped`.
+
+    Call :meth:`flush` to wait until everything logged so far is written and
+    :meth:`close` (or use the logger as a context manager) before exit; the
+    writer is a daemon thread and unflushed entries are lost otherwise.
+    Logging after :meth:`close` falls back to synchronous writes.
+    """
+
+    batch_size: int = 256
+    flush_interval: float = 0.5
+    max_queue: int = 10_000
+    overflow: str = "block"
+    dropped: int = field(default=0, init=False)
+    errors: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        if self.overflow not in {"block", "drop_new", "drop_oldest"}:
+            raise ValueError(f"Unknown overflow policy: {self.overflow!r}")
+        if self.batch_size <= 0 or self.max_queue <= 0:
+            raise ValueError("batch_size and max_queue must be positive")
+        self._queue: deque[str] = deque()
+        self._cond = threading.Condition()
+        self._enqueued = 0
+        self._written = 0
+        self._flush_requested = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="structured-logger", daemon=True)
+        self._thread.start()
+
+    def _emit(self, entry: tuple[str, str, Mapping[str, Any], str | None]) -> None:
+        line = self._encode(entry)
+        with self._cond:
+            if self._closed:
+                self.stream.write(line)
+                self.stream.flush()
+                return
+            if len(self._queue) >= self.max_queue:
+                if self.overflow == "drop_new":
+                    self.dropped += 1
+                    return
+                if self.overflow == "drop_oldest":
+                    self._queue.popleft()
+                    self._written += 1
+                    self.dropped += 1
+                else:
+                    while len(self._queue) >= self.max_queue and not self._closed:
+                        self._cond.wait()
+            self._queue.append(line)
+            self._enqueued += 1
+            if len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+
+    def flush(self) -> None:
+        """Block until every entry logged before this call has been written."""
+
+        self._emit_summaries()
+        with self._cond:
+            if self._closed:
+                return
+            target = self._enqueued
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._written < target and self._thread.is_alive():
+                self._cond.wait()
+
+    def close(self) -> None:
+        """Flush pending entries and stop the writer thread. Safe to call twice."""
+
+        if not self._closed:
+            self._emit_summaries()
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self) -> None:
+        cond = self._cond
+        while True:
+            with cond:
+                deadline = time.monotonic() + self.flush_interval
+                while len(self._queue) < self.batch_size and not (self._closed or self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    cond.wait(remaining)
+                if not self._queue and self._closed:
+                    return
+                self._flush_requested = False
+                batch = list(self._queue)
+                self._queue.clear()
+                cond.notify_all()
+            if batch:
+                self._write_batch(batch)
+            with cond:
+                self._written += len(batch)
+                cond.notify_all()
+
+    def _write_batch(self, batch: list[str]) -> None:
+        try:
+            self.stream.write("".join(batch))
+            self.stream.flush()
+        except Exception:
+            self.errors += 1
+
+
 def print_logger(message: str, **fields: Any) -> None:
     """Log using :class:`StructuredLogger` and :data:`sys.stdout`."""
 
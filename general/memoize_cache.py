@@ -1,5 +1,11 @@
 """Memoisation helpers with optional TTL support.
 
+Expired entries are dropped lazily on lookup and proactively by
+:meth:`MemoizeCache.sweep`, which inserts trigger cheaply and
+:class:`CacheSweeper` can run on a timer for thread-safe caches. The
+concurrent and async variants can also refresh hot keys shortly before they
+expire (``refresh_ahead``) while continuing to serve the old value.
+
 Usage example
 -------------
 >>> from general.memoize_cache import memoize
@@ -18,69 +24,661 @@ Usage example
 
 from __future__ import annotations
 
+import asyncio
+import heapq
+import itertools
+import sys
+import threading
 import time
 from collections import OrderedDict
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Executor
+from pathlib import Path
 from dataclasses import dataclass
 from functools import wraps
 from typing import Any, Generic, TypeVar
 
+from .cache_keys import KeyBuilder
+from .cache_policies import EvictionPolicy, make_policy
+from .cache_stats import CacheStats
+from .disk_cache import DiskCache
+
 K = TypeVar("K")
 V = TypeVar("V")
 F = TypeVar("F", bound=Callable[..., Any])
+AF = TypeVar("AF", bound=Callable[..., Awaitable[Any]])
 
-__all__ = ["CacheEntry", "MemoizeCache", "memoize"]
+__all__ = ["CacheEntry", "CacheSweeper", "ConcurrentMemoizeCache", "MemoizeCache", "amemoize", "memoize"]
+
+_MISSING: Any = object()
 
 
 @dataclass
 class CacheEntry(Generic[V]):
     value: V
     expires_at: float | None
+    size: int = 0
 
 
 class MemoizeCache(Generic[K, V]):
-    """A lightweight LRU cache with optional TTL semantics."""
+    """A lightweight LRU cache with optional TTL semantics.
+
+    Pass ``stats=True`` (or a configured :class:`CacheStats`) to record hits,
+    misses, evictions, expirations, factory latency and hot keys. Without it
+    ``self.stats`` is ``None`` and lookups skip all bookkeeping.
 
-    def __init__(self, *, maxsize: int = 128, ttl: float | None = None, clock: Callable[[], float] | None = None) -> None:
+    ``max_bytes`` adds a memory budget on top of ``maxsize``: each value is
+    weighed once with ``sizeof`` (default :func:`sys.getsizeof`, which is shallow,
+    so pass e.g. ``lambda df: df.memory_usage().sum()`` for DataFrames) and
+    entries are evicted until both limits hold. A value larger than
+    ``max_bytes`` on its own is returned but not cached. ``policy`` selects
+    the eviction order, see :mod:`general.cache_policies`; the default is
+    plain LRU.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 128,
+        ttl: float | None = None,
+        clock: Callable[[], float] | None = None,
+        stats: bool | CacheStats = False,
+        max_bytes: int | None = None,
+        sizeof: Callable[[V], int] | None = None,
+        policy: str | Callable[[], EvictionPolicy] | None = None,
+    ) -> None:
         if maxsize <= 0:
             raise ValueError("maxsize must be positive")
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
         self.maxsize = maxsize
         self.ttl = ttl
         self.clock = clock or time.monotonic
+        self.stats: CacheStats | None = _make_stats(stats)
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof or (sys.getsizeof if max_bytes is not None else None)
+        self.current_bytes = 0
+        self._policy: EvictionPolicy | None = None
+        if policy is not None and policy != "lru":
+            self._policy = make_policy(policy)
+            self._policy.bind(maxsize)
         self._data: "OrderedDict[K, CacheEntry[V]]" = OrderedDict()
+        self._expiry_heap: list[tuple[float, int, K]] = []
+        self._expiry_seq = itertools.count()
 
     def get(self, key: K, factory: Callable[[], V]) -> V:
         now = self.clock()
+        value = self._lookup(key, now)
+        stats = self.stats
+        if value is not _MISSING:
+            if stats is not None:
+                stats.record_hit(key)
+            return value
+        if stats is None:
+            value = factory()
+        else:
+            stats.record_miss(key)
+            start = time.perf_counter()
+            value = factory()
+            stats.record_factory(time.perf_counter() - start)
+        self._store(key, value, now)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._expiry_heap.clear()
+        self.current_bytes = 0
+        if self._policy is not None:
+            self._policy.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats_snapshot(self) -> dict[str, Any] | None:
+        """Return :meth:`CacheStats.as_dict` including the current size, or ``None``."""
+
+        return None if self.stats is None else self.stats.as_dict(size=len(self))
+
+    def sweep(self, now: float | None = None) -> int:
+        """Remove every expired entry and return how many were dropped.
+
+        Expiry times are kept in a min-heap, so a sweep with nothing to do is a
+        single comparison. Heap slots for keys that were evicted or re-stored
+        are skipped and periodically compacted.
+        """
+
+        heap = self._expiry_heap
+        if not heap:
+            return 0
+        now = self.clock() if now is None else now
+        removed = 0
+        while heap and heap[0][0] <= now:
+            expires_at, _, key = heapq.heappop(heap)
+            entry = self._data.get(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._discard(key)
+                removed += 1
+        if self.stats is not None:
+            self.stats.expirations += removed
+        if len(heap) > 2 * len(self._data) + 64:
+            self._expiry_heap = [item for item in heap if self._data.get(item[2]) is not None]
+            heapq.heapify(self._expiry_heap)
+        return removed
+
+    def _due_for_refresh(self, key: K, now: float, window: float) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and entry.expires_at is not None and entry.expires_at - now <= window
+
+    def _lookup(self, key: K, now: float) -> Any:
+        """Return the live value for ``key`` or ``_MISSING``, dropping expired entries."""
+
         entry = self._data.get(key)
-        if entry is not None and (entry.expires_at is None or entry.expires_at > now):
-            self._data.move_to_end(key)
+        if entry is None:
+            return _MISSING
+        if entry.expires_at is None or entry.expires_at > now:
+            if self._policy is None:
+                self._data.move_to_end(key)
+            else:
+                self._policy.on_access(key)
             return entry.value
-        if entry is not None:
-            del self._data[key]
-        value = factory()
+        self._discard(key)
+        if self.stats is not None:
+            self.stats.expirations += 1
+        return _MISSING
+
+    def _store(self, key: K, value: V, now: float) -> None:
+        size = 0 if self.sizeof is None else self.sizeof(value)
+        if key in self._data:
+            self._discard(key)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return  # Caching it would evict everything else and then itself.
         expires = None if self.ttl is None else now + self.ttl
-        self._data[key] = CacheEntry(value=value, expires_at=expires)
+        self._data[key] = CacheEntry(value=value, expires_at=expires, size=size)
+        self.current_bytes += size
+        if self._policy is not None:
+            self._policy.on_insert(key)
+        if expires is not None:
+            heap = self._expiry_heap
+            heapq.heappush(heap, (expires, next(self._expiry_seq), key))
+            if heap[0][0] <= now:
+                self.sweep(now)
         self._evict()
+
+    def _discard(self, key: K) -> None:
+        """Remove ``key`` outside of eviction, keeping byte and policy state in sync."""
+
+        entry = self._data.pop(key)
+        self.current_bytes -= entry.size
+        if self._policy is not None:
+            self._policy.on_remove(key)
+
+    def _over_budget(self) -> bool:
+        if len(self._data) > self.maxsize:
+            return True
+        return self.max_bytes is not None and self.current_bytes > self.max_bytes and bool(self._data)
+
+    def _evict(self) -> None:
+        while self._over_budget():
+            self._evict_one()
+
+    def _evict_one(self) -> int:
+        """Evict the policy's next victim and return the bytes it freed."""
+
+        if self._policy is None:
+            _, entry = self._data.popitem(last=False)
+        else:
+            entry = self._data.pop(self._policy.victim())
+        self.current_bytes -= entry.size
+        if self.stats is not None:
+            self.stats.evictions += 1
+        return entry.size
+
+
+def _make_stats(stats: bool | CacheStats) -> CacheStats | None:
+    if isinstance(stats, CacheStats):
+        return stats
+    return CacheStats() if stats else None
+
+
+class _Flight:
+    """Result slot shared by threads waiting on the same in-progress ``factory`` call."""
+
+    __slots__ = ("event", "value", "error", "fallback")
+
+    def __init__(self, fallback: Any = _MISSING) -> None:
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+        # For refresh-ahead flights: the old value, handed out if the refresh fails.
+        self.fallback = fallback
+
+
+class _Shard(Generic[K, V]):
+    __slots__ = ("lock", "cache", "inflight")
+
+    def __init__(self, cache: MemoizeCache[K, V]) -> None:
+        self.lock = threading.Lock()
+        self.cache = cache
+        self.inflight: dict[K, _Flight] = {}
+
+
+class ConcurrentMemoizeCache(Generic[K, V]):
+    """Thread-safe LRU cache split into independently locked shards.
+
+    Keys are distributed across ``shards`` segments by ``hash(key)`` so that
+    threads touching different keys rarely contend on the same lock. Each shard
+    holds roughly ``maxsize / shards`` entries and evicts in LRU order on its own.
+    ``max_bytes`` is one budget shared by all shards, so a single large value
+    may use all of it: when the total is exceeded, entries are evicted
+    round-robin across shards, each in its own eviction order.
+
+    Concurrent misses for the same key are coalesced: the first caller runs
+    ``factory`` while the others wait for its result (or exception) instead of
+    recomputing it. ``factory`` always runs outside the shard lock.
+
+    With ``refresh_ahead`` set, a hit within that many seconds of the entry's
+    expiry returns the cached value immediately and recomputes it in the
+    background (on ``refresh_executor`` or a daemon thread). Callers that miss
+    while the refresh is running wait for it like any coalesced miss. A failed
+    refresh is discarded: the old value keeps being served until it expires,
+    callers already waiting on the refresh receive the old value instead of
+    the error, and the next miss computes afresh.
+    """
+
+    def __init__(
+        self,
+        *,
+        maxsize: int = 128,
+        ttl: float | None = None,
+        clock: Callable[[], float] | None = None,
+        shards: int = 16,
+        stats: bool = False,
+        max_bytes: int | None = None,
+        sizeof: Callable[[V], int] | None = None,
+        policy: str | Callable[[], EvictionPolicy] | None = None,
+        refresh_ahead: float | None = None,
+        refresh_executor: Executor | None = None,
+    ) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if shards <= 0:
+            raise ValueError("shards must be positive")
+        if refresh_ahead is not None and ttl is None:
+            raise ValueError("refresh_ahead requires a ttl")
+        shards = min(shards, maxsize)
+        per_shard = -(-maxsize // shards)
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock or time.monotonic
+        self.refresh_ahead = refresh_ahead
+        self.refresh_executor = refresh_executor
+        self._next_victim = 0
+        self._shrink_lock = threading.Lock()
+        self._shards: list[_Shard[K, V]] = [
+            _Shard(
+                MemoizeCache(
+                    maxsize=per_shard,
+                    ttl=ttl,
+                    clock=self.clock,
+                    stats=stats,
+                    max_bytes=max_bytes,
+                    sizeof=sizeof,
+                    policy=policy,
+                )
+            )
+            for _ in range(shards)
+        ]
+
+    def get(self, key: K, factory: Callable[[], V]) -> V:
+        shard = self._shards[hash(key) % len(self._shards)]
+        stats = shard.cache.stats
+        with shard.lock:
+            now = self.clock()
+            value = shard.cache._lookup(key, now)
+            if value is not _MISSING:
+                if stats is not None:
+                    stats.record_hit(key)
+                if (
+                    self.refresh_ahead is not None
+                    and key not in shard.inflight
+                    and shard.cache._due_for_refresh(key, now, self.refresh_ahead)
+                ):
+                    refresh = shard.inflight[key] = _Flight(fallback=value)
+                    self._schedule_refresh(shard, key, refresh, factory)
+                return value
+            flight = shard.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = shard.inflight[key] = _Flight()
+            if stats is not None:
+                if leader:
+                    stats.record_miss(key)
+                else:
+                    stats.coalesced += 1
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                if flight.fallback is not _MISSING:
+                    return flight.fallback
+                raise flight.error
+            return flight.value
+        return self._fill(shard, key, flight, factory)
+
+    def _fill(self, shard: _Shard[K, V], key: K, flight: _Flight, factory: Callable[[], V]) -> V:
+        """Run ``factory`` as the leader of ``flight`` and publish the outcome."""
+
+        start = time.perf_counter()
+        try:
+            value = factory()
+        except BaseException as exc:
+            flight.error = exc
+            with shard.lock:
+                del shard.inflight[key]
+            flight.event.set()
+            raise
+        elapsed = time.perf_counter() - start
+        with shard.lock:
+            shard.cache._store(key, value, self.clock())
+            del shard.inflight[key]
+            if shard.cache.stats is not None:
+                shard.cache.stats.record_factory(elapsed)
+        flight.value = value
+        flight.event.set()
+        if self.max_bytes is not None:
+            self._shrink(shard)
         return value
 
+    def _shrink(self, stored: _Shard[K, V]) -> None:
+        """Evict across shards until the shared byte budget holds.
+
+        Shard locks are taken one at a time, never nested. The ``stored``
+        shard keeps its last entry so the value just cached is not the first
+        thing thrown out.
+        """
+
+        with self._shrink_lock:
+            shards = self._shards
+            total = sum(shard.cache.current_bytes for shard in shards)
+            while total > self.max_bytes:  # type: ignore[operator]
+                freed_any = False
+                for _ in range(len(shards)):
+                    shard = shards[self._next_victim]
+                    self._next_victim = (self._next_victim + 1) % len(shards)
+                    with shard.lock:
+                        if len(shard.cache._data) > (shard is stored):
+                            total -= shard.cache._evict_one()
+                            freed_any = True
+                    if total <= self.max_bytes:  # type: ignore[operator]
+                        return
+                if not freed_any:
+                    return
+
+    def _schedule_refresh(self, shard: _Shard[K, V], key: K, flight: _Flight, factory: Callable[[], V]) -> None:
+        def job() -> None:
+            try:
+                self._fill(shard, key, flight, factory)
+            except Exception:
+                pass
+
+        if self.refresh_executor is not None:
+            self.refresh_executor.submit(job)
+        else:
+            threading.Thread(target=job, name="memoize-refresh", daemon=True).start()
+
+    def sweep(self, now: float | None = None) -> int:
+        """Drop expired entries from every shard; see :meth:`MemoizeCache.sweep`."""
+
+        removed = 0
+        for shard in self._shards:
+            with shard.lock:
+                removed += shard.cache.sweep(now)
+        return removed
+
     def clear(self) -> None:
-        self._data.clear()
+        for shard in self._shards:
+            with shard.lock:
+                shard.cache.clear()
 
-    def _evict(self) -> None:
-        while len(self._data) > self.maxsize:
-            self._data.popitem(last=False)
+    def __len__(self) -> int:
+        return sum(len(shard.cache) for shard in self._shards)
+
+    @property
+    def stats(self) -> CacheStats | None:
+        """Merged statistics across shards, or ``None`` when disabled."""
+
+        parts = []
+        for shard in self._shards:
+            if shard.cache.stats is None:
+                return None
+            with shard.lock:
+                parts.append(CacheStats.merged([shard.cache.stats]))
+        return CacheStats.merged(parts)
+
+    def stats_snapshot(self) -> dict[str, Any] | None:
+        stats = self.stats
+        return None if stats is None else stats.as_dict(size=len(self))
+
+
+class CacheSweeper:
+    """Call ``cache.sweep()`` every ``interval`` seconds on a daemon thread.
+
+    Only use it with caches that are safe to touch from another thread, such
+    as :class:`ConcurrentMemoizeCache`. Plain :class:`MemoizeCache` instances
+    already sweep on insert and can be swept manually from the owning thread.
+
+    >>> cache = ConcurrentMemoizeCache(ttl=60)
+    >>> with CacheSweeper(cache, interval=30):
+    ...     cache.get("k", lambda: 1)
+    1
+    """
+
+    def __init__(self, cache: ConcurrentMemoizeCache[Any, Any], *, interval: float) -> None:
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        self.cache = cache
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> "CacheSweeper":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="memoize-sweeper", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.cache.sweep()
+
+    def __enter__(self) -> "CacheSweeper":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+def memoize(
+    *,
+    maxsize: int = 128,
+    ttl: float | None = None,
+    clock: Callable[[], float] | None = None,
+    concurrent: bool = False,
+    shards: int = 16,
+    stats: bool = False,
+    max_bytes: int | None = None,
+    sizeof: Callable[[Any], int] | None = None,
+    policy: str | Callable[[], EvictionPolicy] | None = None,
+    refresh_ahead: float | None = None,
+    disk: str | Path | DiskCache | None = None,
+    typed: bool = False,
+    key: Callable[[tuple[Any, ...], dict[str, Any]], Any] | None = None,
+) -> Callable[[F], F]:
+    """Decorator returning a memoised version of ``func``.
 
+    Pass ``concurrent=True`` to back the wrapper with a
+    :class:`ConcurrentMemoizeCache` split into ``shards`` segments, which is
+    safe to call from multiple threads. ``stats=True`` enables
+    :class:`CacheStats` collection, readable via ``wrapper.cache.stats_snapshot()``.
+    ``max_bytes``, ``sizeof`` and ``policy`` are forwarded to the cache.
+    ``refresh_ahead`` requires ``concurrent=True``.
 
-def memoize(*, maxsize: int = 128, ttl: float | None = None, clock: Callable[[], float] | None = None) -> Callable[[F], F]:
-    """Decorator returning a memoised version of ``func``."""
+    ``disk`` adds a persistent second tier: a path opens a :class:`DiskCache`
+    namespaced by the function's qualified name with the same ``ttl`` measured
+    in wall-clock time (``clock`` only drives the in-memory tier), or an
+    existing :class:`DiskCache` is used as-is. Memory misses consult the disk
+    before calling ``func``. A value promoted from disk starts a fresh
+    in-memory ``ttl``. The disk key is a :func:`~general.disk_cache.fingerprint`,
+    which supports ``None``, ``bool``, ``int``, ``float``, ``str``, ``bytes``,
+    classes and tuples, lists, sets and dicts of them. Calls with any other
+    argument (``date``, ``Path``, ``Decimal``, enums, user classes) still work
+    but are cached in memory only and counted in ``wrapper.disk.skipped``.
+
+    Keys are built by ``key(args, kwargs)``, a :class:`KeyBuilder` by default,
+    which accepts unhashable arguments; ``typed=True`` keeps ``f(1)`` and
+    ``f(1.0)`` apart.
+    """
+
+    if refresh_ahead is not None and not concurrent:
+        raise ValueError("refresh_ahead requires concurrent=True")
 
     def decorator(func: F) -> F:
-        cache = MemoizeCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        options: dict[str, Any] = dict(
+            maxsize=maxsize, ttl=ttl, clock=clock, stats=stats, max_bytes=max_bytes, sizeof=sizeof, policy=policy
+        )
+        cache: MemoizeCache[Any, Any] | ConcurrentMemoizeCache[Any, Any]
+        if concurrent:
+            cache = ConcurrentMemoizeCache(shards=shards, refresh_ahead=refresh_ahead, **options)
+        else:
+            cache = MemoizeCache(**options)
+        disk_tier = _resolve_disk(disk, func, ttl=ttl)
+        make_key = key or KeyBuilder(typed=typed)
+        cache_get = cache.get
+
+        if disk_tier is None and isinstance(cache, MemoizeCache) and cache.stats is None:
+            lookup = cache._lookup
+            now = cache.clock
+
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any):  # type: ignore[misc]
+                k = make_key(args, kwargs)
+                t = now()
+                value = lookup(k, t)
+                if value is _MISSING:
+                    value = func(*args, **kwargs)
+                    cache._store(k, value, t)
+                return value
+
+        elif disk_tier is None:
+
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any):  # type: ignore[misc]
+                return cache_get(make_key(args, kwargs), lambda: func(*args, **kwargs))
+
+        else:
+
+            @wraps(func)
+            def wrapper(*args: Any, **kwargs: Any):  # type: ignore[misc]
+                k = make_key(args, kwargs)
+                return cache_get(k, lambda: disk_tier.get_or_compute(k, lambda: func(*args, **kwargs), strict=False))
+
+        wrapper.cache = cache  # type: ignore[attr-defined]
+        wrapper.disk = disk_tier  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+def _resolve_disk(
+    disk: str | Path | DiskCache | None, func: Callable[..., Any], *, ttl: float | None
+) -> DiskCache | None:
+    if disk is None or isinstance(disk, DiskCache):
+        return disk
+    # ``clock`` is the in-memory tier's (monotonic) time source; persisted
+    # expiry times must stay comparable across restarts, so the disk tier keeps
+    # DiskCache's wall-clock default.
+    return DiskCache(disk, namespace=f"{func.__module__}.{func.__qualname__}", ttl=ttl)
+
+
+def amemoize(
+    *,
+    maxsize: int = 128,
+    ttl: float | None = None,
+    clock: Callable[[], float] | None = None,
+    stats: bool = False,
+    max_bytes: int | None = None,
+    sizeof: Callable[[Any], int] | None = None,
+    policy: str | Callable[[], EvictionPolicy] | None = None,
+    refresh_ahead: float | None = None,
+    typed: bool = False,
+    key: Callable[[tuple[Any, ...], dict[str, Any]], Any] | None = None,
+) -> Callable[[AF], AF]:
+    """Decorator memoising the awaited results of a coroutine function.
+
+    Results are kept in a :class:`MemoizeCache` with the usual LRU/TTL rules.
+    Concurrent callers for a key that is still being computed await the same
+    pending task instead of starting their own. Exceptions are propagated to
+    every waiter but never cached, so the next call retries. Cancelling one
+    caller does not cancel the shared computation for the others.
+
+    With ``refresh_ahead`` set, a hit within that many seconds of expiry
+    returns the cached value and starts a background task to recompute it.
+    ``typed`` and ``key`` behave as in :func:`memoize`.
+    """
+
+    if refresh_ahead is not None and ttl is None:
+        raise ValueError("refresh_ahead requires a ttl")
+
+    def decorator(func: AF) -> AF:
+        cache: MemoizeCache[Any, Any] = MemoizeCache(
+            maxsize=maxsize, ttl=ttl, clock=clock, stats=stats, max_bytes=max_bytes, sizeof=sizeof, policy=policy
+        )
+        pending: dict[Any, asyncio.Future[Any]] = {}
+        cache_stats = cache.stats
+        make_key = key or KeyBuilder(typed=typed)
+
+        def start_task(k: Any, now: float, args: tuple[Any, ...], kwargs: dict[str, Any]) -> asyncio.Future[Any]:
+            start = time.perf_counter()
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            pending[k] = task
+
+            def _settle(done: asyncio.Future[Any]) -> None:
+                pending.pop(k, None)
+                if not done.cancelled() and done.exception() is None:
+                    if cache_stats is not None:
+                        cache_stats.record_factory(time.perf_counter() - start)
+                    cache._store(k, done.result(), now)
+
+            task.add_done_callback(_settle)
+            return task
 
         @wraps(func)
-        def wrapper(*args: Any, **kwargs: Any):  # type: ignore[misc]
-            key = (args, frozenset(kwargs.items()))
-            return cache.get(key, lambda: func(*args, **kwargs))
+        async def wrapper(*args: Any, **kwargs: Any):  # type: ignore[misc]
+            k = make_key(args, kwargs)
+            now = cache.clock()
+            value = cache._lookup(k, now)
+            if value is not _MISSING:
+                if cache_stats is not None:
+                    cache_stats.record_hit(k)
+                if refresh_ahead is not None and k not in pending and cache._due_for_refresh(k, now, refresh_ahead):
+                    start_task(k, now, args, kwargs)
+                return value
+            task = pending.get(k)
+            if task is not None:
+                if cache_stats is not None:
+                    cache_stats.coalesced += 1
+            else:
+                if cache_stats is not None:
+                    cache_stats.record_miss(k)
+                task = start_task(k, now, args, kwargs)
+            return await asyncio.shield(task)
 
         wrapper.cache = cache  # type: ignore[attr-defined]
         return wrapper  # type: ignore[return-value]
@@ -0,0 +1,219 @@
+"""Named latency histograms with percentile export.
+
+:class:`Histogram` is a log-linear ("HDR style") histogram: each power of two
+is split into ``SUB_BUCKETS`` linear slots, which bounds the relative error of
+any reported percentile to about ``1 / (2 * SUB_BUCKETS)`` while using a fixed
+array of counters regardless of how many samples are recorded. Values from one
+nanosecond to a little over an hour are resolved; anything outside that range
+is clamped to the first or last bucket (``min``/``max`` stay exact).
+
+:class:`MetricsRegistry` maps names such as ``"db.query"`` to histograms,
+holds gauges (last-value metrics such as a concurrency limit) and exports
+snapshots as plain dicts, JSON or Prometheus text. Recording is
+thread-safe. :class:`general.timer.Timer` accepts ``metric=`` to feed the
+registry directly.
+
+Usage example
+-------------
+>>> from general.metrics import MetricsRegistry
+>>> registry = MetricsRegistry()
+>>> for ms in range(1, 101):
+...     registry.record("db.query", ms / 1000)
+>>> snap = registry.snapshot()["db.query"]
+>>> snap["count"], round(snap["p50"], 3), round(snap["p99"], 3)
+(100, 0.05, 0.099)
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+import threading
+from typing import Any
+
+__all__ = ["Histogram", "MetricsRegistry", "default_registry"]
+
+QUANTILES = (("p50", 0.5), ("p90", 0.9), ("p99", 0.99), ("p999", 0.999))
+
+
+class Histogram:
+    """Fixed-memory log-linear histogram of non-negative durations in seconds."""
+
+    SUB_BUCKETS = 32
+    MIN_EXP = -29  # 2**-30 s ≈ 0.93 ns
+    MAX_EXP = 12  # 2**12 s ≈ 68 min
+    SIZE = (MAX_EXP - MIN_EXP + 1) * SUB_BUCKETS
+
+    __slots__ = ("_counts", "_lock", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts = [0] * self.SIZE
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    @classmethod
+    def _index(cls, value: float) -> int:
+        if value <= 0.0:
+            return 0
+        mantissa, exponent = math.frexp(value)
+        if exponent < cls.MIN_EXP:
+            return 0
+        if exponent > cls.MAX_EXP:
+            return cls.SIZE - 1
+        return (exponent - cls.MIN_EXP) * cls.SUB_BUCKETS + int((mantissa - 0.5) * 2 * cls.SUB_BUCKETS)
+
+    @classmethod
+    def _value_at(cls, index: int) -> float:
+        """Return the midpoint of bucket ``index``."""
+
+        exponent, sub = divmod(index, cls.SUB_BUCKETS)
+        low = math.ldexp(0.5 + sub / (2 * cls.SUB_BUCKETS), exponent + cls.MIN_EXP)
+        width = math.ldexp(1 / (2 * cls.SUB_BUCKETS), exponent + cls.MIN_EXP)
+        return low + width / 2
+
+    def record(self, value: float) -> None:
+        index = self._index(value)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def merge(self, other: "Histogram") -> None:
+        counts, count, total, low, high = other._state()
+        with self._lock:
+            for index, value in enumerate(counts):
+                if value:
+                    self._counts[index] += value
+            self.count += count
+            self.total += total
+            self.min = min(self.min, low)
+            self.max = max(self.max, high)
+
+    def _state(self) -> tuple[list[int], int, float, float, float]:
+        with self._lock:
+            return list(self._counts), self.count, self.total, self.min, self.max
+
+    def percentile(self, q: float) -> float:
+        counts, count, _, low, high = self._state()
+        return self._percentile(counts, count, q, low, high)
+
+    @classmethod
+    def _percentile(cls, counts: list[int], count: int, q: float, low: float, high: float) -> float:
+        if not count:
+            return 0.0
+        rank = max(1, math.ceil(q * count))
+        seen = 0
+        for index, value in enumerate(counts):
+            seen += value
+            if seen >= rank:
+                return min(max(cls._value_at(index), low), high)
+        return high
+
+    def snapshot(self, *, reset: bool = False) -> dict[str, Any]:
+        """Return count, sum, mean, min, max and p50/p90/p99/p999 in seconds."""
+
+        with self._lock:
+            counts, count, total, low, high = list(self._counts), self.count, self.total, self.min, self.max
+            if reset:
+                self._counts = [0] * self.SIZE
+                self.count = 0
+                self.total = 0.0
+                self.min = math.inf
+                self.max = 0.0
+        data: dict[str, Any] = {
+            "count": count,
+            "sum": total,
+            "mean": total / count if count else 0.0,
+            "min": low if count else 0.0,
+            "max": high,
+        }
+        for name, q in QUANTILES:
+            data[name] = self._percentile(counts, count, q, low, high)
+        return data
+
+
+class MetricsRegistry:
+    """Thread-safe collection of named :class:`Histogram` instances and gauges."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict[str, Histogram] = {}
+        self._gauges: dict[str, float] = {}
+
+    def histogram(self, name: str) -> Histogram:
+        """Return the histogram called ``name``, creating it on first use."""
+
+        hist = self._histograms.get(name)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(name, Histogram())
+        return hist
+
+    def record(self, name: str, value: float) -> None:
+        self.histogram(name).record(value)
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """Set the current value of gauge ``name``."""
+
+        with self._lock:
+            self._gauges[name] = value
+
+    def gauges(self) -> dict[str, float]:
+        with self._lock:
+            return dict(sorted(self._gauges.items()))
+
+    def snapshot(self, *, reset: bool = False) -> dict[str, dict[str, Any]]:
+        """Return histogram snapshots by name; gauges are not affected by ``reset``."""
+
+        with self._lock:
+            items = list(self._histograms.items())
+        return {name: hist.snapshot(reset=reset) for name, hist in sorted(items)}
+
+    def reset(self) -> None:
+        self.snapshot(reset=True)
+
+    def to_json(self, *, reset: bool = False) -> str:
+        """Serialise histogram snapshots and gauge values into one JSON object."""
+
+        data: dict[str, Any] = dict(self.snapshot(reset=reset))
+        data.update(self.gauges())
+        return json.dumps(data, sort_keys=True)
+
+    def to_prometheus(self, *, reset: bool = False, suffix: str = "_seconds") -> str:
+        """Render histograms as Prometheus ``summary`` and gauges as ``gauge`` metrics."""
+
+        lines: list[str] = []
+        for name, snap in self.snapshot(reset=reset).items():
+            metric = _prometheus_name(name) + suffix
+            lines.append(f"# TYPE {metric} summary")
+            for label, q in QUANTILES:
+                lines.append(f'{metric}{{quantile="{q}"}} {snap[label]!r}')
+            lines.append(f"{metric}_sum {snap['sum']!r}")
+            lines.append(f"{metric}_count {snap['count']}")
+        for name, value in self.gauges().items():
+            metric = _prometheus_name(name)
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {value!r}")
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+def _prometheus_name(name: str) -> str:
+    cleaned = re.sub(r"[^a-zA-Z0-9_:]", "_", name)
+    return cleaned if not cleaned[:1].isdigit() else f"_{cleaned}"
+
+
+_DEFAULT = MetricsRegistry()
+
+
+def default_registry() -> MetricsRegistry:
+    """Return the process-wide registry used when no registry is passed."""
+
+    return _DEFAULT
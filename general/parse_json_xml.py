@@ -57,7 +57,7 @@ def loads_json(source: Union[str, bytes], *, strict: bool = True, **json_kwargs:
     json_kwargs:
         Additional keyword arguments forwarded to :func:`json.loads`.
     """
-+
+
     try:
         return json.loads(source, strict=strict, **json_kwargs)
     except (TypeError, ValueError) as exc:
@@ -1,5 +1,14 @@
 """Retry helpers with exponential backoff.
 
+:func:`retry` and its coroutine twin :func:`aretry` share one
+:class:`RetryConfig`. Besides plain exponential backoff it supports
+randomised jitter (``"full"`` or ``"decorrelated"``) so clients that failed
+together do not retry in lockstep, a ``max_delay`` cap, an overall
+``deadline`` and a :class:`RetryBudget` that limits retries to a fraction of
+first attempts across every caller sharing it. With a
+:class:`~general.circuit_breaker.CircuitBreaker` as ``breaker`` each attempt
+goes through the circuit and an open circuit ends the loop immediately.
+
 Usage example
 -------------
 >>> from general.retry_backoff import retry, RetryConfig
@@ -15,17 +24,92 @@ Usage example
 
 from __future__ import annotations
 
+import asyncio
+import random
+import threading
 import time
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from dataclasses import dataclass
 from typing import Any
 
-__all__ = ["RetryConfig", "retry"]
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+
+__all__ = ["RetryBudget", "RetryConfig", "aretry", "retry"]
+
+_JITTER_MODES = ("none", "full", "decorrelated")
+
+
+class RetryBudget:
+    """Token bucket capping retries at a share of normal traffic.
+
+    Every first attempt deposits ``ratio`` tokens and every retry spends one,
+    so with ``ratio=0.1`` retries stay below roughly 10% of calls. A reserve
+    of ``min_per_second`` tokens per second keeps low-traffic callers able to
+    retry at all. Share one instance between callers (it is thread-safe) to
+    apply a process-wide limit.
+
+    Attributes
+    ----------
+    retries:
+        Retries allowed so far.
+    rejected:
+        Retries refused because the budget was empty.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        *,
+        min_per_second: float = 1.0,
+        capacity: float = 100.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if ratio < 0 or min_per_second < 0 or capacity <= 0:
+            raise ValueError("ratio and min_per_second must be non-negative and capacity positive")
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.capacity = capacity
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated = clock()
+        self.retries = 0
+        self.rejected = 0
+
+    def _refill(self, extra: float) -> None:
+        now = self.clock()
+        gained = (now - self._updated) * self.min_per_second + extra
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens + gained)
+
+    def deposit(self) -> None:
+        """Record a first attempt."""
+
+        with self._lock:
+            self._refill(self.ratio)
+
+    def try_spend(self) -> bool:
+        """Take one token for a retry; return ``False`` if none is left."""
+
+        with self._lock:
+            self._refill(0.0)
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self.retries += 1
+                return True
+            self.rejected += 1
+            return False
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill(0.0)
+            return self._tokens
 
 
 @dataclass
 class RetryConfig:
-    """Configuration for :func:`retry`.
+    """Configuration for :func:`retry` and :func:`aretry`.
 
     Attributes
     ----------
@@ -37,12 +121,78 @@ class RetryConfig:
         Backoff multiplier applied after each failure.
     exceptions:
         Tuple of exception types triggering a retry.
+    jitter:
+        ``"none"`` (default) sleeps the exact exponential delay, ``"full"`` a
+        uniform random share of it, and ``"decorrelated"`` a random delay
+        between ``backoff`` and three times the previous delay.
+    max_delay:
+        Upper bound for any single delay in seconds.
+    deadline:
+        Seconds from the first attempt after which no retry is started.
+        :func:`aretry` also cancels an attempt still running at the deadline.
+    budget:
+        Shared :class:`RetryBudget`; a retry it refuses re-raises the error.
+    breaker:
+        :class:`~general.circuit_breaker.CircuitBreaker` guarding each attempt.
+        :class:`~general.circuit_breaker.CircuitOpenError` is never retried.
     """
 
     attempts: int = 3
     backoff: float = 0.5
     multiplier: float = 2.0
     exceptions: tuple[type[Exception], ...] = (Exception,)
+    jitter: str = "none"
+    max_delay: float | None = None
+    deadline: float | None = None
+    budget: RetryBudget | None = None
+    breaker: CircuitBreaker | None = None
+
+    def __post_init__(self) -> None:
+        if self.jitter not in _JITTER_MODES:
+            raise ValueError(f"jitter must be one of {_JITTER_MODES}, got {self.jitter!r}")
+
+
+class _Schedule:
+    """Per-call retry state: attempt count, previous delay and deadline."""
+
+    __slots__ = ("cfg", "clock", "uniform", "attempt", "delay", "deadline_at")
+
+    def __init__(self, cfg: RetryConfig, clock: Callable[[], float], uniform: Callable[[float, float], float]) -> None:
+        self.cfg = cfg
+        self.clock = clock
+        self.uniform = uniform
+        self.attempt = 0
+        self.delay = cfg.backoff
+        self.deadline_at = None if cfg.deadline is None else clock() + cfg.deadline
+        if cfg.budget is not None:
+            cfg.budget.deposit()
+
+    def remaining(self) -> float | None:
+        return None if self.deadline_at is None else self.deadline_at - self.clock()
+
+    def next_delay(self) -> float | None:
+        """Return the delay before the next attempt, or ``None`` to give up."""
+
+        cfg = self.cfg
+        self.attempt += 1
+        if self.attempt >= cfg.attempts:
+            return None
+        if cfg.jitter == "decorrelated":
+            # self.delay starts at backoff, so even the first retry is randomised.
+            delay = self.uniform(cfg.backoff, max(cfg.backoff, self.delay * 3))
+        else:
+            delay = cfg.backoff * cfg.multiplier ** (self.attempt - 1)
+        if cfg.max_delay is not None:
+            delay = min(delay, cfg.max_delay)
+        self.delay = delay
+        if cfg.jitter == "full":
+            delay = self.uniform(0.0, delay)
+        remaining = self.remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        if cfg.budget is not None and not cfg.budget.try_spend():
+            return None
+        return delay
 
 
 def retry(
@@ -50,19 +200,60 @@ def retry(
     *args: Any,
     config: RetryConfig | None = None,
     sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic,
+    uniform: Callable[[float, float], float] = random.uniform,
     **kwargs: Any,
 ) -> Any:
-    """Invoke ``func`` retrying on configured exceptions."""
+    """Invoke ``func`` retrying on configured exceptions.
+
+    ``clock`` drives the deadline and ``uniform`` the jitter; both are
+    injectable alongside ``sleep`` for deterministic tests.
+    """
 
     cfg = config or RetryConfig()
-    delay = cfg.backoff
-    attempt = 0
+    schedule = _Schedule(cfg, clock, uniform)
     while True:
         try:
+            if cfg.breaker is not None:
+                return cfg.breaker.call(func, *args, **kwargs)
             return func(*args, **kwargs)
-        except cfg.exceptions as exc:
-            attempt += 1
-            if attempt >= cfg.attempts:
+        except CircuitOpenError:
+            raise
+        except cfg.exceptions:
+            delay = schedule.next_delay()
+            if delay is None:
                 raise
             sleep(delay)
-            delay *= cfg.multiplier
+
+
+async def aretry(
+    func: Callable[..., Awaitable[Any]],
+    *args: Any,
+    config: RetryConfig | None = None,
+    sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    clock: Callable[[], float] = time.monotonic,
+    uniform: Callable[[float, float], float] = random.uniform,
+    **kwargs: Any,
+) -> Any:
+    """Await ``func(*args, **kwargs)`` retrying on configured exceptions.
+
+    With a ``deadline`` each attempt is bounded by the time left, raising
+    :class:`asyncio.TimeoutError` once it runs out.
+    """
+
+    cfg = config or RetryConfig()
+    schedule = _Schedule(cfg, clock, uniform)
+    while True:
+        try:
+            attempt = func(*args, **kwargs) if cfg.breaker is None else cfg.breaker.acall(func, *args, **kwargs)
+            remaining = schedule.remaining()
+            if remaining is None:
+                return await attempt
+            return await asyncio.wait_for(attempt, max(remaining, 0.0))
+        except CircuitOpenError:
+            raise
+        except cfg.exceptions:
+            delay = schedule.next_delay()
+            if delay is None:
+                raise
+            await sleep(delay)
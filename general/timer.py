@@ -4,6 +4,10 @@ The module provides a context manager and a decorator that record elapsed time
 without touching global state. Callers can inject an alternative ``now``
 function which makes the helpers deterministic in tests.
 
+Passing ``metric="db.query"`` records each measured duration into a
+:class:`general.metrics.MetricsRegistry` (the process default unless
+``registry`` is given) so percentiles can be exported later.
+
 Usage example
 -------------
 >>> from general import timer
@@ -11,6 +15,12 @@ Usage example
 ...     _ = sum(range(100))
 >>> isinstance(t.elapsed, float)
 True
+>>> from general.metrics import MetricsRegistry
+>>> registry = MetricsRegistry()
+>>> with timer.Timer(metric="db.query", registry=registry):
+...     pass
+>>> registry.snapshot()["db.query"]["count"]
+1
 """
 
 from __future__ import annotations
@@ -21,6 +31,8 @@ from dataclasses import dataclass
 from functools import wraps
 from typing import Any, TypeVar
 
+from .metrics import MetricsRegistry, default_registry
+
 T = TypeVar("T")
 
 __all__ = ["Timer", "time_call", "time_function"]
@@ -28,11 +40,17 @@ __all__ = ["Timer", "time_call", "time_function"]
 
 @dataclass
 class Timer:
-    """Measure elapsed time using ``time.perf_counter`` by default."""
+    """Measure elapsed time using ``time.perf_counter`` by default.
+
+    When ``metric`` is set the elapsed time is recorded into ``registry`` (or
+    the default registry) on exit, including when the block raises.
+    """
 
     clock: Callable[[], float] = time.perf_counter
     start: float | None = None
     end: float | None = None
+    metric: str | None = None
+    registry: MetricsRegistry | None = None
 
     def __enter__(self) -> "Timer":
         self.start = self.clock()
@@ -40,6 +58,8 @@ class Timer:
 
     def __exit__(self, exc_type, exc, tb) -> None:
         self.end = self.clock()
+        if self.metric is not None and self.start is not None:
+            (self.registry or default_registry()).record(self.metric, self.end - self.start)
 
     @property
     def elapsed(self) -> float:
@@ -61,13 +81,24 @@ def time_call(func: Callable[..., T], *args: Any, clock: Callable[[], float] | N
     return result, elapsed
 
 
-def time_function(clock: Callable[[], float] | None = None) -> Callable[[Callable[..., T]], Callable[..., tuple[T, float]]]:
-    """Decorator returning ``(result, elapsed_seconds)`` for each invocation."""
+def time_function(
+    clock: Callable[[], float] | None = None,
+    *,
+    metric: str | None = None,
+    registry: MetricsRegistry | None = None,
+) -> Callable[[Callable[..., T]], Callable[..., tuple[T, float]]]:
+    """Decorator returning ``(result, elapsed_seconds)`` for each invocation.
+
+    With ``metric`` set, each elapsed time is also recorded into ``registry``.
+    """
 
     def decorator(func: Callable[..., T]) -> Callable[..., tuple[T, float]]:
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> tuple[T, float]:
-            return time_call(func, *args, clock=clock, **kwargs)
+            result, elapsed = time_call(func, *args, clock=clock, **kwargs)
+            if metric is not None:
+                (registry or default_registry()).record(metric, elapsed)
+            return result, elapsed
 
         return wrapper
 
@@ -1,5 +1,23 @@
 """Asyncio helpers for running tasks with concurrency limits.
 
+:func:`gather_limited` collects a finite batch into a list and owns its
+tasks: a failure (``policy="fail_fast"``), too many failures
+(``max_failures``) or the batch ``deadline`` cancels everything still
+running. For large or unbounded inputs :func:`stream_limited` pulls awaitables
+lazily from a sync or async iterable, keeps at most ``limit`` of them in
+flight and yields results as they complete, optionally in input order through
+a bounded reorder buffer. Both accept an :class:`AdaptiveLimiter` as ``limit``
+to size concurrency from observed latency and errors instead of a constant.
+
+Blocking or CPU-bound callables run through :func:`map_in_threads` and
+:func:`map_in_processes`, which batch small items into chunks to amortise
+dispatch and pickling cost and stream results back like :func:`stream_limited`.
+
+:class:`RateLimitedScheduler` queues calls to rate-limited APIs by priority,
+serves tenants of equal priority round-robin and starts each call as soon as
+its key's :class:`RateLimit` (GCRA) allows, reporting queue depth and wait
+times to a :class:`general.metrics.MetricsRegistry`.
+
 Usage example
 -------------
 >>> from python import async_tasks
@@ -7,17 +25,44 @@ Usage example
 ...     return x * x
 >>> async_tasks.run(async_tasks.gather_limited([square(2), square(3)], limit=1))
 [4, 9]
+>>> async def collect():
+...     return [r async for r in async_tasks.stream_limited((square(x) for x in range(4)), ordered=True)]
+>>> async_tasks.run(collect())
+[0, 1, 4, 9]
 """
 
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Awaitable, Iterable
-from typing import Any, Callable, Sequence, TypeVar
+import itertools
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Iterable, Mapping
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Sequence, TypeVar, Union
+
+from general.metrics import MetricsRegistry, default_registry
 
 T = TypeVar("T")
+AwaitableSource = Union[Iterable[Awaitable[T]], AsyncIterable[Awaitable[T]]]
 
-__all__ = ["run", "gather_limited"]
+__all__ = [
+    "AdaptiveLimiter",
+    "BatchAbortedError",
+    "COLLECT_ALL",
+    "FAIL_FAST",
+    "RateLimit",
+    "RateLimitedScheduler",
+    "run",
+    "gather_limited",
+    "map_in_processes",
+    "map_in_threads",
+    "stream_limited",
+]
+
+_DONE: Any = object()
 
 
 def run(coro: Awaitable[T]) -> T:
@@ -30,27 +75,712 @@ def run(coro: Awaitable[T]) -> T:
     return asyncio.run(coro)
 
 
+class AdaptiveLimiter:
+    """Concurrency limit that adapts to observed latency and errors.
+
+    Two algorithms from Netflix's *concurrency-limits* are available:
+
+    ``"aimd"``
+        Additive increase, multiplicative decrease: the limit grows by one
+        per successful sample while at least half of it is in use, and is
+        multiplied by ``backoff`` on an error or a sample slower than
+        ``latency_threshold``.
+    ``"gradient"``
+        Compares a short-term latency sample with a slow moving average.
+        When latency rises above ``tolerance`` times the average the limit
+        shrinks proportionally; otherwise it grows by about ``sqrt(limit)``.
+
+    Use :meth:`run` or ``async with limiter.slot():`` around each call. The
+    current limit is available as :attr:`limit` and, with ``metric`` set, is
+    published as a gauge on ``registry`` (the default registry otherwise).
+    """
+
+    def __init__(
+        self,
+        algorithm: str = "aimd",
+        *,
+        initial_limit: int = 5,
+        min_limit: int = 1,
+        max_limit: int = 200,
+        backoff: float = 0.9,
+        latency_threshold: float | None = None,
+        tolerance: float = 1.5,
+        smoothing: float = 0.2,
+        clock: Callable[[], float] = time.perf_counter,
+        metric: str | None = None,
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        if algorithm not in ("aimd", "gradient"):
+            raise ValueError(f"Unknown limiter algorithm: {algorithm!r}")
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        self.algorithm = algorithm
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_threshold = latency_threshold
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.clock = clock
+        self.metric = metric
+        self.registry = registry
+        self.inflight = 0
+        self._limit = float(initial_limit)
+        self._long_latency: float | None = None
+        self._condition: asyncio.Condition | None = None
+        self._publish()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def _publish(self) -> None:
+        if self.metric is not None:
+            (self.registry or default_registry()).set_gauge(self.metric, self.limit)
+
+    async def acquire(self) -> None:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.inflight < self.limit)
+            self.inflight += 1
+
+    async def release(self, latency: float, failed: bool = False) -> None:
+        """Return a slot and feed the call's ``latency`` into the algorithm."""
+
+        self.on_sample(latency, failed)
+        self.inflight -= 1
+        if self._condition is not None:
+            async with self._condition:
+                self._condition.notify_all()
+
+    def on_sample(self, latency: float, failed: bool = False) -> None:
+        """Update the limit from one completed call."""
+
+        limit = self._limit
+        if self.algorithm == "aimd":
+            too_slow = self.latency_threshold is not None and latency > self.latency_threshold
+            if failed or too_slow:
+                limit *= self.backoff
+            elif self.inflight * 2 >= limit:
+                limit += 1
+        else:
+            long = latency if self._long_latency is None else self._long_latency
+            self._long_latency = long + (latency - long) * 0.05
+            if failed:
+                gradient = 0.5
+            else:
+                gradient = max(0.5, min(1.0, self.tolerance * self._long_latency / max(latency, 1e-9)))
+            if gradient < 1.0 or self.inflight * 2 >= limit:
+                target = limit * gradient + (0.0 if gradient < 1.0 else math.sqrt(limit))
+                limit = limit * (1 - self.smoothing) + target * self.smoothing
+        limit = min(float(self.max_limit), max(float(self.min_limit), limit))
+        changed = int(limit) != int(self._limit)
+        self._limit = limit
+        if changed:
+            self._publish()
+
+    def slot(self) -> "_LimiterSlot":
+        """Async context manager holding one slot and timing the block."""
+
+        return _LimiterSlot(self)
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """Await ``awaitable`` inside a slot."""
+
+        async with self.slot():
+            return await awaitable
+
+
+class _LimiterSlot:
+    __slots__ = ("_limiter", "_start")
+
+    def __init__(self, limiter: AdaptiveLimiter) -> None:
+        self._limiter = limiter
+        self._start = 0.0
+
+    async def __aenter__(self) -> None:
+        await self._limiter.acquire()
+        self._start = self._limiter.clock()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        # Cancellation says nothing about the dependency, so it is not a failure.
+        failed = exc_type is not None and not issubclass(exc_type, asyncio.CancelledError)
+        await self._limiter.release(self._limiter.clock() - self._start, failed)
+
+
+def _capacity(limit: int | AdaptiveLimiter) -> int:
+    return limit if isinstance(limit, int) else limit.limit
+
+
+def _admit(coro: Awaitable[T], limit: int | AdaptiveLimiter) -> Awaitable[T]:
+    return coro if isinstance(limit, int) else limit.run(coro)
+
+
+class BatchAbortedError(RuntimeError):
+    """Raised by :func:`gather_limited` when more than ``max_failures`` tasks fail."""
+
+    def __init__(self, failures: list[Exception]) -> None:
+        super().__init__(f"Batch aborted after {len(failures)} failures")
+        self.failures = failures
+
+
+FAIL_FAST = "fail_fast"
+COLLECT_ALL = "collect_all"
+_POLICIES = (FAIL_FAST, COLLECT_ALL)
+
+
 async def gather_limited(
     coroutines: Iterable[Awaitable[T]],
     *,
-    limit: int = 5,
+    limit: int | AdaptiveLimiter = 5,
+    on_error: Callable[[Exception], None] | None = None,
+    policy: str = FAIL_FAST,
+    max_failures: int | None = None,
+    timeout: float | None = None,
+    deadline: float | None = None,
+) -> list[Any]:
+    """Gather awaitables honouring the concurrency ``limit``.
+
+    Results keep input order. Tasks are started lazily and are owned by the
+    call: whenever it exits early (failure, deadline or cancellation of the
+    caller) every task still running is cancelled and awaited before the
+    exception propagates, as with :class:`asyncio.TaskGroup`.
+
+    Parameters
+    ----------
+    limit:
+        Maximum number of awaitables in flight, or an :class:`AdaptiveLimiter`.
+    on_error:
+        Called with every exception raised by an awaitable.
+    policy:
+        ``"fail_fast"`` (default) re-raises the first failure after cancelling
+        the rest. ``"collect_all"`` stores exceptions in the result list in
+        place of values, like ``asyncio.gather(return_exceptions=True)``.
+    max_failures:
+        With ``"collect_all"``, abort with :class:`BatchAbortedError` as soon
+        as more than this many awaitables have failed.
+    timeout:
+        Per-awaitable limit in seconds; an expiry counts as a failure with
+        :class:`asyncio.TimeoutError`.
+    deadline:
+        Seconds for the whole batch, after which it is aborted with
+        :class:`asyncio.TimeoutError`.
+    """
+
+    if policy not in _POLICIES:
+        raise ValueError(f"policy must be one of {_POLICIES}, got {policy!r}")
+    if _capacity(limit) <= 0:
+        raise ValueError("limit must be positive")
+    loop = asyncio.get_running_loop()
+    deadline_at = None if deadline is None else loop.time() + deadline
+    items = iter(coroutines)
+    results: list[Any] = []
+    pending: dict[asyncio.Future[Any], int] = {}
+    failures: list[Exception] = []
+    try:
+        while True:
+            while len(pending) < _capacity(limit):
+                coro = next(items, _DONE)
+                if coro is _DONE:
+                    break
+                if timeout is not None:
+                    coro = asyncio.wait_for(coro, timeout)
+                pending[asyncio.ensure_future(_admit(coro, limit))] = len(results)
+                results.append(None)
+            if not pending:
+                return results
+            remaining = None if deadline_at is None else deadline_at - loop.time()
+            done: set[asyncio.Future[Any]] = set()
+            if remaining is None or remaining > 0:
+                done, _ = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise asyncio.TimeoutError(f"gather_limited exceeded its {deadline}s deadline")
+            for task in sorted(done, key=pending.__getitem__):
+                index = pending.pop(task)
+                try:
+                    results[index] = task.result()
+                except Exception as exc:
+                    if on_error is not None:
+                        on_error(exc)
+                    if policy == FAIL_FAST:
+                        raise
+                    results[index] = exc
+                    failures.append(exc)
+                    if max_failures is not None and len(failures) > max_failures:
+                        raise BatchAbortedError(failures) from exc
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if isinstance(coroutines, Sequence):
+            # Close coroutines that were never started so they do not warn.
+            for coro in items:
+                if asyncio.iscoroutine(coro):
+                    coro.close()
+
+
+def _pull(source: AwaitableSource[T]) -> Callable[[], Awaitable[Any]]:
+    """Return a coroutine function producing the next item or ``_DONE``."""
+
+    if isinstance(source, AsyncIterable):
+        iterator = source.__aiter__()
+
+        async def next_async() -> Any:
+            try:
+                return await iterator.__anext__()
+            except StopAsyncIteration:
+                return _DONE
+
+        return next_async
+    items = iter(source)
+
+    async def next_sync() -> Any:
+        return next(items, _DONE)
+
+    return next_sync
+
+
+async def stream_limited(
+    source: AwaitableSource[T],
+    *,
+    limit: int | AdaptiveLimiter = 5,
+    ordered: bool = False,
+    max_buffer: int | None = None,
     on_error: Callable[[Exception], None] | None = None,
-) -> list[T]:
-    """Gather awaitables honouring the concurrency ``limit``."""
+) -> AsyncIterator[T]:
+    """Yield results of awaitables from ``source`` with at most ``limit`` running.
+
+    Items are pulled only when a slot is free, so memory stays proportional to
+    ``limit`` rather than to the length of ``source``.
+
+    Parameters
+    ----------
+    source:
+        Iterable or async iterable of awaitables, e.g. a generator expression.
+    limit:
+        Maximum number of awaitables in flight, or an :class:`AdaptiveLimiter`.
+    ordered:
+        Yield in input order. Results that finish early wait in a reorder
+        buffer; no new work starts while ``max_buffer`` of them are waiting.
+    max_buffer:
+        Reorder buffer bound, defaults to ``limit``.
+    on_error:
+        Called with the first exception before it propagates. Work still in
+        flight is cancelled when the stream fails or the consumer stops early.
+    """
 
-    semaphore = asyncio.Semaphore(limit)
+    if _capacity(limit) <= 0:
+        raise ValueError("limit must be positive")
+    pull = _pull(source)
+    pending: dict[asyncio.Future[T], int] = {}
+    buffer: dict[int, T] = {}
+    started = emitted = 0
+    exhausted = False
+    try:
+        while True:
+            capacity = _capacity(limit)
+            window = capacity + (capacity if max_buffer is None else max_buffer)
+            while not exhausted and len(pending) < capacity and (not ordered or started - emitted < window):
+                item = await pull()
+                if item is _DONE:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(_admit(item, limit))] = started
+                started += 1
+            if not pending:
+                return
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=pending.__getitem__):
+                index = pending.pop(task)
+                try:
+                    result = task.result()
+                except Exception as exc:
+                    if on_error is not None:
+                        on_error(exc)
+                    raise
+                if ordered:
+                    buffer[index] = result
+                else:
+                    yield result
+            while emitted in buffer:
+                yield buffer.pop(emitted)
+                emitted += 1
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
-    async def worker(coro: Awaitable[T]) -> T:
-        async with semaphore:
+
+def _run_chunk(func: Callable[[Any], T], chunk: list[Any]) -> list[T]:
+    # Module level so process pools can pickle it.
+    return [func(item) for item in chunk]
+
+
+async def _map_in_executor(
+    make_executor: Callable[[], Executor],
+    executor: Executor | None,
+    func: Callable[[Any], T],
+    items: Iterable[Any],
+    workers: int,
+    limit: int | None,
+    chunksize: int,
+    ordered: bool,
+) -> AsyncIterator[T]:
+    if chunksize <= 0:
+        raise ValueError("chunksize must be positive")
+    loop = asyncio.get_running_loop()
+    owned = executor is None
+    pool = make_executor() if executor is None else executor
+    iterator = iter(items)
+    chunks = iter(lambda: list(itertools.islice(iterator, chunksize)), [])
+    futures = (loop.run_in_executor(pool, _run_chunk, func, chunk) for chunk in chunks)
+    try:
+        async for results in stream_limited(futures, limit=limit or 2 * workers, ordered=ordered):
+            for result in results:
+                yield result
+    finally:
+        if owned:
+            # Drop queued chunks and wait for running ones without blocking the loop.
+            await asyncio.to_thread(pool.shutdown, wait=True, cancel_futures=True)
+
+
+def map_in_threads(
+    func: Callable[[Any], T],
+    items: Iterable[Any],
+    *,
+    max_workers: int | None = None,
+    limit: int | None = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    executor: Executor | None = None,
+) -> AsyncIterator[T]:
+    """Yield ``func(item)`` for each item, computed on a thread pool.
+
+    Parameters
+    ----------
+    max_workers:
+        Size of the pool created for this call; defaults to the CPU count.
+    limit:
+        Chunks submitted but not yet consumed; defaults to twice the workers.
+        Items are pulled from ``items`` lazily as chunks complete.
+    chunksize:
+        Items sent to a worker per task.
+    ordered:
+        Yield in input order (default) or as chunks complete.
+    executor:
+        Existing executor to use; it is left running afterwards. A pool
+        created by the call is shut down when iteration ends, fails or is
+        abandoned, cancelling chunks that have not started.
+    """
+
+    workers = max_workers or os.cpu_count() or 1
+    return _map_in_executor(
+        lambda: ThreadPoolExecutor(max_workers=workers), executor, func, items, workers, limit, chunksize, ordered
+    )
+
+
+def map_in_processes(
+    func: Callable[[Any], T],
+    items: Iterable[Any],
+    *,
+    max_workers: int | None = None,
+    limit: int | None = None,
+    chunksize: int = 1,
+    ordered: bool = True,
+    executor: Executor | None = None,
+    mp_context: Any = None,
+) -> AsyncIterator[T]:
+    """Yield ``func(item)`` for each item, computed in worker processes.
+
+    ``func``, the items and the results must be picklable. Larger
+    ``chunksize`` values amortise inter-process overhead for cheap items; see
+    ``benchmarks/bench_executor_chunks.py``. Other parameters match
+    :func:`map_in_threads`; ``mp_context`` is passed to
+    :class:`~concurrent.futures.ProcessPoolExecutor`.
+    """
+
+    workers = max_workers or os.cpu_count() or 1
+    return _map_in_executor(
+        lambda: ProcessPoolExecutor(max_workers=workers, mp_context=mp_context),
+        executor,
+        func,
+        items,
+        workers,
+        limit,
+        chunksize,
+        ordered,
+    )
+
+
+class RateLimit:
+    """Generic cell rate algorithm (GCRA) limiter: ``rate`` calls/s, bursts of ``burst``.
+
+    Equivalent to a token bucket of size ``burst`` refilled at ``rate`` but
+    stores a single timestamp, the theoretical arrival time of the next call.
+    """
+
+    __slots__ = ("rate", "burst", "_interval", "_tolerance", "_tat")
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self._interval = 1.0 / rate
+        self._tolerance = (burst - 1) * self._interval
+        self._tat = -math.inf
+
+    def delay(self, now: float) -> float:
+        """Seconds until a call is allowed at ``now``; ``0`` if allowed already."""
+
+        return max(0.0, self._tat - self._tolerance - now)
+
+    def reserve(self, now: float) -> None:
+        """Record a call made at ``now``."""
+
+        self._tat = max(self._tat, now) + self._interval
+
+
+class _Job:
+    __slots__ = ("func", "args", "kwargs", "key", "tenant", "future", "submitted")
+
+    def __init__(self, func, args, kwargs, key, tenant, future, submitted) -> None:
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+        self.tenant = tenant
+        self.future = future
+        self.submitted = submitted
+
+
+class RateLimitedScheduler:
+    """Asyncio scheduler enforcing per-key rate limits with priorities and fairness.
+
+    Calls are queued with :meth:`submit` and started by a dispatcher task
+    (``async with scheduler:`` runs it). Among queued calls the lowest
+    ``priority`` value goes first; tenants sharing a priority are served
+    round-robin, each tenant in FIFO order. A call starts once its ``key``'s
+    :class:`RateLimit` allows it; calls for other keys are not held up.
+
+    Parameters
+    ----------
+    limits:
+        ``{key: RateLimit}`` for keys with their own limit, e.g. one per API.
+    default_limit:
+        Factory for keys missing from ``limits``, e.g.
+        ``lambda: RateLimit(30, burst=5)``. ``None`` leaves them unlimited.
+    max_concurrency:
+        Optional cap on calls running at once.
+    clock, sleep:
+        Time source and sleep coroutine, injectable for tests.
+    metric, registry:
+        With ``metric`` set, ``<metric>.queue_depth`` is kept as a gauge and
+        the time between submit and start is recorded in the
+        ``<metric>.wait`` histogram of ``registry`` (default registry
+        otherwise).
+    """
+
+    def __init__(
+        self,
+        *,
+        limits: Mapping[str, RateLimit] | None = None,
+        default_limit: Callable[[], RateLimit] | None = None,
+        max_concurrency: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        metric: str | None = None,
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        self.limits: dict[str, RateLimit] = dict(limits or {})
+        self.default_limit = default_limit
+        self.max_concurrency = max_concurrency
+        self.clock = clock
+        self.sleep = sleep
+        self.metric = metric
+        self.registry = registry
+        self._queues: dict[int, OrderedDict[str, deque[_Job]]] = {}
+        self._depth = 0
+        self._running: set[asyncio.Task[None]] = set()
+        self._wakeup: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task[None] | None = None
+        self._closing = False
+
+    @property
+    def queue_depth(self) -> int:
+        return self._depth
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    def depth_by_tenant(self) -> dict[str, int]:
+        depths: dict[str, int] = {}
+        for tenants in self._queues.values():
+            for tenant, jobs in tenants.items():
+                depths[tenant] = depths.get(tenant, 0) + len(jobs)
+        return depths
+
+    def _metrics(self) -> MetricsRegistry:
+        return self.registry or default_registry()
+
+    def _publish_depth(self) -> None:
+        if self.metric is not None:
+            self._metrics().set_gauge(f"{self.metric}.queue_depth", self._depth)
+
+    def _limit_for(self, key: str) -> RateLimit | None:
+        limit = self.limits.get(key)
+        if limit is None and self.default_limit is not None:
+            limit = self.limits[key] = self.default_limit()
+        return limit
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        key: str = "default",
+        tenant: str = "default",
+        priority: int = 0,
+        **kwargs: Any,
+    ) -> asyncio.Future[T]:
+        """Queue ``func(*args, **kwargs)`` and return a future for its result.
+
+        ``func`` may be a coroutine function or a blocking callable such as
+        :func:`python.bot_messaging.send_telegram`, which then runs in a worker
+        thread. Nothing is called before the job starts; cancelling the future
+        before then removes the job from the queue. Raises
+        :class:`RuntimeError` once :meth:`close` has been called.
+        """
+
+        if self._closing:
+            raise RuntimeError("scheduler is closed")
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        job = _Job(func, args, kwargs, key, tenant, future, self.clock())
+        self._queues.setdefault(priority, OrderedDict()).setdefault(tenant, deque()).append(job)
+        self._depth += 1
+        self._publish_depth()
+        self._wake()
+        return future
+
+    def _wake(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _next_ready(self, now: float) -> tuple[_Job | None, float | None]:
+        """Pop the next startable job, or return the shortest wait until one is."""
+
+        soonest: float | None = None
+        for priority in sorted(self._queues):
+            tenants = self._queues[priority]
+            for tenant in list(tenants):
+                jobs = tenants[tenant]
+                while jobs and jobs[0].future.cancelled():
+                    jobs.popleft()
+                    self._depth -= 1
+                    self._publish_depth()
+                if jobs:
+                    limit = self._limit_for(jobs[0].key)
+                    wait = 0.0 if limit is None else limit.delay(now)
+                    if wait > 0:
+                        soonest = wait if soonest is None else min(soonest, wait)
+                        continue
+                    job = jobs.popleft()
+                    self._depth -= 1
+                    if limit is not None:
+                        limit.reserve(now)
+                    if jobs:
+                        tenants.move_to_end(tenant)
+                    else:
+                        del tenants[tenant]
+                    if not tenants:
+                        del self._queues[priority]
+                    return job, None
+                del tenants[tenant]
+            if not tenants:
+                del self._queues[priority]
+        return None, soonest
+
+    async def _dispatch(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            self._wakeup.clear()
+            job = wait = None
+            if self.max_concurrency is None or len(self._running) < self.max_concurrency:
+                job, wait = self._next_ready(self.clock())
+            if job is not None:
+                self._start(job)
+                continue
+            if self._closing and not self._queues and not self._running:
+                return
+            waiter = asyncio.ensure_future(self._wakeup.wait())
+            sleeper = asyncio.ensure_future(self.sleep(wait)) if wait is not None else None
             try:
-                return await coro
-            except Exception as exc:
-                if on_error is not None:
-                    on_error(exc)
-                raise
-
-    tasks = [asyncio.create_task(worker(coro)) for coro in coroutines]
-    results: list[T] = []
-    for task in tasks:
-        results.append(await task)
-    return results
+                await asyncio.wait([t for t in (waiter, sleeper) if t is not None], return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                waiter.cancel()
+                if sleeper is not None:
+                    sleeper.cancel()
+
+    def _start(self, job: _Job) -> None:
+        self._publish_depth()
+        if self.metric is not None:
+            self._metrics().record(f"{self.metric}.wait", self.clock() - job.submitted)
+        task = asyncio.ensure_future(self._execute(job))
+        self._running.add(task)
+        task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task[None]) -> None:
+        self._running.discard(task)
+        self._wake()
+
+    async def _execute(self, job: _Job) -> None:
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                result = await job.func(*job.args, **job.kwargs)
+            else:
+                result = await asyncio.to_thread(job.func, *job.args, **job.kwargs)
+        except asyncio.CancelledError:
+            job.future.cancel()
+            raise
+        except Exception as exc:
+            if not job.future.done():
+                job.future.set_exception(exc)
+        else:
+            if not job.future.done():
+                job.future.set_result(result)
+
+    async def start(self) -> None:
+        if self._dispatcher is None:
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+    async def close(self) -> None:
+        """Stop accepting work, then wait for queued and running calls to finish.
+
+        If the scheduler was never started, queued calls cannot run, so their
+        futures are cancelled instead of being left pending forever.
+        """
+
+        self._closing = True
+        if self._dispatcher is not None:
+            self._wake()
+            await self._dispatcher
+            self._dispatcher = None
+            return
+        for tenants in self._queues.values():
+            for jobs in tenants.values():
+                for job in jobs:
+                    job.future.cancel()
+        self._queues.clear()
+        self._depth = 0
+        self._publish_depth()
+
+    async def __aenter__(self) -> "RateLimitedScheduler":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
@@ -1,5 +1,10 @@
 """Send messages to chat platforms using HTTP APIs.
 
+Every helper accepts ``breaker=`` (a
+:class:`general.circuit_breaker.CircuitBreaker`) so a platform outage makes
+further sends fail fast with ``CircuitOpenError`` instead of waiting on
+timeouts.
+
 Usage example
 -------------
 >>> from python import bot_messaging
@@ -20,6 +25,8 @@ import json
 from typing import Any, Callable, Mapping
 from urllib.request import Request, urlopen
 
+from general.circuit_breaker import CircuitBreaker
+
 HttpSender = Callable[[Request], Any]
 
 __all__ = ["APIError", "send_telegram", "send_whatsapp"]
@@ -29,7 +36,9 @@ class APIError(RuntimeError):
     """Raised when the remote messaging API returns an error."""
 
 
-def _post(url: str, payload: Mapping[str, Any], sender: HttpSender | None = None) -> Any:
+def _post(url: str, payload: Mapping[str, Any], sender: HttpSender | None = None, breaker: CircuitBreaker | None = None) -> Any:
+    if breaker is not None:
+        return breaker.call(_post, url, payload, sender)
     data = json.dumps(payload).encode("utf-8")
     request = Request(url, data=data, headers={"Content-Type": "application/json"})
     opener = sender or urlopen
@@ -40,18 +49,28 @@ def _post(url: str, payload: Mapping[str, Any], sender: HttpSender | None = None
         return body
 
 
-def send_telegram(*, token: str, chat_id: str, text: str, sender: HttpSender | None = None) -> Any:
+def send_telegram(
+    *, token: str, chat_id: str, text: str, sender: HttpSender | None = None, breaker: CircuitBreaker | None = None
+) -> Any:
     """Send ``text`` to ``chat_id`` using Telegram's sendMessage endpoint."""
 
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = {"chat_id": chat_id, "text": text}
-    return _post(url, payload, sender=sender)
+    return _post(url, payload, sender=sender, breaker=breaker)
 
 
-def send_whatsapp(*, api_url: str, to: str, text: str, token: str | None = None, sender: HttpSender | None = None) -> Any:
+def send_whatsapp(
+    *,
+    api_url: str,
+    to: str,
+    text: str,
+    token: str | None = None,
+    sender: HttpSender | None = None,
+    breaker: CircuitBreaker | None = None,
+) -> Any:
     """Send ``text`` to ``to`` via a WhatsApp-compatible webhook."""
 
     payload = {"to": to, "text": text}
     if token:
         payload["token"] = token
-    return _post(api_url, payload, sender=sender)
+    return _post(api_url, payload, sender=sender, breaker=breaker)
@@ -1,5 +1,13 @@
 """Common decorators for logging and timing function calls.
 
+``log_calls`` only formats arguments when a logger is attached and enabled,
+truncates huge reprs (``max_repr``) and can emit structured fields instead of
+a message string. ``time_calls(profile_every=n)`` additionally runs every
+``n``-th call under a :class:`StackProfiler`, which aggregates self time per
+call stack and writes it in the collapsed-stack format read by
+``flamegraph.pl`` and speedscope. Calls that are not sampled only pay for a
+counter increment.
+
 Usage example
 -------------
 >>> from python.decorators import log_calls
@@ -12,26 +20,123 @@ Usage example
 
 from __future__ import annotations
 
+import itertools
+import reprlib
+import sys
+import threading
 import time
 from functools import wraps
-from typing import Any, Callable, TypeVar
+from pathlib import Path
+from typing import Any, Callable, TypeVar, Union
 
 T = TypeVar("T")
+PathLike = Union[str, Path]
+
+__all__ = ["StackProfiler", "log_calls", "time_calls"]
+
+
+class _TruncatingRepr(reprlib.Repr):
+    """``reprlib.Repr`` that also caps binary payloads before rendering them."""
+
+    def __init__(self, limit: int) -> None:
+        super().__init__()
+        self.maxstring = self.maxother = self.maxlong = limit
+        items = max(6, limit // 8)
+        self.maxlist = self.maxtuple = self.maxdict = self.maxset = items
+        self.maxfrozenset = self.maxdeque = self.maxarray = items
+        self.maxlevel = 4
+
+    def repr_bytes(self, obj: bytes, level: int) -> str:
+        if len(obj) <= self.maxstring:
+            return repr(obj)
+        return f"{obj[: self.maxstring // 2]!r}...<{len(obj)} bytes>"
+
+    def repr_bytearray(self, obj: bytearray, level: int) -> str:
+        if len(obj) <= self.maxstring:
+            return repr(obj)
+        return f"bytearray({bytes(obj[: self.maxstring // 2])!r}...<{len(obj)} bytes>)"
+
+    def _small(self, value: Any, depth: int = 3) -> bool:
+        cls = type(value)
+        if cls in _ATOMIC:
+            return True
+        if cls in _TEXT:
+            return len(value) <= self.maxstring
+        if not depth:
+            return False
+        if cls in _FLAT:
+            if len(value) > self.maxlist:
+                return False
+            for item in value:
+                if not self._small(item, depth - 1):
+                    return False
+            return True
+        if cls is dict:
+            if len(value) > self.maxdict:
+                return False
+            for key, item in value.items():
+                if not self._small(key, 0) or not self._small(item, depth - 1):
+                    return False
+            return True
+        return False
+
+    def format(self, value: Any) -> str:
+        """Render ``value``, using plain ``repr`` when it is small and shallow."""
 
-__all__ = ["log_calls", "time_calls"]
+        return repr(value) if self._small(value) else self.repr(value)
 
 
-def log_calls(logger: Callable[[str], None] | None = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
-    """Decorator logging function entry and exit."""
+_ATOMIC = frozenset({int, float, bool, type(None)})
+_TEXT = frozenset({str, bytes})
+_FLAT = frozenset({tuple, list})
+
+
+def log_calls(
+    logger: Callable[..., None] | None = None,
+    *,
+    structured: bool = False,
+    max_repr: int | None = 200,
+    enabled: Callable[[], bool] | None = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator logging function entry and exit.
+
+    Parameters
+    ----------
+    logger:
+        Receives one message per entry and exit. Without a logger the function
+        is returned undecorated, so there is no per-call cost at all.
+    structured:
+        Call ``logger("call", function=..., args=[...], kwargs={...})`` and
+        ``logger("return", function=..., result=...)`` instead of passing a
+        formatted string, e.g. with ``StructuredLogger.debug``.
+    max_repr:
+        Approximate character limit for each rendered value; large strings,
+        bytes and containers are abbreviated. ``None`` uses plain ``repr``.
+    enabled:
+        Checked on every call; when it returns ``False`` nothing is formatted,
+        e.g. ``enabled=lambda: log.is_enabled_for(DEBUG)``.
+    """
+
+    fmt = repr if max_repr is None else _TruncatingRepr(max_repr).format
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        log = logger or (lambda message: None)
+        if logger is None:
+            return func
+        name = func.__name__
 
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> T:
-            log(f"call {func.__name__} args={args} kwargs={kwargs}")
-            result = func(*args, **kwargs)
-            log(f"return {func.__name__} -> {result!r}")
+            if enabled is not None and not enabled():
+                return func(*args, **kwargs)
+            if structured:
+                fields = {k: fmt(v) for k, v in kwargs.items()}
+                logger("call", function=name, args=[fmt(arg) for arg in args], kwargs=fields)
+                result = func(*args, **kwargs)
+                logger("return", function=name, result=fmt(result))
+            else:
+                logger(f"call {name} args={fmt(args)} kwargs={fmt(kwargs)}")
+                result = func(*args, **kwargs)
+                logger(f"return {name} -> {fmt(result)}")
             return result
 
         return wrapper
@@ -39,22 +144,151 @@ def log_calls(logger: Callable[[str], None] | None = None) -> Callable[[Callable
     return decorator
 
 
-def time_calls(clock: Callable[[], float] | None = None, logger: Callable[[str], None] | None = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
-    """Decorator logging execution time for the wrapped function."""
+def _frame_name(frame: Any) -> str:
+    return f"{frame.f_globals.get('__name__', '?')}.{getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+
+
+def _builtin_name(func: Any) -> str:
+    module = getattr(func, "__module__", None) or "builtins"
+    return f"{module}.{getattr(func, '__qualname__', repr(func))}"
+
+
+class StackProfiler:
+    """Aggregate self time per call stack using :func:`sys.setprofile`.
+
+    Each profiled call contributes the nanoseconds spent in every distinct
+    stack (outermost frame first). Totals accumulate across calls and threads
+    until :meth:`reset`.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.stacks: dict[tuple[str, ...], int] = {}
+        self.calls = 0
+
+    def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Call ``func`` under the profiler and merge its stacks into the totals.
+
+        If another profile function is already installed on this thread the
+        call runs unprofiled rather than displacing it.
+        """
+
+        previous = sys.getprofile()
+        if previous is not None:
+            return func(*args, **kwargs)
+        local: dict[tuple[str, ...], int] = {}
+        paths: list[tuple[str, ...]] = []
+        clock = time.perf_counter_ns
+        last = clock()
+
+        def callback(frame: Any, event: str, arg: Any) -> None:
+            nonlocal last
+            now = clock()
+            if paths:
+                path = paths[-1]
+                local[path] = local.get(path, 0) + now - last
+            if event == "call" or event == "c_call":
+                name = _frame_name(frame) if event == "call" else _builtin_name(arg)
+                paths.append((paths[-1] if paths else ()) + (name,))
+            elif paths:
+                paths.pop()
+            last = clock()
+
+        sys.setprofile(callback)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sys.setprofile(None)
+            with self._lock:
+                self.calls += 1
+                for path, elapsed in local.items():
+                    if path:
+                        self.stacks[path] = self.stacks.get(path, 0) + elapsed
+
+    def hotspots(self, n: int = 10) -> list[tuple[str, float]]:
+        """Return ``(function, self_seconds)`` pairs for the ``n`` costliest functions."""
+
+        totals: dict[str, int] = {}
+        with self._lock:
+            for path, elapsed in self.stacks.items():
+                totals[path[-1]] = totals.get(path[-1], 0) + elapsed
+        ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)[:n]
+        return [(name, elapsed / 1e9) for name, elapsed in ranked]
+
+    def collapsed(self) -> str:
+        """Return ``frame;frame;frame microseconds`` lines, one per stack."""
+
+        with self._lock:
+            items = sorted(self.stacks.items())
+        return "".join(f"{';'.join(path)} {elapsed // 1000}\n" for path, elapsed in items if elapsed >= 1000)
+
+    def write_collapsed(self, path: PathLike) -> Path:
+        """Write :meth:`collapsed` output to ``path`` and return it."""
+
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(self.collapsed(), encoding="utf-8")
+        return target
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stacks.clear()
+            self.calls = 0
+
+
+def time_calls(
+    clock: Callable[[], float] | None = None,
+    logger: Callable[[str], None] | None = None,
+    *,
+    profile_every: int = 0,
+    profiler: StackProfiler | None = None,
+    profile_output: PathLike | None = None,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator logging execution time for the wrapped function.
+
+    Parameters
+    ----------
+    profile_every:
+        Profile every ``n``-th call with a :class:`StackProfiler`; ``0``
+        disables profiling. The profiler is exposed as ``wrapper.profiler``.
+    profiler:
+        Profiler to aggregate into, e.g. one shared by several functions.
+    profile_output:
+        Rewrite this collapsed-stack file after each profiled call, once its
+        duration has been measured. Write errors are reported to ``logger``
+        and otherwise ignored.
+    """
+
+    if profile_every < 0:
+        raise ValueError("profile_every must not be negative")
 
     def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        log = logger or (lambda message: None)
         now = clock or time.perf_counter
+        stack_profiler = profiler or (StackProfiler() if profile_every else None)
+        counter = itertools.count(1)
 
         @wraps(func)
         def wrapper(*args: Any, **kwargs: Any) -> T:
+            profiled = bool(profile_every) and next(counter) % profile_every == 0
             start = now()
             try:
+                if profiled:
+                    return stack_profiler.run(func, *args, **kwargs)  # type: ignore[union-attr]
                 return func(*args, **kwargs)
             finally:
-                duration = now() - start
-                log(f"time {func.__name__} {duration:.6f}s")
+                elapsed = now() - start
+                if logger is not None:
+                    logger(f"time {func.__name__} {elapsed:.6f}s")
+                # Written after the clock stops so the file I/O is not billed to the
+                # call, and never allowed to replace the call's result or exception.
+                if profiled and profile_output is not None:
+                    try:
+                        stack_profiler.write_collapsed(profile_output)  # type: ignore[union-attr]
+                    except Exception as exc:
+                        if logger is not None:
+                            logger(f"time {func.__name__} profile write failed: {exc}")
 
+        wrapper.profiler = stack_profiler  # type: ignore[attr-defined]
         return wrapper
 
     return decorator
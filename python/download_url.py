@@ -5,6 +5,25 @@ The helper is intentionally dependency-free, using :mod:`urllib.request` under
  example below) which makes the function easy to exercise without performing
 network I/O.
 
+Openers are called as ``opener(url, timeout)``. Features that send request
+headers (``segments`` for parallel HTTP Range downloads, ``resume``) need an
+opener that also accepts a third ``headers`` argument, as the default one
+does; with a two-argument opener they fall back to a single fresh stream.
+
+Downloads are written to ``<name>.part`` and renamed into place when
+complete. With ``resume=True`` (or ``retry=``) a failed transfer leaves the
+part file plus a small manifest behind, and the next attempt fetches only the
+missing byte ranges.
+
+Passing ``checksums`` verifies digests computed while the data streams in;
+:func:`download_and_hash` also returns them.
+
+A :class:`DownloadCache` passed as ``cache=`` keeps responses keyed by URL
+and revalidates them with conditional requests instead of re-downloading.
+
+:func:`download_many` fetches a batch of URLs over a pool of keep-alive
+``http.client`` connections with per-host concurrency caps.
+
 Usage example
 -------------
 >>> import io
@@ -17,17 +36,42 @@ Usage example
 """
 from __future__ import annotations
 
+import hashlib
+import hmac
+import inspect
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
 from pathlib import Path
-from typing import Callable, Optional, Union
+from typing import Callable, Iterable, Mapping, Optional, Union
 from urllib.error import HTTPError, URLError
-from urllib.parse import urlparse
+from urllib.parse import urljoin, urlparse
 from urllib.request import Request, urlopen
 
+from general.circuit_breaker import CircuitBreaker
+from general.retry_backoff import RetryConfig
+from general.retry_backoff import retry as retry_call
+
 PathLike = Union[str, Path]
 Logger = Callable[[str], None]
-Opener = Callable[[str, float | None], object]
+Opener = Callable[..., object]
+Progress = Callable[[int, Optional[int]], None]
 
-__all__ = ["FileDownloadError", "download_file"]
+__all__ = [
+    "ChecksumMismatchError",
+    "DownloadCache",
+    "FileDownloadError",
+    "download_and_hash",
+    "download_file",
+    "download_many",
+]
 
 
 class FileDownloadError(RuntimeError):
@@ -56,11 +100,780 @@ def _emit(logger: Optional[Logger], message: str) -> None:
         pass
 
 
-def _default_opener(url: str, timeout: float | None):
-    request = Request(url, headers={"User-Agent": "code-snippets-agent/1.0"})
+def _default_opener(url: str, timeout: float | None, headers: Optional[Mapping[str, str]] = None):
+    request = Request(url, headers={"User-Agent": "code-snippets-agent/1.0", **(headers or {})})
     return urlopen(request, timeout=timeout)
 
 
+def _accepts_headers(opener: Opener) -> bool:
+    try:
+        parameters = inspect.signature(opener).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    positional = 0
+    for parameter in parameters:
+        if parameter.kind is inspect.Parameter.VAR_POSITIONAL:
+            return True
+        if parameter.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD):
+            positional += 1
+    return positional >= 3
+
+
+def _open(opener: Opener, url: str, timeout: float | None, headers: Optional[Mapping[str, str]] = None):
+    if headers:
+        return opener(url, timeout, headers)
+    return opener(url, timeout)
+
+
+def _status(response: object) -> int:
+    return getattr(response, "status", None) or getattr(response, "code", None) or 200
+
+
+def _header(response: object, name: str) -> Optional[str]:
+    headers = getattr(response, "headers", None)
+    return headers.get(name) if headers is not None else None
+
+
+def _content_length(response: object) -> Optional[int]:
+    total = _header(response, "Content-Length")
+    return int(total) if total and str(total).isdigit() else None
+
+
+_CONTENT_RANGE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+_CACHE_HEADERS = ("ETag", "Last-Modified", "Cache-Control", "Expires", "Date", "Age")
+
+
+def _cache_headers(response: object) -> dict[str, str]:
+    return {name: value for name in _CACHE_HEADERS if (value := _header(response, name))}
+
+
+def _notify(progress: Optional[Progress], downloaded: int, total: Optional[int]) -> None:
+    if progress is None:
+        return
+    try:
+        progress(downloaded, total)
+    except Exception:
+        pass
+
+
+class _ResourceChanged(FileDownloadError):
+    """The server ignored ``If-Range``: the partial data belongs to an old version."""
+
+
+class _PartFile:
+    """The in-progress ``<name>.part`` file and its JSON manifest.
+
+    The manifest (``<name>.part.json``) records the URL, the validators
+    (``ETag``/``Last-Modified``), the total size and the byte ranges already
+    written, so a later attempt can request only what is missing. It is only
+    written when ``resume`` is enabled and is saved every ``checkpoint_bytes``
+    and whenever an attempt ends.
+    """
+
+    def __init__(self, output_path: Path, url: str, *, resume: bool, checkpoint_bytes: int) -> None:
+        self.path = output_path.with_name(output_path.name + ".part")
+        self.manifest_path = output_path.with_name(output_path.name + ".part.json")
+        self.url = url
+        self.resume = resume
+        self.checkpoint_bytes = checkpoint_bytes
+        self.lock = threading.Lock()
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.total: Optional[int] = None
+        self.done: list[list[int]] = []
+        self.headers: dict[str, str] = {}
+        self._unsaved = 0
+
+    def load(self) -> bool:
+        """Restore a previous attempt's state; return whether it can be resumed."""
+
+        if not (self.resume and self.path.exists() and self.manifest_path.exists()):
+            return False
+        try:
+            state = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if state.get("url") != self.url or not (state.get("etag") or state.get("last_modified")):
+            return False
+        self.etag = state.get("etag")
+        self.last_modified = state.get("last_modified")
+        self.total = state.get("total")
+        self.done = [list(span) for span in state.get("done", [])]
+        self.headers = {"ETag": self.etag, "Last-Modified": self.last_modified}
+        self.headers = {name: value for name, value in self.headers.items() if value}
+        return True
+
+    def reset(self) -> None:
+        self.etag = self.last_modified = None
+        self.total = None
+        self.done = []
+        self.headers = {}
+        self._unsaved = 0
+        for path in (self.path, self.manifest_path):
+            path.unlink(missing_ok=True)
+
+    def adopt(self, response: object, total: Optional[int]) -> None:
+        """Take validators and size from the first response of a fresh attempt."""
+
+        self.etag = _header(response, "ETag")
+        self.last_modified = _header(response, "Last-Modified")
+        self.headers = _cache_headers(response)
+        self.total = total
+
+    @property
+    def if_range(self) -> Optional[str]:
+        # If-Range needs a strong ETag; a weak one falls back to the date.
+        if self.etag and not self.etag.startswith("W/"):
+            return self.etag
+        return self.last_modified
+
+    def done_bytes(self) -> int:
+        return sum(end - start for start, end in self.done)
+
+    def missing(self) -> list[tuple[int, Optional[int]]]:
+        """Return missing ``(start, end_inclusive)`` ranges; ``end`` is ``None`` if open-ended."""
+
+        gaps: list[tuple[int, Optional[int]]] = []
+        position = 0
+        for start, end in self.done:
+            if start > position:
+                gaps.append((position, start - 1))
+            position = max(position, end)
+        if self.total is None:
+            gaps.append((position, None))
+        elif position < self.total:
+            gaps.append((position, self.total - 1))
+        return gaps
+
+    def record(self, start: int, end: int) -> None:
+        """Mark bytes ``[start, end)`` as written."""
+
+        with self.lock:
+            merged: list[list[int]] = []
+            for span in sorted(self.done + [[start, end]]):
+                if merged and span[0] <= merged[-1][1]:
+                    merged[-1][1] = max(merged[-1][1], span[1])
+                else:
+                    merged.append(span)
+            self.done = merged
+            self._unsaved += end - start
+            due = self._unsaved >= self.checkpoint_bytes
+        if due:
+            self.save()
+
+    def save(self) -> None:
+        if not self.resume:
+            return
+        with self.lock:
+            self._unsaved = 0
+            state = {
+                "url": self.url,
+                "etag": self.etag,
+                "last_modified": self.last_modified,
+                "total": self.total,
+                "done": self.done,
+            }
+            temporary = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+            temporary.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(temporary, self.manifest_path)
+
+    def open(self):
+        """Open the part file for positional writes, creating and sizing it."""
+
+        handle = self.path.open("r+b" if self.path.exists() else "w+b")
+        if self.total is not None and os.fstat(handle.fileno()).st_size < self.total:
+            handle.truncate(self.total)
+        return handle
+
+    def complete(self, output_path: Path) -> None:
+        if self.total is None:
+            self.total = self.done_bytes()
+        os.replace(self.path, output_path)
+        self.manifest_path.unlink(missing_ok=True)
+
+    def abandon(self) -> None:
+        """Keep state for a later resume, or delete the part file otherwise."""
+
+        if self.resume:
+            self.save()
+        else:
+            self.reset()
+
+
+class _SegmentWriter:
+    """Write chunks at absolute offsets from several threads."""
+
+    def __init__(self, handle) -> None:
+        self._handle = handle
+        self._lock = threading.Lock()
+        self._pwrite = getattr(os, "pwrite", None)
+
+    def write(self, data: bytes, offset: int) -> None:
+        if self._pwrite is not None:
+            view = memoryview(data)
+            while view:
+                written = self._pwrite(self._handle.fileno(), view, offset)
+                view = view[written:]
+                offset += written
+            return
+        with self._lock:
+            self._handle.seek(offset)
+            self._handle.write(data)
+
+
+def _split(start: int, end: int, segments: int) -> list[tuple[int, int]]:
+    """Split the inclusive range ``start..end`` into at most ``segments`` parts."""
+
+    size = -(-(end + 1 - start) // segments)
+    return [(first, min(first + size, end + 1) - 1) for first in range(start, end + 1, size)]
+
+
+class _Digests:
+    """Hashers fed with the bytes as they stream in.
+
+    Only data arriving in file order is hashed inline. Whatever follows the
+    first gap (later segments, bytes from an earlier resumed call) is read
+    back from the part file by :meth:`finish`.
+    """
+
+    def __init__(self, algorithms: Iterable[str]) -> None:
+        self.algorithms = tuple(algorithms)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.lock:
+            self.hashers = {name: hashlib.new(name) for name in self.algorithms}
+            self.offset = 0
+
+    def update(self, data: bytes, offset: int) -> None:
+        with self.lock:
+            if offset == self.offset:
+                for hasher in self.hashers.values():
+                    hasher.update(data)
+                self.offset += len(data)
+
+    def finish(self, path: Path, chunk_size: int) -> dict[str, str]:
+        with self.lock, path.open("rb") as handle:
+            handle.seek(self.offset)
+            for chunk in iter(lambda: handle.read(chunk_size), b""):
+                for hasher in self.hashers.values():
+                    hasher.update(chunk)
+            return {name: hasher.hexdigest() for name, hasher in self.hashers.items()}
+
+
+class _Transfer:
+    """One download of ``url`` into a :class:`_PartFile`, shared by all attempts."""
+
+    def __init__(
+        self,
+        opener: Opener,
+        url: str,
+        part: _PartFile,
+        *,
+        chunk_size: int,
+        timeout: float | None,
+        progress: Optional[Progress],
+        logger: Optional[Logger],
+        segments: int,
+        min_segment_size: int,
+        digests: Optional[_Digests] = None,
+        conditional: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.opener = opener
+        self.url = url
+        self.part = part
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.progress = progress
+        self.logger = logger
+        self.segments = segments
+        self.min_segment_size = min_segment_size
+        self.digests = digests
+        self.conditional = dict(conditional or {})
+        self.ranged = _accepts_headers(opener)
+        self._lock = threading.Lock()
+        self._downloaded = 0
+
+    def _advance(self, count: int) -> None:
+        with self._lock:
+            self._downloaded += count
+            _notify(self.progress, self._downloaded, self.part.total)
+
+    def _restart(self) -> None:
+        self.part.reset()
+        if self.digests is not None:
+            self.digests.reset()
+        self._downloaded = 0
+
+    def attempt(self) -> Optional[dict[str, str]]:
+        """Fetch whatever is still missing, resuming from the manifest if possible.
+
+        Returns the response's cache headers when a conditional request was
+        answered with ``304 Not Modified`` and nothing was downloaded.
+        """
+
+        part = self.part
+        try:
+            if self.ranged and part.load():
+                self._downloaded = part.done_bytes()
+                _emit(self.logger, f"download_file: resuming {self.url} at {self._downloaded} bytes")
+                try:
+                    self._fetch_ranges(part.missing(), part.if_range)
+                    return None
+                except _ResourceChanged:
+                    _emit(self.logger, f"download_file: {self.url} changed on the server, restarting")
+            self._restart()
+            try:
+                return self._fresh()
+            except _ResourceChanged:
+                # Segments saw a newer version than the probe; start once more from scratch.
+                _emit(self.logger, f"download_file: {self.url} changed during the download, restarting")
+                self._restart()
+                return self._fresh()
+        except BaseException:
+            part.abandon()
+            raise
+
+    def _fresh(self) -> Optional[dict[str, str]]:
+        part = self.part
+        # Validators of a cached copy ride along on the first request.
+        conditional = self.conditional if self.ranged else {}
+        if self.segments > 1 and self.ranged:
+            try:
+                probe_response = _open(self.opener, self.url, self.timeout, {"Range": "bytes=0-0", **conditional})
+            except HTTPError as exc:
+                if exc.code == 304:
+                    return _cache_headers(exc)
+                if exc.code != 416:  # 416: empty resource, nothing to split.
+                    raise
+            else:
+                with probe_response as probe:
+                    if _status(probe) == 304:
+                        return _cache_headers(probe)
+                    match = _CONTENT_RANGE.match(_header(probe, "Content-Range") or "")
+                    if _status(probe) != 206 or match is None or match.group(3) == "*":
+                        _emit(self.logger, f"download_file: {self.url} does not support ranges, using a single stream")
+                        self._stream(probe)
+                        return None
+                    part.adopt(probe, int(match.group(3)))
+                count = min(self.segments, part.total // max(self.min_segment_size, 1))
+                if count >= 2:
+                    _emit(self.logger, f"download_file: fetching {part.total} bytes from {self.url} in {count} segments")
+                    part.save()
+                    self._fetch_ranges(_split(0, part.total - 1, count), part.if_range)
+                    return None
+                self._restart()
+        try:
+            response = _open(self.opener, self.url, self.timeout, conditional)
+        except HTTPError as exc:  # urllib reports 304 as an error.
+            if exc.code == 304:
+                return _cache_headers(exc)
+            raise
+        with response:
+            if _status(response) == 304:
+                return _cache_headers(response)
+            self._stream(response)
+        return None
+
+    def _stream(self, response: object) -> None:
+        """Write a full ``200`` response body from offset zero."""
+
+        self.part.adopt(response, _content_length(response))
+        with self.part.open() as handle:
+            writer = _SegmentWriter(handle)
+            received = self._copy(response, writer, 0, None)
+        # http.client returns a short body instead of raising when the connection drops.
+        if self.part.total is not None and received != self.part.total:
+            raise FileDownloadError(f"{self.url} ended at byte {received} of {self.part.total}")
+
+    def _copy(self, response: object, writer: _SegmentWriter, offset: int, end: Optional[int], stop=None) -> int:
+        while end is None or offset <= end:
+            if stop is not None and stop.is_set():
+                break
+            size = self.chunk_size if end is None else min(self.chunk_size, end + 1 - offset)
+            chunk = response.read(size)  # type: ignore[attr-defined]
+            if not chunk:
+                break
+            writer.write(chunk, offset)
+            if self.digests is not None:
+                self.digests.update(chunk, offset)
+            self.part.record(offset, offset + len(chunk))
+            offset += len(chunk)
+            self._advance(len(chunk))
+        return offset
+
+    def _check_version(self, response: object, total: str) -> None:
+        """Raise :class:`_ResourceChanged` if a ``206`` belongs to another version of the file."""
+
+        part = self.part
+        etag, last_modified = _header(response, "ETag"), _header(response, "Last-Modified")
+        if (
+            (part.etag and etag and etag != part.etag)
+            or (part.last_modified and last_modified and last_modified != part.last_modified)
+            or (part.total is not None and total != "*" and int(total) != part.total)
+        ):
+            raise _ResourceChanged(f"{self.url} changed during the download")
+
+    def _fetch_ranges(self, ranges: list[tuple[int, Optional[int]]], if_range: Optional[str]) -> None:
+        if not ranges:
+            return
+        if len(ranges) == 1 and ranges[0][1] is not None and self.segments > 1:
+            start, end = ranges[0]
+            if end + 1 - start >= 2 * self.min_segment_size:
+                ranges = _split(start, end, min(self.segments, (end + 1 - start) // self.min_segment_size))
+        stop = threading.Event()
+
+        with self.part.open() as handle:
+            writer = _SegmentWriter(handle)
+
+            def fetch(start: int, end: Optional[int]) -> None:
+                headers = {"Range": f"bytes={start}-{'' if end is None else end}"}
+                if if_range:
+                    headers["If-Range"] = if_range
+                with _open(self.opener, self.url, self.timeout, headers) as response:
+                    status = _status(response)
+                    if status == 200 and if_range:
+                        raise _ResourceChanged(f"{self.url} changed since the partial download")
+                    match = _CONTENT_RANGE.match(_header(response, "Content-Range") or "")
+                    if status != 206 or match is None or int(match.group(1)) != start:
+                        raise FileDownloadError(f"Server did not honour range {start}- for {self.url}")
+                    self._check_version(response, match.group(3))
+                    if end is None and match.group(3) != "*":
+                        end = int(match.group(3)) - 1
+                        self.part.total = end + 1
+                    offset = self._copy(response, writer, start, end, stop)
+                if end is not None and offset != end + 1 and not stop.is_set():
+                    raise FileDownloadError(f"Range {start}-{end} of {self.url} ended at byte {offset}")
+
+            if len(ranges) == 1:
+                fetch(*ranges[0])
+                return
+            with ThreadPoolExecutor(max_workers=len(ranges), thread_name_prefix="download-segment") as pool:
+                futures = [pool.submit(fetch, start, end) for start, end in ranges]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    stop.set()
+                    raise
+
+
+def _fresh_until(headers: Mapping[str, str], now: float) -> Optional[float]:
+    """Return when a response stops being fresh, or ``None`` if it must not be stored."""
+
+    directives: dict[str, str] = {}
+    for item in headers.get("Cache-Control", "").split(","):
+        name, _, value = item.strip().partition("=")
+        directives[name.lower()] = value.strip('"')
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return now
+    max_age = directives.get("max-age", "")
+    if max_age.isdigit():
+        age = headers.get("Age", "")
+        return now + max(0, int(max_age) - (int(age) if age.isdigit() else 0))
+    if "Expires" in headers:
+        try:
+            expires = parsedate_to_datetime(headers["Expires"])
+            if "Date" not in headers:
+                return max(now, expires.timestamp())
+            return now + max(0.0, (expires - parsedate_to_datetime(headers["Date"])).total_seconds())
+        except (TypeError, ValueError):
+            return now  # Invalid dates mean "already expired".
+    return now
+
+
+class DownloadCache:
+    """On-disk cache of downloaded files keyed by URL, with HTTP revalidation.
+
+    Pass an instance as ``cache=`` to :func:`download_file`. Each entry keeps
+    the body plus a JSON record of its ``ETag``, ``Last-Modified`` and
+    freshness lifetime (``Cache-Control: max-age`` or ``Expires``). Fresh
+    entries are copied to the destination without any request; stale ones are
+    revalidated with ``If-None-Match``/``If-Modified-Since`` and a ``304``
+    counts as a hit. Responses marked ``no-store`` are never kept and
+    ``no-cache`` ones are always revalidated.
+
+    The directory is limited to ``max_bytes``; least recently used entries are
+    evicted first, and the order survives restarts.
+
+    Attributes
+    ----------
+    hits:
+        Downloads served from the cache, including revalidated ones.
+    revalidations:
+        Hits that needed a ``304`` from the server.
+    misses:
+        Downloads that transferred the body.
+    """
+
+    def __init__(
+        self,
+        directory: PathLike,
+        *,
+        max_bytes: int = 1024 * 1024 * 1024,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        found = []
+        for meta_path in self.directory.glob("*.json"):
+            key = meta_path.stem
+            try:
+                record = json.loads(meta_path.read_text(encoding="utf-8"))
+                size = self._data_path(key).stat().st_size
+            except (OSError, ValueError):
+                self._remove(key)
+                continue
+            found.append((record.get("used", 0.0), key, size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.size += size
+
+    def _data_path(self, key: str) -> Path:
+        return self.directory / f"{key}.data"
+
+    def _meta_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _remove(self, key: str) -> None:
+        for path in (self._data_path(key), self._meta_path(key)):
+            path.unlink(missing_ok=True)
+
+    def _write_record(self, key: str, record: dict) -> None:
+        temporary = self.directory / f"{key}.json.tmp"
+        temporary.write_text(json.dumps(record), encoding="utf-8")
+        os.replace(temporary, self._meta_path(key))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Return the stored record for ``url`` or ``None``."""
+
+        key = self._key(url)
+        with self._lock:
+            if key not in self._entries:
+                return None
+        try:
+            record = json.loads(self._meta_path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return record if record.get("url") == url else None
+
+    def is_fresh(self, record: Mapping) -> bool:
+        return self.clock() < record.get("fresh_until", 0.0)
+
+    def conditional_headers(self, record: Mapping) -> dict[str, str]:
+        headers = {}
+        if record.get("etag"):
+            headers["If-None-Match"] = record["etag"]
+        if record.get("last_modified"):
+            headers["If-Modified-Since"] = record["last_modified"]
+        return headers
+
+    def copy_to(self, url: str, target: Path, *, revalidated: Optional[Mapping[str, str]] = None) -> bool:
+        """Copy the cached body to ``target`` and count a hit; ``False`` if it vanished.
+
+        ``revalidated`` holds the headers of a ``304`` response, which renew
+        the entry's freshness.
+        """
+
+        key = self._key(url)
+        record = self.lookup(url)
+        if record is None:
+            return False
+        try:
+            shutil.copyfile(self._data_path(key), target)
+        except FileNotFoundError:
+            return False
+        now = self.clock()
+        record["used"] = now
+        if revalidated is not None:
+            fresh_until = _fresh_until(revalidated, now)
+            record["fresh_until"] = now if fresh_until is None else fresh_until
+            record["etag"] = revalidated.get("ETag", record.get("etag"))
+            record["last_modified"] = revalidated.get("Last-Modified", record.get("last_modified"))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self.hits += 1
+            if revalidated is not None:
+                self.revalidations += 1
+            self._write_record(key, record)
+        return True
+
+    def store(self, url: str, source: Path, headers: Mapping[str, str]) -> bool:
+        """Copy a fresh download into the cache and evict old entries; return whether it was kept."""
+
+        with self._lock:
+            self.misses += 1
+        key = self._key(url)
+        size = source.stat().st_size
+        now = self.clock()
+        fresh_until = _fresh_until(headers, now)
+        cacheable = headers.get("ETag") or headers.get("Last-Modified") or (fresh_until or 0) > now
+        if fresh_until is None or not cacheable or size > self.max_bytes:
+            self.discard(url)
+            return False
+        record = {
+            "url": url,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "fresh_until": fresh_until,
+            "size": size,
+            "used": now,
+        }
+        temporary = self.directory / f"{key}.data.tmp"
+        shutil.copyfile(source, temporary)
+        with self._lock:
+            os.replace(temporary, self._data_path(key))
+            self._write_record(key, record)
+            self.size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            while self.size > self.max_bytes:
+                victim, victim_size = self._entries.popitem(last=False)
+                self._remove(victim)
+                self.size -= victim_size
+        return True
+
+    def discard(self, url: str) -> None:
+        key = self._key(url)
+        with self._lock:
+            self.size -= self._entries.pop(key, 0)
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in self._entries:
+                self._remove(key)
+            self._entries.clear()
+            self.size = 0
+
+
+class ChecksumMismatchError(FileDownloadError):
+    """Raised when a downloaded file does not match an expected digest."""
+
+    def __init__(self, url: str, algorithm: str, expected: str, actual: str) -> None:
+        super().__init__(f"{algorithm} digest of {url} is {actual}, expected {expected}")
+        self.url = url
+        self.algorithm = algorithm
+        self.expected = expected
+        self.actual = actual
+
+
+def _download(
+    url: str,
+    destination: PathLike,
+    *,
+    algorithms: Iterable[str] = (),
+    checksums: Optional[Mapping[str, str]] = None,
+    chunk_size: int = 64 * 1024,
+    timeout: float | None = 30.0,
+    progress: Optional[Progress] = None,
+    opener: Optional[Opener] = None,
+    logger: Optional[Logger] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    segments: int = 1,
+    min_segment_size: int = 1024 * 1024,
+    resume: bool = False,
+    retry: Optional[RetryConfig] = None,
+    checkpoint_bytes: int = 4 * 1024 * 1024,
+    cache: Optional[DownloadCache] = None,
+) -> tuple[Path, dict[str, str]]:
+    if segments < 1:
+        raise ValueError("segments must be at least 1")
+    expected = {name.lower(): digest.lower() for name, digest in (checksums or {}).items()}
+    names = list(dict.fromkeys([name.lower() for name in algorithms] + list(expected)))
+    for name in names:
+        if name not in hashlib.algorithms_available:
+            raise ValueError(f"Unsupported hash algorithm: {name}")
+        if hashlib.new(name).digest_size == 0:  # shake_128/shake_256 need a length for hexdigest().
+            raise ValueError(f"Variable-length hash algorithm not supported: {name}")
+
+    def finish(output_path: Path, part: _PartFile, digests: Optional[_Digests]) -> tuple[Path, dict[str, str]]:
+        computed = digests.finish(part.path, chunk_size) if digests is not None else {}
+        for name, digest in expected.items():
+            if not hmac.compare_digest(computed[name], digest):
+                part.reset()
+                if cache is not None:
+                    cache.discard(url)
+                _emit(logger, f"download_file: {name} mismatch for {url}, deleted the download")
+                raise ChecksumMismatchError(url, name, digest, computed[name])
+        part.complete(output_path)
+        return output_path, computed
+
+    def run() -> tuple[Path, dict[str, str]]:
+        output_path = _prepare_destination(url, destination)
+        part = _PartFile(output_path, url, resume=resume or retry is not None, checkpoint_bytes=checkpoint_bytes)
+        digests = _Digests(names) if names else None
+        record = cache.lookup(url) if cache is not None else None
+        if record is not None and cache.is_fresh(record):
+            part.reset()
+            if cache.copy_to(url, part.path):
+                _emit(logger, f"download_file: serving {url} from the cache")
+                return finish(output_path, part, digests)
+            record = None
+        transfer = _Transfer(
+            opener or _default_opener,
+            url,
+            part,
+            chunk_size=chunk_size,
+            timeout=timeout,
+            progress=progress,
+            logger=logger,
+            segments=segments,
+            min_segment_size=min_segment_size,
+            digests=digests,
+            conditional=cache.conditional_headers(record) if record is not None else None,
+        )
+        try:
+            if retry is None:
+                not_modified = transfer.attempt()
+            else:
+                not_modified = retry_call(transfer.attempt, config=retry)
+            if not_modified is not None:
+                part.reset()
+                if cache.copy_to(url, part.path, revalidated=not_modified):
+                    _emit(logger, f"download_file: {url} not modified, serving from the cache")
+                    return finish(output_path, part, digests)
+                # The entry vanished after the conditional request; fetch unconditionally.
+                transfer.conditional = {}
+                transfer.attempt()
+            if cache is not None:
+                cache.store(url, part.path, part.headers)
+            downloaded = part.total if part.total is not None else part.done_bytes()
+            _emit(logger, f"download_file: downloaded {downloaded} bytes to {output_path}")
+            return finish(output_path, part, digests)
+        except (HTTPError, URLError, HTTPException, OSError) as exc:
+            _emit(logger, f"download_file: failed to download {url}: {exc}")
+            raise FileDownloadError(f"Unable to download {url}: {exc}") from exc
+
+    if breaker is not None:
+        return breaker.call(run)
+    return run()
+
+
 def download_file(
     url: str,
     destination: PathLike,
@@ -68,11 +881,22 @@ def download_file(
     chunk_size: int = 64 * 1024,
     timeout: float | None = 30.0,
     progress: Optional[Callable[[int, Optional[int]], None]] = None,
-    opener: Optional[Callable[[str, float | None], object]] = None,
+    opener: Optional[Callable[..., object]] = None,
     logger: Optional[Logger] = None,
+    breaker: Optional[CircuitBreaker] = None,
+    segments: int = 1,
+    min_segment_size: int = 1024 * 1024,
+    resume: bool = False,
+    retry: Optional[RetryConfig] = None,
+    checkpoint_bytes: int = 4 * 1024 * 1024,
+    checksums: Optional[Mapping[str, str]] = None,
+    cache: Optional[DownloadCache] = None,
 ) -> Path:
     """Stream ``url`` to ``destination`` and return the final :class:`Path`.
 
+    Data is written to ``<name>.part`` next to the target and atomically
+    renamed once complete, so the target never holds a partial file.
+
     Parameters
     ----------
     url:
@@ -90,29 +914,322 @@ def download_file(
         Custom opener used primarily for testing. Defaults to :func:`urlopen`.
     logger:
         Optional logging callback.
+    breaker:
+        Optional :class:`~general.circuit_breaker.CircuitBreaker`. Failed
+        downloads count against it and, while it is open, the call raises
+        :class:`~general.circuit_breaker.CircuitOpenError` without connecting.
+    segments:
+        Number of byte ranges fetched concurrently. Values above one probe the
+        server with a one-byte ``Range`` request; when it answers ``206`` with
+        the total size, the file is preallocated and each range is written at
+        its offset (``os.pwrite`` where available). Every segment carries the
+        probe's validator in ``If-Range`` and its ``ETag``, ``Last-Modified``
+        and size are checked, so a file that changes mid-download is fetched
+        again instead of mixing two versions. Servers that ignore ranges,
+        two-argument openers and files smaller than two segments use a single
+        stream instead.
+    min_segment_size:
+        Smallest range worth its own connection; limits the segment count for
+        smaller files.
+    resume:
+        Keep the ``.part`` file and a ``.part.json`` manifest of completed
+        ranges and validators after a failure. The next call requests only
+        the missing bytes with ``Range`` and ``If-Range``; if the resource
+        changed meanwhile the server sends it whole and the download restarts.
+        Resuming needs a header-capable opener and an ``ETag`` or
+        ``Last-Modified`` from the server.
+    retry:
+        :class:`~general.retry_backoff.RetryConfig` for transient failures.
+        Implies ``resume``, so each retry continues where the last one stopped.
+    checkpoint_bytes:
+        Bytes written between manifest saves while resuming is enabled.
+    checksums:
+        Expected hex digests keyed by :mod:`hashlib` algorithm name, e.g.
+        ``{"sha256": "..."}``. The data is hashed while it streams, so no
+        second read of the file is needed; on a mismatch the partial file is
+        deleted and :class:`ChecksumMismatchError` is raised. Use
+        :func:`download_and_hash` to get the computed digests back.
+    cache:
+        :class:`DownloadCache` consulted before any request. Fresh entries are
+        copied without touching the network, stale ones are revalidated with a
+        conditional request and new responses are stored.
     """
 
-    output_path = _prepare_destination(url, destination)
-    open_resource = opener or _default_opener
+    path, _ = _download(
+        url,
+        destination,
+        checksums=checksums,
+        chunk_size=chunk_size,
+        timeout=timeout,
+        progress=progress,
+        opener=opener,
+        logger=logger,
+        breaker=breaker,
+        segments=segments,
+        min_segment_size=min_segment_size,
+        resume=resume,
+        retry=retry,
+        checkpoint_bytes=checkpoint_bytes,
+        cache=cache,
+    )
+    return path
+
+
+def download_and_hash(
+    url: str,
+    destination: PathLike,
+    *,
+    algorithms: Iterable[str] = ("sha256",),
+    checksums: Optional[Mapping[str, str]] = None,
+    **options,
+) -> tuple[Path, dict[str, str]]:
+    """Download like :func:`download_file` and return ``(path, digests)``.
+
+    ``digests`` maps each name in ``algorithms`` (plus any algorithm in
+    ``checksums``) to its hex digest, computed while the data streams in.
+    Replaces a separate :func:`security_utils.hash_strings.hash_file` pass.
+    Segmented or resumed downloads hash the in-order prefix inline and read
+    back only the rest.
+
+    >>> import io
+    >>> path, digests = download_and_hash(
+    ...     "https://example.test/hello.txt", "./tmp", algorithms=["md5"],
+    ...     opener=lambda url, timeout: io.BytesIO(b"hello"))
+    >>> digests
+    {'md5': '5d41402abc4b2a76b9719d911017c592'}
+    """
+
+    return _download(url, destination, algorithms=algorithms, checksums=checksums, **options)
+
+
+class _PooledResponse:
+    """Response from :class:`_ConnectionPool`; leaving the ``with`` block frees its connection."""
+
+    def __init__(self, pool: "_ConnectionPool", key: tuple[str, str, int | None], connection, response) -> None:
+        self._pool = pool
+        self._key = key
+        self._connection = connection
+        self._response = response
+        self.status = response.status
+        self.headers = response.headers
+
+    def read(self, size: int = -1) -> bytes:
+        return self._response.read(size)
+
+    def close(self) -> None:
+        if self._connection is None:
+            return
+        response, connection = self._response, self._connection
+        self._connection = None
+        # A small unread remainder (a probe byte, an error page) is cheaper to drain than a new handshake.
+        if not response.isclosed() and response.length is not None and response.length <= 64 * 1024:
+            try:
+                response.read()
+            except (HTTPException, OSError):
+                pass
+        self._pool.release(self._key, connection, reusable=response.isclosed() and not response.will_close)
+
+    def __enter__(self) -> "_PooledResponse":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class _ConnectionPool:
+    """Keep-alive ``http.client`` connections shared by :func:`download_many`.
+
+    Idle connections are kept per ``(scheme, host, port)`` and at most
+    ``per_host`` requests run against one host at a time. :meth:`open` has the
+    three-argument opener signature, so every :func:`download_file` feature
+    works on top of it.
+    """
+
+    _REDIRECTS = (301, 302, 303, 307, 308)
+
+    def __init__(self, per_host: int, *, max_redirects: int = 5) -> None:
+        if per_host < 1:
+            raise ValueError("per_host must be at least 1")
+        self.per_host = per_host
+        self.max_redirects = max_redirects
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str, int | None], list] = {}
+        self._slots: dict[tuple[str, str, int | None], threading.BoundedSemaphore] = {}
+        self.connections = 0
+
+    def _slot(self, key: tuple[str, str, int | None]) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._slots.get(key)
+            if slot is None:
+                slot = self._slots[key] = threading.BoundedSemaphore(self.per_host)
+            return slot
+
+    def _connect(self, key: tuple[str, str, int | None], timeout: float | None):
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+            self.connections += 1
+        scheme, host, port = key
+        factory = HTTPSConnection if scheme == "https" else HTTPConnection
+        return factory(host, port, timeout=timeout), False
+
+    def release(self, key: tuple[str, str, int | None], connection, *, reusable: bool) -> None:
+        if reusable:
+            with self._lock:
+                self._idle.setdefault(key, []).append(connection)
+        else:
+            connection.close()
+        self._slot(key).release()
+
+    def open(self, url: str, timeout: float | None, headers: Optional[Mapping[str, str]] = None) -> _PooledResponse:
+        for _ in range(self.max_redirects + 1):
+            parts = urlparse(url)
+            if parts.scheme not in ("http", "https") or not parts.hostname:
+                raise URLError(f"unsupported URL {url!r}")
+            key = (parts.scheme, parts.hostname, parts.port)
+            target = parts.path or "/"
+            if parts.query:
+                target += "?" + parts.query
+            request_headers = {"User-Agent": "code-snippets-agent/1.0", **(headers or {})}
+            slot = self._slot(key)
+            slot.acquire()
+            try:
+                response = self._request(key, timeout, target, request_headers)
+            except BaseException:
+                slot.release()
+                raise
+            pooled = _PooledResponse(self, key, response[0], response[1])
+            status = pooled.status
+            location = _header(pooled, "Location")
+            if status in self._REDIRECTS and location:
+                pooled.close()
+                url = urljoin(url, location)
+                continue
+            if status >= 400:
+                pooled.close()
+                raise HTTPError(url, status, pooled._response.reason, pooled.headers, None)
+            return pooled
+        raise URLError(f"too many redirects for {url!r}")
+
+    def _request(self, key: tuple[str, str, int | None], timeout: float | None, target: str, headers: dict[str, str]):
+        while True:
+            connection, reused = self._connect(key, timeout)
+            try:
+                connection.request("GET", target, headers=headers)
+                return connection, connection.getresponse()
+            except (HTTPException, OSError):
+                connection.close()
+                # The server may have closed an idle keep-alive connection; retry once on a new one.
+                if not reused:
+                    raise
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+def download_many(
+    urls: Iterable[str],
+    destination: PathLike,
+    *,
+    concurrency: int = 8,
+    per_host: int = 4,
+    timeout: float | None = 30.0,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+    logger: Optional[Logger] = None,
+    **options,
+) -> list[Path]:
+    """Download every URL into the ``destination`` directory over pooled connections.
+
+    Connections are persistent ``http.client`` connections reused across
+    files, so many small files from one host cost one handshake per
+    connection instead of one per file. At most ``concurrency`` downloads run
+    at once and at most ``per_host`` of them against any single host.
+
+    Parameters
+    ----------
+    urls:
+        URLs to fetch. Each file is named after the last path segment of its
+        URL; two URLs mapping to the same name raise :class:`ValueError`.
+    destination:
+        Output directory, created if missing.
+    concurrency:
+        Worker threads shared by all hosts.
+    per_host:
+        Connection cap per ``(scheme, host, port)``.
+    timeout:
+        Socket timeout for each connection.
+    progress:
+        Optional callback receiving ``(bytes_read, files_done, files_total)``
+        across the whole batch.
+    logger:
+        Optional logging callback, passed on to :func:`download_file`.
+    options:
+        Further keyword arguments for :func:`download_file`, such as
+        ``retry``, ``resume`` or ``segments``.
+
+    Returns the paths in the order of ``urls``. The first failure cancels
+    downloads that have not started and is raised as
+    :class:`FileDownloadError` once running ones finish.
+    """
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    urls = list(urls)
+    directory = Path(destination)
+    directory.mkdir(parents=True, exist_ok=True)
+    targets = [_prepare_destination(url, directory) for url in urls]
+    if len(set(targets)) != len(targets):
+        raise ValueError("several URLs map to the same file name")
+
+    pool = _ConnectionPool(per_host)
+    lock = threading.Lock()
+    state = {"bytes": 0, "files": 0}
+    seen = [0] * len(urls)
+
+    def report(index: int, done: int, total: Optional[int]) -> None:
+        with lock:
+            state["bytes"] += done - seen[index]
+            seen[index] = done
+            _notify_batch(progress, state["bytes"], state["files"], len(urls))
+
+    def fetch(index: int) -> Path:
+        path = download_file(
+            urls[index],
+            targets[index],
+            timeout=timeout,
+            opener=pool.open,
+            logger=logger,
+            progress=lambda done, total: report(index, done, total),
+            **options,
+        )
+        with lock:
+            state["files"] += 1
+            _notify_batch(progress, state["bytes"], state["files"], len(urls))
+        return path
 
     try:
-        with open_resource(url, timeout) as response, output_path.open("wb") as handle:
-            total = response.headers.get("Content-Length") if hasattr(response, "headers") else None
-            total_size = int(total) if total and str(total).isdigit() else None
-            downloaded = 0
-            while True:
-                chunk = response.read(chunk_size)
-                if not chunk:
-                    break
-                handle.write(chunk)
-                downloaded += len(chunk)
-                if progress is not None:
-                    try:
-                        progress(downloaded, total_size)
-                    except Exception:
-                        pass
-        _emit(logger, f"download_file: downloaded {downloaded} bytes to {output_path}")
-        return output_path
-    except (HTTPError, URLError, OSError) as exc:
-        _emit(logger, f"download_file: failed to download {url}: {exc}")
-        raise FileDownloadError(f"Unable to download {url}: {exc}") from exc
+        with ThreadPoolExecutor(max_workers=min(concurrency, max(len(urls), 1)), thread_name_prefix="download") as executor:
+            futures = [executor.submit(fetch, index) for index in range(len(urls))]
+            try:
+                return [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        pool.close()
+        _emit(logger, f"download_many: {state['files']}/{len(urls)} files over {pool.connections} connections")
+
+
+def _notify_batch(progress: Optional[Callable[[int, int, int], None]], downloaded: int, files: int, total: int) -> None:
+    if progress is None:
+        return
+    try:
+        progress(downloaded, files, total)
+    except Exception:
+        pass
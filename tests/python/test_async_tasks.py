@@ -0,0 +1,293 @@
+"""Integration tests for :mod:`python.async_tasks`."""
+
+import asyncio
+import itertools
+
+import pytest
+
+from python import async_tasks as mod
+
+
+async def _delayed(value: int, delay: float, running: list[int], peak: list[int]) -> int:
+    running[0] += 1
+    peak[0] = max(peak[0], running[0])
+    try:
+        await asyncio.sleep(delay)
+        return value
+    finally:
+        running[0] -= 1
+
+
+def test_stream_limited_is_lazy_and_bounded() -> None:
+    running, peak, pulled = [0], [0], []
+
+    def source():
+        for value in range(20):
+            pulled.append(value)
+            yield _delayed(value, 0.001 * (value % 3), running, peak)
+
+    async def main() -> list[int]:
+        results = []
+        async for value in mod.stream_limited(source(), limit=4):
+            results.append(value)
+            assert len(pulled) - len(results) <= 4
+        return results
+
+    assert sorted(mod.run(main())) == list(range(20))
+    assert peak[0] == 4
+
+
+def test_stream_limited_ordered_with_async_source() -> None:
+    running, peak = [0], [0]
+
+    async def source():
+        for value in range(10):
+            yield _delayed(value, 0.005 if value == 0 else 0.0, running, peak)
+
+    async def main() -> list[int]:
+        return [value async for value in mod.stream_limited(source(), limit=3, ordered=True, max_buffer=2)]
+
+    assert mod.run(main()) == list(range(10))
+    # The slow head item holds back new work once 2 finished results are buffered.
+    assert peak[0] == 3
+
+
+def test_stream_limited_cancels_in_flight_work_on_error() -> None:
+    cancelled: list[int] = []
+    errors: list[Exception] = []
+
+    async def slow(value: int) -> int:
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+        return value
+
+    async def boom() -> int:
+        raise ValueError("bad item")
+
+    async def main() -> None:
+        async for _ in mod.stream_limited([slow(1), slow(2), boom()], limit=3, on_error=errors.append):
+            pass
+
+    with pytest.raises(ValueError):
+        mod.run(main())
+    assert sorted(cancelled) == [1, 2] and len(errors) == 1
+
+
+async def _fail(message: str, delay: float = 0.0) -> int:
+    await asyncio.sleep(delay)
+    raise ValueError(message)
+
+
+def test_gather_limited_fail_fast_cancels_siblings() -> None:
+    cancelled: list[int] = []
+
+    async def slow(value: int) -> int:
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+        return value
+
+    with pytest.raises(ValueError, match="boom"):
+        mod.run(mod.gather_limited([slow(1), _fail("boom", 0.01), slow(2), slow(3)], limit=3))
+    assert sorted(cancelled) == [1, 2]
+
+
+def test_gather_limited_collect_all_and_max_failures() -> None:
+    async def ok(value: int) -> int:
+        return value
+
+    results = mod.run(mod.gather_limited([ok(1), _fail("a"), ok(3)], policy=mod.COLLECT_ALL))
+    assert results[0] == 1 and isinstance(results[1], ValueError) and results[2] == 3
+
+    errors: list[Exception] = []
+    batch = [_fail("a"), ok(2), _fail("b"), _fail("c"), ok(5)]
+    with pytest.raises(mod.BatchAbortedError) as info:
+        mod.run(mod.gather_limited(batch, limit=1, policy=mod.COLLECT_ALL, max_failures=1, on_error=errors.append))
+    assert [str(exc) for exc in info.value.failures] == ["a", "b"] == [str(exc) for exc in errors]
+
+
+def test_gather_limited_timeout_and_deadline() -> None:
+    async def sleepy(delay: float) -> float:
+        await asyncio.sleep(delay)
+        return delay
+
+    results = mod.run(mod.gather_limited([sleepy(0), sleepy(1)], policy=mod.COLLECT_ALL, timeout=0.02))
+    assert results[0] == 0 and isinstance(results[1], asyncio.TimeoutError)
+
+    async def main() -> float:
+        start = asyncio.get_running_loop().time()
+        with pytest.raises(asyncio.TimeoutError):
+            await mod.gather_limited([sleepy(1), sleepy(1)], deadline=0.02)
+        return asyncio.get_running_loop().time() - start
+
+    assert mod.run(main()) < 0.5
+
+
+def test_aimd_limiter_grows_when_saturated_and_backs_off() -> None:
+    from general.metrics import MetricsRegistry
+
+    registry = MetricsRegistry()
+    limiter = mod.AdaptiveLimiter(initial_limit=4, latency_threshold=0.1, metric="api.limit", registry=registry)
+    limiter.inflight = 4
+    for _ in range(3):
+        limiter.on_sample(0.01)
+    assert limiter.limit == 7 and registry.gauges()["api.limit"] == 7
+
+    limiter.on_sample(0.5)
+    limiter.on_sample(0.01, failed=True)
+    assert limiter.limit == 5 and registry.gauges()["api.limit"] == 5
+
+    limiter.inflight = 1
+    limiter.on_sample(0.01)
+    assert limiter.limit == 5
+
+
+def test_gradient_limiter_tracks_latency() -> None:
+    limiter = mod.AdaptiveLimiter("gradient", initial_limit=10, max_limit=50)
+    limiter.inflight = 10
+    for _ in range(20):
+        limiter.on_sample(0.01)
+    grown = limiter.limit
+    assert grown > 10
+    for _ in range(10):
+        limiter.on_sample(0.2)
+    assert limiter.limit < grown
+
+
+def test_gather_limited_respects_adaptive_limit() -> None:
+    running, peak = [0], [0]
+    limiter = mod.AdaptiveLimiter(initial_limit=2, max_limit=2)
+
+    results = mod.run(mod.gather_limited((_delayed(i, 0.001, running, peak) for i in range(10)), limit=limiter))
+
+    assert results == list(range(10))
+    assert peak[0] == 2 and limiter.inflight == 0
+
+
+def _collect(iterator) -> list:
+    async def main() -> list:
+        return [value async for value in iterator]
+
+    return mod.run(main())
+
+
+def test_map_in_threads_ordered_and_unordered() -> None:
+    import time
+
+    def slow_square(x: int) -> int:
+        time.sleep(0.002 * (x % 3))
+        return x * x
+
+    expected = [x * x for x in range(30)]
+    assert _collect(mod.map_in_threads(slow_square, range(30), max_workers=4, chunksize=4)) == expected
+    unordered = _collect(mod.map_in_threads(slow_square, range(30), max_workers=4, ordered=False))
+    assert sorted(unordered) == expected
+
+    async def first_only() -> int:
+        async for value in mod.map_in_threads(slow_square, itertools.count(), max_workers=2):
+            return value
+        return -1
+
+    # Abandoning an endless input shuts the internal pool down promptly.
+    assert mod.run(first_only()) == 0
+
+
+def test_map_in_processes_chunks_and_propagates_errors() -> None:
+    assert _collect(mod.map_in_processes(abs, range(-50, 0), max_workers=2, chunksize=16)) == list(range(50, 0, -1))
+    with pytest.raises(TypeError):
+        _collect(mod.map_in_processes(abs, [1, "x", 3], max_workers=2))
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def test_rate_limit_gcra_allows_burst_then_spaces_calls() -> None:
+    clock = FakeClock()
+    started: list[float] = []
+
+    async def call(i: int) -> int:
+        started.append(clock.now)
+        return i
+
+    async def main() -> list[int]:
+        limits = {"api": mod.RateLimit(10, burst=2)}
+        async with mod.RateLimitedScheduler(limits=limits, clock=clock, sleep=clock.sleep) as scheduler:
+            futures = [scheduler.submit(call, i, key="api") for i in range(5)]
+            return list(await asyncio.gather(*futures))
+
+    assert mod.run(main()) == [0, 1, 2, 3, 4]
+    assert [round(t, 6) for t in started] == [0.0, 0.0, 0.1, 0.2, 0.3]
+
+
+def test_scheduler_priorities_fairness_and_metrics() -> None:
+    from general.metrics import MetricsRegistry
+
+    clock = FakeClock()
+    registry = MetricsRegistry()
+    order: list[str] = []
+
+    async def call(label: str) -> None:
+        order.append(label)
+
+    async def main() -> None:
+        scheduler = mod.RateLimitedScheduler(
+            limits={"api": mod.RateLimit(1)}, clock=clock, sleep=clock.sleep, metric="sched", registry=registry
+        )
+        futures = [scheduler.submit(call, f"a{i}", key="api", tenant="a", priority=1) for i in range(3)]
+        futures += [scheduler.submit(call, f"b{i}", key="api", tenant="b", priority=1) for i in range(2)]
+        futures.append(scheduler.submit(call, "urgent", key="api", tenant="c", priority=0))
+        futures.append(scheduler.submit(call, "other-key", key="free", tenant="a", priority=2))
+        assert scheduler.queue_depth == 7 and scheduler.depth_by_tenant() == {"a": 4, "b": 2, "c": 1}
+        async with scheduler:
+            await asyncio.gather(*futures)
+
+    mod.run(main())
+    # "free" has no limit, so it does not wait behind the rate-limited "api" key.
+    assert order == ["urgent", "other-key", "a0", "b0", "a1", "b1", "a2"]
+    assert registry.gauges()["sched.queue_depth"] == 0
+    wait = registry.snapshot()["sched.wait"]
+    assert wait["count"] == 7 and wait["max"] == 5.0
+
+
+def test_scheduler_runs_blocking_callables_and_propagates_errors() -> None:
+    def blocking(x: int) -> int:
+        if x < 0:
+            raise ValueError("negative")
+        return x * 2
+
+    async def main() -> None:
+        async with mod.RateLimitedScheduler(default_limit=lambda: mod.RateLimit(1000, burst=10)) as scheduler:
+            assert await scheduler.submit(blocking, 21, key="telegram") == 42
+            with pytest.raises(ValueError):
+                await scheduler.submit(blocking, -1, key="telegram")
+
+    mod.run(main())
+
+
+def test_scheduler_close_without_start_cancels_queued_jobs() -> None:
+    async def call() -> int:
+        return 1
+
+    async def main() -> None:
+        scheduler = mod.RateLimitedScheduler()
+        futures = [scheduler.submit(call) for _ in range(3)]
+        await scheduler.close()
+        assert all(future.cancelled() for future in futures) and scheduler.queue_depth == 0
+        with pytest.raises(RuntimeError):
+            scheduler.submit(call)
+
+    mod.run(main())
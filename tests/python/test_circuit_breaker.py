@@ -0,0 +1,110 @@
+"""Integration tests for :mod:`general.circuit_breaker`."""
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from general import circuit_breaker as mod
+from general.retry_backoff import RetryConfig, retry
+from python import bot_messaging, download_url
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _down() -> None:
+    raise ConnectionError("refused")
+
+
+def _fail(breaker: mod.CircuitBreaker, times: int) -> None:
+    for _ in range(times):
+        with pytest.raises(ConnectionError):
+            breaker.call(_down)
+
+
+def test_opens_half_opens_and_closes() -> None:
+    clock = FakeClock()
+    transitions: list[tuple[str, str, str]] = []
+    breaker = mod.CircuitBreaker(
+        "db", min_calls=4, failure_rate=0.5, reset_timeout=10.0, clock=clock,
+        on_state_change=lambda *event: transitions.append(event),
+    )
+
+    breaker.call(lambda: "ok")
+    breaker.call(lambda: "ok")
+    _fail(breaker, 1)
+    assert breaker.state == mod.CLOSED
+    _fail(breaker, 1)
+    assert breaker.state == mod.OPEN
+
+    with pytest.raises(mod.CircuitOpenError) as info:
+        breaker.call(lambda: "never")
+    assert info.value.retry_after == 10.0 and breaker.rejected == 1
+
+    clock.now = 10.0
+    _fail(breaker, 1)
+    assert breaker.state == mod.OPEN
+    clock.now = 20.0
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state == mod.CLOSED
+    assert transitions == [
+        ("db", "closed", "open"),
+        ("db", "open", "half_open"),
+        ("db", "half_open", "open"),
+        ("db", "open", "half_open"),
+        ("db", "half_open", "closed"),
+    ]
+
+
+def test_failures_age_out_of_rolling_window() -> None:
+    clock = FakeClock()
+    breaker = mod.CircuitBreaker(min_calls=3, failure_rate=1.0, window=10.0, buckets=5, clock=clock)
+
+    _fail(breaker, 2)
+    clock.now = 15.0
+    _fail(breaker, 2)
+    assert breaker.state == mod.CLOSED
+    _fail(breaker, 1)
+    assert breaker.state == mod.OPEN
+
+
+def test_ignored_exceptions_and_async_decorator() -> None:
+    breaker = mod.CircuitBreaker(min_calls=1, exceptions=(ConnectionError,))
+
+    @breaker
+    async def lookup(key: str) -> str:
+        if key == "bad":
+            raise KeyError(key)
+        raise ConnectionError(key)
+
+    with pytest.raises(KeyError):
+        asyncio.run(lookup("bad"))
+    assert breaker.state == mod.CLOSED
+    with pytest.raises(ConnectionError):
+        asyncio.run(lookup("down"))
+    with pytest.raises(mod.CircuitOpenError):
+        asyncio.run(lookup("down"))
+
+
+def test_open_circuit_stops_retry_and_http_helpers(tmp_path: Path) -> None:
+    breaker = mod.CircuitBreaker(min_calls=2, failure_rate=1.0)
+    calls: list[int] = []
+
+    def flaky() -> None:
+        calls.append(1)
+        _down()
+
+    with pytest.raises(mod.CircuitOpenError):
+        retry(flaky, config=RetryConfig(attempts=5, backoff=0, breaker=breaker))
+    assert len(calls) == 2
+
+    with pytest.raises(mod.CircuitOpenError):
+        download_url.download_file("https://example.test/a.bin", tmp_path, opener=lambda *a: 1 / 0, breaker=breaker)
+    with pytest.raises(mod.CircuitOpenError):
+        bot_messaging.send_telegram(token="t", chat_id="c", text="hi", sender=lambda r: 1 / 0, breaker=breaker)
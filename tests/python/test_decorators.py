@@ -0,0 +1,118 @@
+"""Integration tests for :mod:`python.decorators`."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+from python import decorators as mod
+
+
+def _inner(n: int) -> int:
+    return sum(range(n))
+
+
+def test_time_calls_profiles_only_sampled_calls(tmp_path: Path) -> None:
+    output = tmp_path / "profile.folded"
+    messages: list[str] = []
+
+    @mod.time_calls(logger=messages.append, profile_every=3, profile_output=output)
+    def work(n: int) -> int:
+        return _inner(n) + len(sorted(range(n)))
+
+    for _ in range(6):
+        assert work(50_000) == sum(range(50_000)) + 50_000
+
+    assert len(messages) == 6
+    assert work.profiler.calls == 2
+    stacks = {";".join(path) for path in work.profiler.stacks}
+    assert any(stack.endswith("work;test_decorators._inner;builtins.sum") for stack in stacks)
+    hot = dict(work.profiler.hotspots())
+    assert "builtins.sum" in hot
+    for line in output.read_text().splitlines():
+        stack, micros = line.rsplit(" ", 1)
+        assert stack and int(micros) > 0
+    assert sys.getprofile() is None
+
+
+def test_time_calls_excludes_profile_writes_from_duration(tmp_path: Path) -> None:
+    ticks = [0.0]
+    messages: list[str] = []
+
+    class SlowWriter(mod.StackProfiler):
+        def write_collapsed(self, path):
+            ticks[0] += 10.0  # Pretend the disk write is slow.
+            return super().write_collapsed(path)
+
+    @mod.time_calls(
+        clock=lambda: ticks[0], logger=messages.append, profile_every=1,
+        profiler=SlowWriter(), profile_output=tmp_path / "p.folded",
+    )
+    def work() -> int:
+        ticks[0] += 1.0
+        return 1
+
+    work()
+    work()
+    assert messages == ["time work 1.000000s", "time work 1.000000s"]
+    assert (tmp_path / "p.folded").exists()
+
+
+def test_time_calls_profile_write_errors_do_not_mask_results(tmp_path: Path) -> None:
+    messages: list[str] = []
+    blocker = tmp_path / "file"
+    blocker.write_text("")
+
+    @mod.time_calls(logger=messages.append, profile_every=1, profile_output=blocker / "p.folded")
+    def work(fail: bool) -> int:
+        if fail:
+            raise KeyError("real")
+        return 7
+
+    assert work(False) == 7
+    with pytest.raises(KeyError, match="real"):
+        work(True)
+    assert sum("profile write failed" in message for message in messages) == 2
+
+
+def test_time_calls_without_profiling_has_no_profiler() -> None:
+    @mod.time_calls()
+    def work() -> str:
+        return "ok"
+
+    assert work() == "ok"
+    assert work.profiler is None
+
+
+def test_log_calls_truncates_and_skips_when_disabled() -> None:
+    messages: list[str] = []
+    active = [True]
+
+    @mod.log_calls(messages.append, max_repr=40, enabled=lambda: active[0])
+    def echo(payload: bytes) -> int:
+        return len(payload)
+
+    assert echo(b"x" * 10_000) == 10_000
+    assert len(messages) == 2 and "<10000 bytes>" in messages[0] and len(messages[0]) < 120
+    active[0] = False
+    echo(b"y")
+    assert len(messages) == 2
+
+
+def test_log_calls_structured_fields_and_noop() -> None:
+    entries: list[tuple[str, dict]] = []
+
+    @mod.log_calls(lambda message, **fields: entries.append((message, fields)), structured=True)
+    def add(a: int, b: int = 0) -> int:
+        return a + b
+
+    assert add(1, b=2) == 3
+    assert entries == [
+        ("call", {"function": "add", "args": ["1"], "kwargs": {"b": "2"}}),
+        ("return", {"function": "add", "result": "3"}),
+    ]
+
+    def plain() -> None:
+        pass
+
+    assert mod.log_calls()(plain) is plain
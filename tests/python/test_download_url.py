@@ -1,6 +1,8 @@
 """Integration tests for :mod:`python.download_url`."""
 
 import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
 import pytest
@@ -46,3 +48,268 @@ def test_download_error(tmp_path: Path) -> None:
 
     with pytest.raises(mod.FileDownloadError):
         mod.download_file("https://example.com/file.txt", tmp_path / "out.txt", opener=failing_opener)
+
+
+class RangeServer(ThreadingHTTPServer):
+    """Local stand-in serving in-memory files with optional Range support."""
+
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), RangeHandler)
+        self.files: dict[str, bytes] = {}
+        self.ranges = True
+        self.requests: list[tuple[str, str | None]] = []
+        self.etags: dict[str, str] = {}
+        self.cut_after: int | None = None
+        self.clients: set[int] = set()
+        self.cache_control: dict[str, str] = {}
+        self.on_request = None
+
+    def url(self, path: str) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}{path}"
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        server: RangeServer = self.server  # type: ignore[assignment]
+        requested = self.headers.get("Range")
+        server.requests.append((self.path, requested))
+        server.clients.add(self.client_address[1])
+        if server.on_request is not None:
+            server.on_request(len(server.requests))
+        body = server.files.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        status, headers = 200, {}
+        etag = server.etags.get(self.path)
+        if etag:
+            headers["ETag"] = etag
+        if_range = self.headers.get("If-Range")
+        if path_control := server.cache_control.get(self.path):
+            headers["Cache-Control"] = path_control
+        if etag and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if server.ranges:
+            headers["Accept-Ranges"] = "bytes"
+            if requested and (if_range is None or if_range == etag):
+                start, end = requested.split("=")[1].split("-")
+                first = int(start)
+                last = min(int(end) if end else len(body) - 1, len(body) - 1)
+                headers["Content-Range"] = f"bytes {first}-{last}/{len(body)}"
+                body, status = body[first : last + 1], 206
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if server.cut_after is not None:
+            # Simulate a dropped connection part-way through the body.
+            self.wfile.write(body[: server.cut_after])
+            server.cut_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture()
+def http_server():
+    server = RangeServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_segmented_download_uses_ranges(tmp_path: Path, http_server: RangeServer) -> None:
+    payload = bytes(range(256)) * 4096 + b"tail"
+    http_server.files["/big.bin"] = payload
+    seen: list[int] = []
+
+    target = mod.download_file(
+        http_server.url("/big.bin"), tmp_path, segments=4, min_segment_size=64 * 1024,
+        chunk_size=16 * 1024, progress=lambda done, total: seen.append(done),
+    )
+
+    assert target.read_bytes() == payload
+    ranges = sorted(header for path, header in http_server.requests if header != "bytes=0-0")
+    assert len(ranges) == 4 and all(header.startswith("bytes=") for header in ranges)
+    assert seen[-1] == len(payload)
+
+
+def test_segmented_download_restarts_when_file_changes_mid_transfer(tmp_path: Path, http_server: RangeServer) -> None:
+    old, new = b"o" * 400_000, b"n" * 400_000
+    http_server.files["/moving.bin"] = old
+    http_server.etags["/moving.bin"] = '"v1"'
+    messages: list[str] = []
+
+    def publish_new_version(count: int) -> None:
+        if count == 2:  # The first segment request, right after the probe.
+            http_server.files["/moving.bin"] = new
+            http_server.etags["/moving.bin"] = '"v2"'
+
+    http_server.on_request = publish_new_version
+    target = mod.download_file(
+        http_server.url("/moving.bin"), tmp_path, segments=4, min_segment_size=64 * 1024, logger=messages.append
+    )
+
+    assert target.read_bytes() == new
+    assert any("changed during the download" in message for message in messages)
+
+
+def test_segmented_download_falls_back_to_single_stream(tmp_path: Path, http_server: RangeServer) -> None:
+    payload = b"x" * 300_000
+    http_server.files["/plain.bin"] = payload
+    http_server.ranges = False
+
+    target = mod.download_file(http_server.url("/plain.bin"), tmp_path, segments=4, min_segment_size=1024)
+
+    assert target.read_bytes() == payload
+    assert len(http_server.requests) == 1
+
+    def two_arg_opener(url: str, timeout: float | None):
+        return DummyResponse(b"hello")
+
+    target = mod.download_file("https://example.com/small.txt", tmp_path, segments=4, opener=two_arg_opener)
+    assert target.read_text() == "hello"
+
+
+def test_resume_fetches_only_missing_bytes(tmp_path: Path, http_server: RangeServer) -> None:
+    payload = bytes(range(256)) * 1000
+    http_server.files["/data.bin"] = payload
+    http_server.etags["/data.bin"] = '"v1"'
+    http_server.cut_after = 100_000
+    target = tmp_path / "data.bin"
+
+    with pytest.raises(mod.FileDownloadError):
+        mod.download_file(http_server.url("/data.bin"), target, resume=True, chunk_size=8192, checkpoint_bytes=8192)
+    assert not target.exists()
+    assert Path(f"{target}.part").exists() and Path(f"{target}.part.json").exists()
+
+    mod.download_file(http_server.url("/data.bin"), target, resume=True, chunk_size=8192)
+
+    assert target.read_bytes() == payload
+    assert not Path(f"{target}.part").exists() and not Path(f"{target}.part.json").exists()
+    resumed = http_server.requests[-1][1]
+    assert resumed is not None and resumed.startswith("bytes=") and resumed != "bytes=0-"
+
+
+def test_retry_resumes_and_restarts_when_resource_changes(tmp_path: Path, http_server: RangeServer) -> None:
+    from general.retry_backoff import RetryConfig
+
+    payload = b"a" * 200_000
+    http_server.files["/doc.bin"] = payload
+    http_server.etags["/doc.bin"] = '"v1"'
+    http_server.cut_after = 50_000
+    messages: list[str] = []
+
+    target = mod.download_file(
+        http_server.url("/doc.bin"), tmp_path, retry=RetryConfig(attempts=2, backoff=0),
+        chunk_size=4096, checkpoint_bytes=4096, logger=messages.append,
+    )
+    assert target.read_bytes() == payload
+    assert any("resuming" in message for message in messages)
+
+    # A new version on the server invalidates the partial data via If-Range.
+    http_server.files["/doc.bin"] = b"b" * 150_000
+    http_server.etags["/doc.bin"] = '"v1"'
+    http_server.cut_after = 10_000
+    with pytest.raises(mod.FileDownloadError):
+        mod.download_file(http_server.url("/doc.bin"), tmp_path, resume=True, chunk_size=4096, checkpoint_bytes=4096)
+    http_server.etags["/doc.bin"] = '"v2"'
+    messages.clear()
+
+    target = mod.download_file(http_server.url("/doc.bin"), tmp_path, resume=True, logger=messages.append)
+    assert target.read_bytes() == b"b" * 150_000
+    assert any("changed on the server" in message for message in messages)
+
+
+def test_download_many_reuses_connections_per_host(tmp_path: Path, http_server: RangeServer) -> None:
+    for index in range(20):
+        http_server.files[f"/files/{index}.txt"] = f"file {index}".encode() * 100
+    urls = [http_server.url(f"/files/{index}.txt") for index in range(20)]
+    updates: list[tuple[int, int, int]] = []
+
+    paths = mod.download_many(
+        urls, tmp_path / "batch", concurrency=8, per_host=2, progress=lambda *update: updates.append(update)
+    )
+
+    assert [path.read_bytes() for path in paths] == [http_server.files[f"/files/{i}.txt"] for i in range(20)]
+    assert len(http_server.clients) <= 2
+    assert updates[-1] == (sum(len(body) for body in http_server.files.values()), 20, 20)
+
+    with pytest.raises(mod.FileDownloadError):
+        mod.download_many([urls[0], http_server.url("/missing.txt")], tmp_path / "errors")
+
+
+def test_inline_digests_and_checksum_verification(tmp_path: Path, http_server: RangeServer) -> None:
+    import hashlib
+
+    payload = bytes(range(256)) * 2048
+    http_server.files["/blob.bin"] = payload
+    url = http_server.url("/blob.bin")
+
+    path, digests = mod.download_and_hash(url, tmp_path / "one", algorithms=["sha256", "md5"])
+    assert digests == {"sha256": hashlib.sha256(payload).hexdigest(), "md5": hashlib.md5(payload).hexdigest()}
+
+    expected = {"SHA256": hashlib.sha256(payload).hexdigest().upper()}
+    path = mod.download_file(url, tmp_path / "two", checksums=expected, segments=4, min_segment_size=64 * 1024)
+    assert path.read_bytes() == payload
+
+    requests = len(http_server.requests)
+    with pytest.raises(ValueError, match="shake_128"):
+        mod.download_and_hash(url, tmp_path / "shake", algorithms=["shake_128"])
+    assert len(http_server.requests) == requests  # Rejected before any request.
+
+    target = tmp_path / "bad" / "blob.bin"
+    with pytest.raises(mod.ChecksumMismatchError) as info:
+        mod.download_file(url, target, checksums={"sha256": "0" * 64}, resume=True)
+    assert info.value.actual == hashlib.sha256(payload).hexdigest()
+    assert not target.exists() and list(target.parent.iterdir()) == []
+
+
+def test_cache_serves_fresh_revalidates_stale_and_evicts(tmp_path: Path, http_server: RangeServer) -> None:
+    now = [1000.0]
+    cache = mod.DownloadCache(tmp_path / "cache", max_bytes=25_000, clock=lambda: now[0])
+    for name in ("a", "b", "c"):
+        http_server.files[f"/{name}.bin"] = name.encode() * 10_000
+        http_server.etags[f"/{name}.bin"] = f'"{name}1"'
+    http_server.cache_control["/a.bin"] = "max-age=60"
+    url = http_server.url("/a.bin")
+
+    assert mod.download_file(url, tmp_path / "out", cache=cache).read_bytes() == b"a" * 10_000
+    requests = len(http_server.requests)
+    mod.download_file(url, tmp_path / "out", cache=cache)
+    assert len(http_server.requests) == requests and (cache.hits, cache.misses) == (1, 1)
+
+    for segments in (1, 4):
+        now[0] += 120  # A 304 carrying max-age makes the entry fresh again.
+        mod.download_file(url, tmp_path / "out", cache=cache, segments=segments, min_segment_size=1024)
+    assert cache.revalidations == 2 and len(http_server.requests) == requests + 2
+
+    http_server.files["/a.bin"] = b"A" * 10_000
+    http_server.etags["/a.bin"] = '"a2"'
+    now[0] += 120
+    assert mod.download_file(url, tmp_path / "out", cache=cache).read_bytes() == b"A" * 10_000
+    assert (cache.hits, cache.misses) == (3, 2)
+
+    mod.download_file(http_server.url("/b.bin"), tmp_path / "out", cache=cache)
+    mod.download_file(http_server.url("/c.bin"), tmp_path / "out", cache=cache)
+    assert len(cache) == 2 and cache.size <= 25_000
+    assert cache.lookup(url) is None
+
+    reopened = mod.DownloadCache(tmp_path / "cache", max_bytes=25_000)
+    assert len(reopened) == 2 and reopened.lookup(http_server.url("/c.bin")) is not None
@@ -0,0 +1,124 @@
+"""Integration tests for :mod:`general.logger`."""
+
+import io
+import json
+import threading
+
+import pytest
+
+from general import logger as mod
+
+
+class CountingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+def _lines(stream: io.StringIO) -> list[dict]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_structured_logger_writes_json_lines() -> None:
+    stream = io.StringIO()
+    mod.StructuredLogger(stream=stream, default_fields={"app": "demo"}).log("hello", n=1)
+    (entry,) = _lines(stream)
+    assert entry["message"] == "hello"
+    assert entry["app"] == "demo"
+    assert entry["n"] == 1
+
+
+def test_buffered_logger_batches_and_flushes() -> None:
+    stream = CountingStream()
+    with mod.BufferedStructuredLogger(stream=stream, batch_size=1000, flush_interval=60) as log:
+        for i in range(100):
+            log.log("tick", i=i)
+        log.flush()
+        assert [entry["i"] for entry in _lines(stream)] == list(range(100))
+        assert stream.writes == 1
+        log.log("after")
+    assert _lines(stream)[-1]["message"] == "after"
+
+
+def test_buffered_logger_snapshots_fields_and_rejects_bad_entries() -> None:
+    stream = CountingStream()
+    with mod.BufferedStructuredLogger(stream=stream, batch_size=1000, flush_interval=60) as log:
+        items = [1]
+        log.log("state", items=items)
+        items.append(2)
+        for i in range(20):
+            log.log("tick", i=i)
+        with pytest.raises(TypeError):
+            log.log("bad", value=object())
+        log.flush()
+    entries = _lines(stream)
+    assert entries[0]["items"] == [1]
+    assert len(entries) == 21 and log.errors == 0
+
+
+def test_buffered_logger_drop_policy() -> None:
+    stream = CountingStream()
+    release = threading.Event()
+    original = stream.write
+
+    def slow_write(text: str) -> int:
+        release.wait(5)
+        return original(text)
+
+    stream.write = slow_write  # type: ignore[method-assign]
+    log = mod.BufferedStructuredLogger(stream=stream, batch_size=1, max_queue=2, overflow="drop_new")
+    for i in range(50):
+        log.log("burst", i=i)
+    release.set()
+    log.close()
+    assert log.dropped > 0
+    assert len(_lines(stream)) + log.dropped == 50
+
+
+def test_levels_filter_and_fields_override_defaults() -> None:
+    stream = io.StringIO()
+    log = mod.StructuredLogger(stream=stream, default_fields={"app": "demo", "env": "dev"}, level=mod.INFO)
+    log.debug("hidden")
+    log.warning("shown", env="prod")
+    log.info("plain")
+    first, second = _lines(stream)
+    assert first == {"timestamp": first["timestamp"], "message": "shown", "level": "warning", "app": "demo", "env": "prod"}
+    assert second["env"] == "dev"
+    assert list(second) == ["timestamp", "message", "level", "app", "env"]
+
+
+def test_orjson_encoder_matches_json_output() -> None:
+    import pytest
+
+    pytest.importorskip("orjson")
+    fast, slow = io.StringIO(), io.StringIO()
+    fields = {"n": 1, "text": "héllo", "items": [1, 2]}
+    mod.StructuredLogger(stream=fast, encoder="orjson", default_fields={"app": "x"}).log("m", **fields)
+    mod.StructuredLogger(stream=slow, default_fields={"app": "x"}).log("m", **fields)
+    assert _lines(fast) == _lines(slow)
+
+
+def test_sampler_every_and_rate_limit_with_summaries() -> None:
+    now = [0.0]
+    stream = io.StringIO()
+    sampler = mod.LogSampler(every=10, summary_interval=60, clock=lambda: now[0])
+    log = mod.StructuredLogger(stream=stream, sampler=sampler)
+    for _ in range(25):
+        log.log("hot loop")
+    log.log("rare")
+    assert [entry["message"] for entry in _lines(stream)] == ["hot loop"] * 3 + ["rare"]
+    now[0] = 61
+    log.log("rare")
+    summary = _lines(stream)[-2]
+    assert summary["message"] == "22 similar messages dropped"
+    assert summary["sampled_message"] == "hot loop"
+
+    limiter = mod.LogSampler(rate=2, burst=2, clock=lambda: now[0])
+    assert [limiter.allow("x") for _ in range(4)] == [True, True, False, False]
+    now[0] += 0.5
+    assert limiter.allow("x") is True
+    assert limiter.take_summaries() == [("x", 2)]
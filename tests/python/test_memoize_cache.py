@@ -0,0 +1,379 @@
+"""Integration tests for :mod:`general.memoize_cache`."""
+
+import threading
+
+import pytest
+
+from general import memoize_cache as mod
+
+
+def test_memoize_lru_eviction() -> None:
+    calls = []
+
+    @mod.memoize(maxsize=2)
+    def square(x: int) -> int:
+        calls.append(x)
+        return x * x
+
+    assert [square(1), square(2), square(1), square(3), square(2)] == [1, 4, 1, 9, 4]
+    assert calls == [1, 2, 3, 2]
+
+
+def test_concurrent_cache_single_flight() -> None:
+    cache = mod.ConcurrentMemoizeCache(maxsize=8, shards=4)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def factory() -> str:
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", factory))) for _ in range(8)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    assert results == ["value"] * 8
+    assert len(calls) == 1
+
+
+def test_concurrent_cache_does_not_cache_failures() -> None:
+    cache = mod.ConcurrentMemoizeCache(maxsize=4)
+
+    def boom() -> int:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        cache.get("k", boom)
+    assert cache.get("k", lambda: 1) == 1
+
+
+def test_amemoize_coalesces_and_skips_failures() -> None:
+    import asyncio
+
+    calls = []
+
+    @mod.amemoize(maxsize=4)
+    async def fetch(key: str) -> str:
+        calls.append(key)
+        await asyncio.sleep(0)
+        if len(calls) == 1:
+            raise RuntimeError("first call fails")
+        return key.upper()
+
+    async def scenario() -> None:
+        results = await asyncio.gather(fetch("a"), fetch("a"), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await asyncio.gather(fetch("a"), fetch("a"), fetch("a")) == ["A", "A", "A"]
+        assert await fetch("a") == "A"
+
+    asyncio.run(scenario())
+    assert calls == ["a", "a"]
+
+
+def test_stats_track_hits_misses_and_evictions() -> None:
+    import io
+    import json
+
+    from general.logger import StructuredLogger
+
+    now = [0.0]
+    cache = mod.MemoizeCache(maxsize=2, ttl=10, clock=lambda: now[0], stats=True)
+    for key in ["a", "a", "b", "c"]:
+        cache.get(key, lambda: key)
+    now[0] = 20
+    cache.get("c", lambda: "c")
+
+    snapshot = cache.stats_snapshot()
+    assert snapshot["hits"] == 1
+    assert snapshot["misses"] == 4
+    assert snapshot["evictions"] == 1
+    assert snapshot["expirations"] == 2
+    assert snapshot["size"] == 1
+    assert snapshot["factory_latency"]["count"] == 4
+
+    stream = io.StringIO()
+    cache.stats.log_to(StructuredLogger(stream=stream), size=len(cache))
+    assert json.loads(stream.getvalue())["misses"] == 4
+
+
+def test_stats_disabled_by_default() -> None:
+    assert mod.MemoizeCache().stats is None
+    assert mod.ConcurrentMemoizeCache().stats_snapshot() is None
+
+
+def test_byte_budget_evicts_large_values() -> None:
+    cache = mod.MemoizeCache(maxsize=100, max_bytes=10, sizeof=len)
+    cache.get("small", lambda: "abc")
+    cache.get("big", lambda: "x" * 9)
+    assert len(cache) == 1
+    assert cache.current_bytes == 9
+    assert cache.get("huge", lambda: "y" * 50) == "y" * 50
+    # An oversized value is not cached and leaves the other entries alone.
+    assert len(cache) == 1 and cache.current_bytes == 9
+    assert cache.get("big", lambda: "recomputed") == "x" * 9
+
+
+def test_concurrent_byte_budget_is_shared_across_shards() -> None:
+    cache = mod.ConcurrentMemoizeCache(maxsize=64, shards=16, max_bytes=1000, sizeof=len)
+    calls: list[int] = []
+
+    def big() -> str:
+        calls.append(1)
+        return "b" * 200
+
+    assert cache.get("big", big) == cache.get("big", big)
+    assert calls == [1]
+
+    for i in range(40):
+        cache.get(i, lambda: "s" * 100)
+    assert sum(shard.cache.current_bytes for shard in cache._shards) <= 1000
+    assert cache.get(39, lambda: "recomputed") == "s" * 100
+
+
+@pytest.mark.parametrize("policy", ["lru", "tinylfu", "arc"])
+def test_policies_respect_maxsize(policy: str) -> None:
+    cache = mod.MemoizeCache(maxsize=8, ttl=5, clock=lambda: 0.0, policy=policy)
+    for i in range(200):
+        key = i % 3 if i % 2 else i
+        assert cache.get(key, lambda: key) == key
+        assert len(cache) <= 8
+
+
+def test_incomplete_policy_fails_at_instantiation() -> None:
+    from general.cache_policies import EvictionPolicy
+
+    class NoVictim(EvictionPolicy):
+        def on_insert(self, key):
+            pass
+
+        def on_access(self, key):
+            pass
+
+        def on_remove(self, key):
+            pass
+
+        def clear(self):
+            pass
+
+    with pytest.raises(TypeError, match="victim"):
+        NoVictim()
+
+
+def test_tinylfu_keeps_hot_keys_through_scan() -> None:
+    def hot_misses(policy: str) -> int:
+        cache = mod.MemoizeCache(maxsize=100, policy=policy)
+        misses = []
+        scan = 0
+        for round_ in range(10):
+            for key in range(20):
+                cache.get(key, lambda: misses.append(round_))
+            for _ in range(200):
+                scan += 1
+                cache.get(10_000 + scan, lambda: None)
+        return sum(1 for round_ in misses if round_ >= 2)
+
+    assert hot_misses("lru") == 160
+    assert hot_misses("tinylfu") == 0
+
+
+def test_sweep_reclaims_expired_entries() -> None:
+    now = [0.0]
+    cache = mod.MemoizeCache(maxsize=10, ttl=5, clock=lambda: now[0])
+    for key in range(4):
+        cache.get(key, lambda: key)
+    now[0] = 3
+    cache.get("late", lambda: "late")
+    now[0] = 6
+    assert cache.sweep() == 4
+    assert len(cache) == 1
+    now[0] = 9
+    cache.get("new", lambda: "new")
+    assert len(cache) == 1
+
+
+def test_concurrent_refresh_ahead_serves_stale_value() -> None:
+    from concurrent.futures import ThreadPoolExecutor
+
+    now = [0.0]
+    version = [0]
+
+    def compute() -> int:
+        version[0] += 1
+        return version[0]
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        cache = mod.ConcurrentMemoizeCache(ttl=10, clock=lambda: now[0], refresh_ahead=2, refresh_executor=pool)
+        assert cache.get("k", compute) == 1
+        now[0] = 9
+        assert cache.get("k", compute) == 1
+    assert cache.get("k", compute) == 2
+    now[0] = 12
+    assert cache.get("k", compute) == 2
+
+
+def test_failed_refresh_hands_waiters_the_old_value() -> None:
+    now = [0.0]
+    jobs: list = []
+
+    class ManualExecutor:
+        def submit(self, job):
+            jobs.append(job)
+
+    def broken() -> int:
+        raise RuntimeError("backend down")
+
+    cache = mod.ConcurrentMemoizeCache(ttl=10, clock=lambda: now[0], refresh_ahead=2, refresh_executor=ManualExecutor())
+    cache.get("k", lambda: 1)
+    now[0] = 9
+    assert cache.get("k", broken) == 1
+    now[0] = 11  # Expired while the refresh is still queued: the next caller joins it.
+    shard = cache._shards[hash("k") % len(cache._shards)]
+    flight = shard.inflight["k"]
+    results: list[int] = []
+    waiter = threading.Thread(target=lambda: results.append(cache.get("k", broken)))
+    waiter.start()
+    waiter.join(0.05)
+    jobs.pop()()
+    waiter.join(5)
+    assert flight.event.is_set()
+    assert results == [1]
+    with pytest.raises(RuntimeError):
+        cache.get("k", broken)
+
+
+def test_amemoize_refresh_ahead() -> None:
+    import asyncio
+
+    now = [0.0]
+    calls = []
+
+    @mod.amemoize(ttl=10, clock=lambda: now[0], refresh_ahead=2)
+    async def load() -> int:
+        calls.append(1)
+        return len(calls)
+
+    async def scenario() -> None:
+        assert await load() == 1
+        now[0] = 9
+        assert await load() == 1
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert await load() == 2
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_disk_tier_survives_restart(tmp_path) -> None:
+    db = tmp_path / "memo.sqlite"
+    calls = []
+
+    def build():
+        @mod.memoize(disk=db)
+        def expensive(x: int, *, scale: int = 1) -> list[int]:
+            calls.append(x)
+            return [x * scale]
+
+        return expensive
+
+    first = build()
+    assert first(2, scale=3) == [6]
+    first.disk.close()
+    second = build()
+    assert second(2, scale=3) == [6]
+    assert calls == [2]
+    second.disk.close()
+
+
+def test_disk_tier_keeps_wall_clock_expiry(tmp_path) -> None:
+    import time
+
+    @mod.memoize(ttl=60, clock=lambda: 5.0, disk=tmp_path / "memo.sqlite")
+    def value() -> int:
+        return 1
+
+    assert value.disk.clock is time.time
+    value.disk.close()
+
+
+def test_disk_tier_skips_keys_it_cannot_fingerprint(tmp_path) -> None:
+    import datetime
+    from pathlib import Path
+
+    calls = []
+
+    @mod.memoize(disk=tmp_path / "memo.sqlite")
+    def describe(day: datetime.date, where: Path) -> str:
+        calls.append(day)
+        return f"{day:%Y-%m-%d} {where.name}"
+
+    day = datetime.date(2024, 1, 2)
+    assert describe(day, Path("a/b.txt")) == "2024-01-02 b.txt"
+    assert describe(day, Path("a/b.txt")) == "2024-01-02 b.txt"
+    assert calls == [day]
+    assert describe.disk.skipped == 1 and len(describe.disk) == 0
+    describe.disk.close()
+
+
+def test_disk_cache_ttl_and_fingerprint(tmp_path) -> None:
+    from general.disk_cache import DiskCache, JSONCodec, fingerprint
+
+    assert fingerprint(frozenset({"a", "b", 1})) == fingerprint(frozenset({1, "b", "a"}))
+    assert fingerprint((1, "1")) != fingerprint(("1", 1))
+    with pytest.raises(TypeError):
+        fingerprint(object())
+
+    now = [100.0]
+    writer = DiskCache(tmp_path / "c.sqlite", ttl=10, codec=JSONCodec(), clock=lambda: now[0])
+    reader = DiskCache(tmp_path / "c.sqlite", ttl=10, codec=JSONCodec(), clock=lambda: now[0])
+    writer.set(("k", 1), {"v": 1})
+    assert reader.get(("k", 1)) == {"v": 1}
+    now[0] = 111.0
+    assert reader.get(("k", 1), None) is None
+    writer.set("other", 2)
+    now[0] = 200.0
+    assert writer.sweep() == 1
+    assert len(writer) == 0
+    writer.close()
+    reader.close()
+
+
+def test_memoize_accepts_unhashable_and_typed_arguments() -> None:
+    calls = []
+
+    @mod.memoize(typed=True)
+    def total(values, *, weights=None):
+        calls.append(1)
+        return sum(v * (weights or {}).get(i, 1) for i, v in enumerate(values))
+
+    assert total([1, 2, 3], weights={0: 2}) == 7
+    assert total([1, 2, 3], weights={0: 2}) == 7
+    assert total((1, 2, 3)) == 6
+    assert total([1, 2, 3]) == 6
+    assert len(calls) == 3
+
+    from general.cache_keys import KeyBuilder
+
+    build = KeyBuilder(digest_threshold=4)
+    assert build((b"abcdef",), {}) == build((bytearray(b"abcdef"),), {})
+
+    payload = b"x" * 100
+    positional = KeyBuilder(digest_threshold=16)((payload,), {})
+    keyword = KeyBuilder(digest_threshold=16)((), {"d": payload})
+    assert payload not in positional and payload not in keyword[1]
+    assert keyword[1][0] == "d" and keyword[1][1] == positional[0]
+
+
+def test_keyword_order_does_not_change_the_key() -> None:
+    from general.cache_keys import KeyBuilder
+
+    for build in (KeyBuilder(), KeyBuilder(typed=True), KeyBuilder(digest_threshold=2)):
+        assert build((1,), {"a": 1, "b": b"xyz"}) == build((1,), {"b": b"xyz", "a": 1})
@@ -0,0 +1,63 @@
+"""Integration tests for :mod:`general.metrics` and the timer hook."""
+
+import json
+import threading
+
+from general import metrics as mod
+from general.timer import Timer, time_function
+
+
+def test_percentiles_stay_within_bucket_error() -> None:
+    hist = mod.Histogram()
+    for micros in range(1, 10_001):
+        hist.record(micros / 1_000_000)
+    snap = hist.snapshot()
+    assert snap["count"] == 10_000
+    for label, expected in (("p50", 0.005), ("p90", 0.009), ("p99", 0.0099), ("p999", 0.00999)):
+        assert abs(snap[label] - expected) / expected < 0.02
+    assert snap["min"] == 1e-6 and snap["max"] == 0.01
+
+
+def test_concurrent_recording_and_reset() -> None:
+    registry = mod.MetricsRegistry()
+
+    def work() -> None:
+        for _ in range(2_000):
+            registry.record("op", 0.001)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert json.loads(registry.to_json(reset=True))["op"]["count"] == 8_000
+    assert registry.snapshot()["op"]["count"] == 0
+
+
+def test_timer_feeds_registry_and_prometheus_export() -> None:
+    registry = mod.MetricsRegistry()
+    ticks = iter([0.0, 0.25, 1.0, 1.5])
+
+    with Timer(clock=lambda: next(ticks), metric="db.query", registry=registry):
+        pass
+
+    @time_function(clock=lambda: next(ticks), metric="db.query", registry=registry)
+    def query() -> str:
+        return "rows"
+
+    assert query() == ("rows", 0.5)
+    text = registry.to_prometheus()
+    assert "# TYPE db_query_seconds summary" in text
+    assert "db_query_seconds_count 2" in text
+    assert "db_query_seconds_sum 0.75" in text
+
+
+def test_gauges_are_exported_and_survive_reset() -> None:
+    registry = mod.MetricsRegistry()
+    registry.record("db.query", 0.5)
+    registry.set_gauge("pool.limit", 12)
+
+    assert json.loads(registry.to_json(reset=True))["pool.limit"] == 12
+    assert registry.gauges() == {"pool.limit": 12}
+    assert "# TYPE pool_limit gauge\npool_limit 12\n" in registry.to_prometheus()
@@ -0,0 +1,113 @@
+"""Integration tests for :mod:`general.retry_backoff`."""
+
+import asyncio
+
+import pytest
+
+from general import retry_backoff as mod
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+    async def asleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _failing(count: list[int]):
+    def func() -> None:
+        count.append(1)
+        raise ConnectionError("down")
+
+    return func
+
+
+def test_exponential_delays_are_capped() -> None:
+    clock = FakeClock()
+    delays: list[float] = []
+    cfg = mod.RetryConfig(attempts=5, backoff=1.0, multiplier=3.0, max_delay=4.0)
+
+    with pytest.raises(ConnectionError):
+        mod.retry(_failing([]), config=cfg, sleep=delays.append, clock=clock)
+
+    assert delays == [1.0, 3.0, 4.0, 4.0]
+
+
+def test_jitter_modes_use_injected_random() -> None:
+    full: list[float] = []
+    cfg = mod.RetryConfig(attempts=3, backoff=2.0, jitter="full")
+    with pytest.raises(ConnectionError):
+        mod.retry(_failing([]), config=cfg, sleep=full.append, uniform=lambda lo, hi: (lo + hi) / 2)
+    assert full == [1.0, 2.0]
+
+    decorrelated: list[float] = []
+    bounds: list[tuple[float, float]] = []
+
+    def highest(lo: float, hi: float) -> float:
+        bounds.append((lo, hi))
+        return hi
+
+    cfg = mod.RetryConfig(attempts=4, backoff=1.0, jitter="decorrelated", max_delay=5.0)
+    with pytest.raises(ConnectionError):
+        mod.retry(_failing([]), config=cfg, sleep=decorrelated.append, uniform=highest)
+    # The first delay is drawn from [backoff, 3 * backoff], not pinned to backoff.
+    assert bounds[0] == (1.0, 3.0)
+    assert decorrelated == [3.0, 5.0, 5.0]
+
+    with pytest.raises(ValueError):
+        mod.RetryConfig(jitter="sometimes")
+
+
+def test_deadline_stops_retrying() -> None:
+    clock = FakeClock()
+    calls: list[int] = []
+    cfg = mod.RetryConfig(attempts=10, backoff=1.0, multiplier=2.0, deadline=5.0)
+
+    with pytest.raises(ConnectionError):
+        mod.retry(_failing(calls), config=cfg, sleep=clock.sleep, clock=clock)
+
+    assert len(calls) == 3 and clock.now == 3.0
+
+
+def test_budget_limits_retries_across_callers() -> None:
+    clock = FakeClock()
+    budget = mod.RetryBudget(0.5, min_per_second=0.0, capacity=2.0, clock=clock)
+    cfg = mod.RetryConfig(attempts=3, backoff=0.0, budget=budget)
+    calls: list[int] = []
+
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            mod.retry(_failing(calls), config=cfg, sleep=clock.sleep, clock=clock)
+
+    # Two starting tokens plus 0.5 per first attempt allow three retries in total.
+    assert len(calls) == 6
+    assert budget.retries == 3 and budget.rejected == 2
+
+
+def test_aretry_retries_and_enforces_deadline() -> None:
+    clock = FakeClock()
+    attempts: list[int] = []
+
+    async def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("blip")
+        return "ok"
+
+    cfg = mod.RetryConfig(attempts=5, backoff=0.5)
+    assert asyncio.run(mod.aretry(flaky, config=cfg, sleep=clock.asleep, clock=clock)) == "ok"
+    assert clock.now == 1.5
+
+    async def hang() -> None:
+        await asyncio.sleep(10)
+
+    cfg = mod.RetryConfig(attempts=3, backoff=0.0, deadline=0.05)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(mod.aretry(hang, config=cfg))